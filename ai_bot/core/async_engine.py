@@ -0,0 +1,194 @@
+"""Asyncio front-end for AIEngine.
+
+``AsyncAIEngine`` wraps an existing ``AIEngine`` together with its web and
+offline searchers. Source lookups run concurrently on the event loop
+(natively for the web when an async searcher is available, on a dedicated
+executor for SQLite) and the engine's own routing and formatting is then
+fed the prefetched results, so the response format stays identical to
+``process_query``.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ai_bot.core.metrics import (
+    STAGE_OFFLINE, STAGE_WEB, MetricsRegistry, StageTimer)
+from ai_bot.core.singleflight import AsyncSingleFlight, query_key
+
+AsyncSearchFn = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+
+
+class AsyncAIEngine:
+    """Async wrapper exposing ``aprocess_query`` for an AIEngine."""
+
+    def __init__(
+        self,
+        engine,
+        web_searcher=None,
+        wiki_offline=None,
+        async_web_search: Optional[AsyncSearchFn] = None,
+        offline_workers: int = 4,
+        web_workers: int = 16,
+        max_in_flight: int = 10000,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """Initialize the async engine.
+
+        Args:
+            engine: An ``AIEngine`` instance.
+            web_searcher: Object with a synchronous ``search(query)`` method,
+                used when no native async search is supplied.
+            wiki_offline: Object with a synchronous ``search(query)`` method.
+            async_web_search: Optional coroutine function for web lookups,
+                e.g. ``AsyncWebSearcher().search``. Preferred over
+                ``web_searcher.asearch`` and ``web_searcher.search``.
+            offline_workers: Threads reserved for SQLite lookups.
+            web_workers: Threads used only for a blocking web searcher.
+            max_in_flight: Upper bound on concurrently processed queries.
+            registry: Metrics registry for stage timings; defaults to the
+                process-wide registry.
+        """
+        self.engine = engine
+        self.web_searcher = web_searcher
+        self.wiki_offline = wiki_offline
+
+        if async_web_search is None and web_searcher is not None:
+            async_web_search = getattr(web_searcher, "asearch", None)
+        self._async_web_search = async_web_search
+
+        self._offline_executor = ThreadPoolExecutor(
+            max_workers=offline_workers, thread_name_prefix="aibot-offline")
+        self._web_executor: Optional[ThreadPoolExecutor] = None
+        if self._async_web_search is None and web_searcher is not None:
+            self._web_executor = ThreadPoolExecutor(
+                max_workers=web_workers, thread_name_prefix="aibot-web")
+        # AIEngine keeps cache and history state; serialize access to it
+        self._engine_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="aibot-engine")
+        self._max_in_flight = max_in_flight
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.coalescer = AsyncSingleFlight()
+        self.registry = registry
+
+    async def asearch_web(self, query: str) -> List[Dict[str, Any]]:
+        """Run a web search without blocking the event loop.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            Web search results, or an empty list if no searcher is set.
+        """
+        if self._async_web_search is not None:
+            return await self._async_web_search(query)
+        if self.web_searcher is None:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._web_executor, self.web_searcher.search, query)
+
+    async def asearch_offline(self, query: str) -> List[Dict[str, Any]]:
+        """Run an offline lookup on the dedicated SQLite executor.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            Offline search results, or an empty list if no database is set.
+        """
+        if self.wiki_offline is None:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._offline_executor, self.wiki_offline.search, query)
+
+    async def aprocess_query(self, query: str) -> Dict[str, Any]:
+        """Process a query asynchronously.
+
+        Sources needed by the current mode are fetched concurrently, and
+        identical queries already in flight are coalesced into one
+        execution. If the calling task is cancelled, pending lookups are
+        cancelled too and queued executor work is dropped before it starts.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            The same result dict ``AIEngine.process_query`` produces.
+        """
+        mode = self.engine.get_mode()
+        return await self.coalescer.do(
+            query_key(query, mode), lambda: self._aprocess(query, mode))
+
+    async def _aprocess(self, query: str, mode: str) -> Dict[str, Any]:
+        """Fetch sources for ``mode`` and run the engine on the results."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_in_flight)
+
+        async with self._slots:
+            timer = StageTimer(self.registry)
+            start = time.perf_counter()
+            pending: Dict[str, "asyncio.Task[List[Dict[str, Any]]]"] = {}
+            if mode in ("hybrid", "online"):
+                pending[STAGE_WEB] = asyncio.ensure_future(
+                    self._timed(timer, STAGE_WEB, self.asearch_web, query))
+            if mode in ("hybrid", "offline"):
+                pending[STAGE_OFFLINE] = asyncio.ensure_future(
+                    self._timed(timer, STAGE_OFFLINE,
+                                self.asearch_offline, query))
+
+            try:
+                await asyncio.gather(*pending.values(), return_exceptions=True)
+            except asyncio.CancelledError:
+                for task in pending.values():
+                    task.cancel()
+                raise
+
+            fetched: Dict[str, Any] = {}
+            for name, task in pending.items():
+                exc = task.exception()
+                fetched[name] = exc if exc is not None else task.result()
+
+            def _replay(name: str) -> Callable[[str], List[Dict[str, Any]]]:
+                def _search(_query: str) -> List[Dict[str, Any]]:
+                    value = fetched.get(name, [])
+                    if isinstance(value, BaseException):
+                        raise value
+                    return value
+                return _search
+
+            loop = asyncio.get_running_loop()
+            engine_start = time.perf_counter()
+            result = await loop.run_in_executor(
+                self._engine_executor, self.engine.process_query,
+                query, _replay(STAGE_WEB), _replay(STAGE_OFFLINE))
+            end = time.perf_counter()
+            timings = timer.finish(end - start, end - engine_start)
+            if isinstance(result, dict):
+                result = dict(result)
+                result["timings"] = timings
+            return result
+
+    @staticmethod
+    async def _timed(timer: StageTimer, stage: str,
+                     search: AsyncSearchFn, query: str) -> Any:
+        """Await a source lookup and record its duration as ``stage``."""
+        start = time.perf_counter()
+        try:
+            return await search(query)
+        finally:
+            timer.record(stage, time.perf_counter() - start)
+
+    def close(self) -> None:
+        """Shut down the executors owned by this wrapper."""
+        self._offline_executor.shutdown(wait=False)
+        self._engine_executor.shutdown(wait=False)
+        if self._web_executor is not None:
+            self._web_executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncAIEngine":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,250 @@
+"""Low-overhead in-process latency metrics.
+
+Keeps a rolling window of samples per stage (web fetch, offline search,
+cache lookup, formatting, total) and reports p50/p95/p99 on demand.
+Recording a sample is a single deque append; percentiles are only computed
+when stats are read. A Prometheus text exposition is available for
+scraping from the query server.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_WINDOW = 2048
+
+STAGE_CACHE = "cache_lookup"
+STAGE_WEB = "web_fetch"
+STAGE_OFFLINE = "offline_search"
+STAGE_FORMAT = "formatting"
+STAGE_TOTAL = "total"
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+    return samples[index]
+
+
+class LatencyHistogram:
+    """Rolling latency window plus lifetime count and sum."""
+
+    __slots__ = ("samples", "count", "total")
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """Initialize the histogram.
+
+        Args:
+            window: Number of most recent samples kept for percentiles.
+        """
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency sample in seconds."""
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self) -> Dict[str, float]:
+        """Return count, mean and p50/p95/p99 in milliseconds."""
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": _percentile(ordered, 50) * 1000,
+            "p95_ms": _percentile(ordered, 95) * 1000,
+            "p99_ms": _percentile(ordered, 99) * 1000,
+        }
+
+
+class MetricsRegistry:
+    """Named latency histograms and counter collectors."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """Initialize an empty registry.
+
+        Args:
+            window: Sample window used for new histograms.
+        """
+        self._window = window
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Return the histogram for ``name``, creating it on first use."""
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(
+                    name, LatencyHistogram(self._window))
+        return hist
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a latency sample for ``name``."""
+        self.histogram(name).observe(seconds)
+
+    def add_collector(self, prefix: str,
+                      collector: Callable[[], Dict[str, Any]]) -> None:
+        """Register a callable whose numeric dict is exported as counters.
+
+        Args:
+            prefix: Metric name prefix, e.g. ``'coalescing'``.
+            collector: Returns a mapping of counter name to number.
+        """
+        self._collectors[prefix] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return latency summaries and collected counters."""
+        counters: Dict[str, Any] = {}
+        for prefix, collector in list(self._collectors.items()):
+            try:
+                counters[prefix] = dict(collector())
+            except Exception:  # pylint: disable=broad-except
+                continue
+        return {
+            "latency": {name: hist.summary()
+                        for name, hist in sorted(self._histograms.items())},
+            "counters": counters,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the registry in Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP aibot_stage_latency_seconds Query stage latency.",
+            "# TYPE aibot_stage_latency_seconds summary",
+        ]
+        for name, hist in sorted(self._histograms.items()):
+            summary = hist.summary()
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"),
+                                  ("0.99", "p99_ms")):
+                lines.append(
+                    f'aibot_stage_latency_seconds{{stage="{name}",'
+                    f'quantile="{quantile}"}} {summary[key] / 1000:.6f}')
+            lines.append(
+                f'aibot_stage_latency_seconds_sum{{stage="{name}"}} '
+                f'{hist.total:.6f}')
+            lines.append(
+                f'aibot_stage_latency_seconds_count{{stage="{name}"}} '
+                f'{hist.count}')
+        for prefix, values in snap["counters"].items():
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)):
+                    metric = f"aibot_{prefix}_{key}".replace(".", "_")
+                    lines.append(f"# TYPE {metric} gauge")
+                    lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all recorded samples (collectors are kept)."""
+        with self._lock:
+            self._histograms.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+class StageTimer:
+    """Collects per-stage timings for a single query."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """Initialize the timer.
+
+        Args:
+            registry: Registry that receives every stage sample; defaults
+                to the process-wide ``REGISTRY``.
+        """
+        self.registry = registry if registry is not None else REGISTRY
+        self.timings: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add a stage duration for this query and the registry."""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        self.registry.observe(stage, seconds)
+
+    def wrap(self, stage: str, fn: Callable[[str], Any]) -> Callable[[str], Any]:
+        """Wrap a search callable so its duration is recorded as ``stage``."""
+        def _timed(query: str) -> Any:
+            start = time.perf_counter()
+            try:
+                return fn(query)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return _timed
+
+    def finish(self, total: float,
+               remainder: Optional[float] = None) -> Dict[str, float]:
+        """Attribute engine time outside the sources and record the total.
+
+        When no source was called the engine answered from its cache, so
+        the whole duration counts as cache lookup; otherwise the remainder
+        is cache miss handling plus response formatting.
+
+        Args:
+            total: Wall time of the whole ``process_query`` call.
+            remainder: Engine time outside the sources, when measured
+                directly (e.g. because sources ran concurrently).
+
+        Returns:
+            Stage timings in milliseconds, rounded for display.
+        """
+        if remainder is None:
+            fetched = sum(self.timings.get(s, 0.0)
+                          for s in (STAGE_WEB, STAGE_OFFLINE))
+            remainder = max(0.0, total - fetched)
+        if STAGE_WEB in self.timings or STAGE_OFFLINE in self.timings:
+            self.record(STAGE_FORMAT, remainder)
+        else:
+            self.record(STAGE_CACHE, remainder)
+        self.record(STAGE_TOTAL, total)
+        return {stage: round(seconds * 1000, 3)
+                for stage, seconds in self.timings.items()}
+
+
+def instrumented_query(engine, query: str, web_search_fn, offline_search_fn,
+                       registry: Optional[MetricsRegistry] = None) -> Dict[str, Any]:
+    """Run ``engine.process_query`` and attach per-stage timings.
+
+    Args:
+        engine: An ``AIEngine`` instance.
+        query: The search query string.
+        web_search_fn: Web search callable passed through to the engine.
+        offline_search_fn: Offline search callable passed to the engine.
+        registry: Registry to record into; defaults to ``REGISTRY``.
+
+    Returns:
+        The engine result dict with an added 'timings' mapping of stage
+        name to milliseconds.
+    """
+    timer = StageTimer(registry)
+    start = time.perf_counter()
+    result = engine.process_query(
+        query,
+        timer.wrap(STAGE_WEB, web_search_fn),
+        timer.wrap(STAGE_OFFLINE, offline_search_fn),
+    )
+    timings = timer.finish(time.perf_counter() - start)
+    if isinstance(result, dict):
+        result = dict(result)
+        result["timings"] = timings
+    return result
+
+
+def format_stats(snapshot: Dict[str, Any]) -> str:
+    """Render a registry snapshot as a human-readable table."""
+    lines = [f"{'stage':<24}{'count':>8}{'mean':>10}{'p50':>10}"
+             f"{'p95':>10}{'p99':>10}  (ms)"]
+    for name, summary in snapshot.get("latency", {}).items():
+        lines.append(
+            f"{name:<24}{summary['count']:>8}{summary['mean_ms']:>10.1f}"
+            f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}"
+            f"{summary['p99_ms']:>10.1f}")
+    for prefix, values in snapshot.get("counters", {}).items():
+        pairs = ", ".join(f"{k}={v}" for k, v in sorted(values.items()))
+        lines.append(f"{prefix}: {pairs}")
+    return "\n".join(lines)
@@ -0,0 +1,137 @@
+"""Assembly of the search callables handed to ``AIEngine.process_query``.
+
+The CLI, the query server and other front-ends build their online and
+offline search functions here so that rate limiting, cassettes, provider
+fan-out, retries and circuit breaking are layered the same way
+everywhere, driven by config.json.
+"""
+from typing import Any, Callable, Dict, List
+
+from ai_bot.core.metrics import REGISTRY
+from ai_bot.core.settings import get_setting, resolve_path
+from ai_bot.modules.cassette import (
+    MODE_RECORD, MODE_REPLAY, Cassette, FallbackSearch, RecordingSearch,
+    ReplaySearch)
+from ai_bot.modules.providers import FanOutSearch, SearchProvider
+from ai_bot.modules.rate_limit import RequestScheduler, SchedulerAdmission
+from ai_bot.modules.resilience import ResilientSearch
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+
+def _cassette(config: Dict[str, Any]) -> Cassette:
+    return Cassette(resolve_path(get_setting(
+        config, "online.cassette_file", "data/cache/web_cassette.db")))
+
+
+def _provider(name: str, web_search_fn: SearchFn,
+              config: Dict[str, Any]) -> SearchProvider:
+    """Create a provider from its ``online.provider`` name."""
+    if name == "duckduckgo":
+        return SearchProvider(name, web_search_fn)
+    if name == "local":
+        # Stand-in backed by recorded responses; never touches the network
+        return SearchProvider(name, ReplaySearch(_cassette(config)))
+    raise ValueError(f"Unknown online provider: {name}")
+
+
+def build_online_search(web_search_fn: SearchFn,
+                        config: Dict[str, Any]) -> SearchFn:
+    """Wrap a web search callable according to the configuration.
+
+    ``online.cassette_mode`` selects ``'replay'`` (serve recorded responses
+    only, no network), ``'record'`` (capture live responses) or ``'off'``.
+    When ``online.provider`` lists several backends they are queried via
+    :class:`FanOutSearch`. Live searches are always guarded by
+    :class:`ResilientSearch`. When ``online.rate_limit_per_second`` is
+    positive, requests to the web provider are paced by a priority token
+    bucket: every attempt, retries included, waits for its tokens before it
+    takes a worker slot.
+
+    Args:
+        web_search_fn: Raw web search callable, e.g. ``WebSearcher.search``.
+        config: Parsed configuration dictionary.
+
+    Returns:
+        The search callable to pass to ``process_query``.
+    """
+    mode = get_setting(config, "online.cassette_mode", "off")
+    if mode == MODE_REPLAY:
+        return ReplaySearch(
+            _cassette(config), get_setting(config, "online.cassette_latency"))
+
+    names = get_setting(config, "online.provider", "duckduckgo")
+    if isinstance(names, str):
+        names = [names]
+    admit = None
+    rate = float(get_setting(config, "online.rate_limit_per_second", 0) or 0)
+    if rate > 0:
+        scheduler = RequestScheduler(
+            rate, float(get_setting(config, "online.rate_limit_burst", rate)))
+        REGISTRY.add_collector("rate_limit", scheduler.stats)
+        # One token per web request an attempt sends
+        web_requests = (sum(1 for name in names if name != "local")
+                        if len(names) > 1 else 1)
+        if web_requests:
+            admit = SchedulerAdmission(
+                scheduler,
+                max_wait=float(get_setting(config, "search.timeout_seconds", 10)),
+                tokens=web_requests)
+
+    search_fn = web_search_fn
+    if mode == MODE_RECORD:
+        search_fn = RecordingSearch(search_fn, _cassette(config))
+    if len(names) > 1:
+        fanout = FanOutSearch(
+            [_provider(name, search_fn, config) for name in names],
+            strategy=get_setting(config, "online.fanout_strategy", "first"),
+            top_k=int(get_setting(config, "online.fanout_top_k", 5)),
+            max_parallel=int(get_setting(config, "online.fanout_max_parallel", 2)),
+            timeout=float(get_setting(config, "online.timeout", 10)),
+        )
+        REGISTRY.add_collector("providers", fanout.stats)
+        search_fn = fanout
+    resilient = ResilientSearch.from_config(search_fn, config, admit)
+    REGISTRY.add_collector("online", resilient.stats)
+    return resilient
+
+
+def build_offline_search(offline_search_fn: SearchFn,
+                         config: Dict[str, Any]) -> SearchFn:
+    """Wrap an offline search callable according to the configuration.
+
+    With ``online.cassette_fallback`` enabled, recorded web responses act
+    as a last-resort source when the offline database has no match.
+
+    Args:
+        offline_search_fn: Raw offline search, e.g. ``WikipediaOffline.search``.
+        config: Parsed configuration dictionary.
+
+    Returns:
+        The search callable to pass to ``process_query``.
+    """
+    if get_setting(config, "online.cassette_fallback", False):
+        return FallbackSearch(offline_search_fn, ReplaySearch(_cassette(config)))
+    return offline_search_fn
+
+
+def lookup_title(offline_search_fn: SearchFn, title: str) -> Dict[str, Any]:
+    """Look up an offline article by exact (case-insensitive) title.
+
+    Args:
+        offline_search_fn: Offline search callable.
+        title: Article title to find.
+
+    Returns:
+        Dict with 'title', 'found' and 'results' (exact matches, or the
+        plain search results when nothing matched exactly).
+    """
+    results = offline_search_fn(title) or []
+    wanted = title.casefold()
+    matches = [
+        item for item in results
+        if isinstance(item, dict)
+        and str(item.get("title", "")).casefold() == wanted
+    ]
+    return {"title": title, "found": bool(matches),
+            "results": matches or results}
@@ -0,0 +1,269 @@
+"""Adaptive source routing for hybrid mode.
+
+The engine's hybrid mode always asks the web first and falls back to the
+offline database. ``SourceRouter`` runs the cheap SQLite lookup first and
+decides from what it found, and from statistics learned per query class,
+whether the web is worth calling at all:
+
+* an exact (case-insensitive) title hit offline is answered offline;
+* no offline results always go to the web;
+* partial offline hits go to the web until the class has enough samples,
+  then only while the web keeps adding results within the latency budget,
+  with an occasional exploratory web call to keep the statistics fresh.
+
+A query class combines the query form (question or keywords) with the
+kind of offline hit. Every routed result carries a ``routing`` dict with
+the class, whether the web was called and the reason.
+"""
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ai_bot.core.metrics import (
+    STAGE_OFFLINE, STAGE_WEB, MetricsRegistry, StageTimer, instrumented_query)
+from ai_bot.core.settings import get_setting
+from ai_bot.core.singleflight import normalize_query
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+MATCH_EXACT = "exact"
+MATCH_PARTIAL = "partial"
+MATCH_NONE = "none"
+
+REASON_EXACT_TITLE = "exact_title_offline_hit"
+REASON_NO_OFFLINE = "no_offline_results"
+REASON_LEARNING = "learning_class"
+REASON_WEB_HELPS = "web_often_helps"
+REASON_WEB_RARELY_HELPS = "web_rarely_helps"
+REASON_WEB_TOO_SLOW = "web_too_slow"
+REASON_EXPLORATION = "exploration"
+
+_QUESTION_WORDS = frozenset((
+    "who", "what", "when", "where", "why", "how", "which", "whose", "whom",
+    "is", "are", "was", "were", "do", "does", "did", "can", "could",
+    "should", "will", "would"))
+
+
+def is_question(query: str) -> bool:
+    """True for queries phrased as a question."""
+    normalized = normalize_query(query)
+    if normalized.endswith("?"):
+        return True
+    first = normalized.split(" ", 1)[0] if normalized else ""
+    return first in _QUESTION_WORDS
+
+
+def offline_match(query: str, results: List[Dict[str, Any]]) -> str:
+    """Classify offline results as an exact title hit, partial or none."""
+    if not results:
+        return MATCH_NONE
+    wanted = re.sub(r"[?!.]+$", "", normalize_query(query)).strip()
+    for item in results:
+        if (isinstance(item, dict)
+                and normalize_query(str(item.get("title", ""))) == wanted):
+            return MATCH_EXACT
+    return MATCH_PARTIAL
+
+
+class _ClassStats:
+    """Observed outcomes for one query class."""
+
+    __slots__ = ("queries", "web_calls", "web_hits", "web_ewma", "skipped",
+                 "declined")
+
+    def __init__(self):
+        self.queries = 0
+        self.web_calls = 0
+        self.web_hits = 0
+        self.web_ewma: Optional[float] = None
+        self.skipped = 0
+        self.declined = 0  # partial hits the statistics said to answer offline
+
+
+class SourceRouter:
+    """Learns per query class whether hybrid queries need the web."""
+
+    def __init__(self, min_samples: int = 5, web_min_hit_rate: float = 0.2,
+                 max_web_latency: float = 3.0, explore_every: int = 20,
+                 alpha: float = 0.3):
+        """Initialize the router.
+
+        Args:
+            min_samples: Web calls observed in a class before partial
+                offline hits may skip the web.
+            web_min_hit_rate: Fraction of web calls that must return
+                results for the web to stay in use for a class.
+            max_web_latency: Web latency EWMA in seconds above which
+                partial offline hits are answered offline.
+            explore_every: Every n-th partial hit the statistics would
+                answer offline calls the web anyway; 0 disables exploration.
+            alpha: Smoothing factor of the web latency EWMA.
+        """
+        self.min_samples = min_samples
+        self.web_min_hit_rate = web_min_hit_rate
+        self.max_web_latency = max_web_latency
+        self.explore_every = explore_every
+        self.alpha = alpha
+        self._classes: Dict[str, _ClassStats] = {}
+        self._lock = threading.Lock()
+        self._reasons: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SourceRouter"]:
+        """Build a router from the ``routing`` settings, or None if disabled."""
+        if not get_setting(config, "routing.enabled", False):
+            return None
+        return cls(
+            min_samples=int(get_setting(config, "routing.min_samples", 5)),
+            web_min_hit_rate=float(get_setting(
+                config, "routing.web_min_hit_rate", 0.2)),
+            max_web_latency=float(get_setting(
+                config, "routing.max_web_latency_seconds", 3.0)),
+            explore_every=int(get_setting(config, "routing.explore_every", 20)),
+        )
+
+    def decide(self, query: str,
+               offline_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Decide whether to call the web after the offline lookup.
+
+        Args:
+            query: The search query string.
+            offline_results: What the offline search returned.
+
+        Returns:
+            Dict with 'query_class', 'web' (bool) and 'reason'.
+        """
+        match = offline_match(query, offline_results)
+        form = "question" if is_question(query) else "keywords"
+        query_class = f"{form}/{match}"
+        with self._lock:
+            stats = self._classes.setdefault(query_class, _ClassStats())
+            stats.queries += 1
+            if match == MATCH_EXACT:
+                web, reason = False, REASON_EXACT_TITLE
+            elif match == MATCH_NONE:
+                web, reason = True, REASON_NO_OFFLINE
+            elif stats.web_calls < self.min_samples:
+                web, reason = True, REASON_LEARNING
+            else:
+                reason = None
+                if (stats.web_ewma or 0.0) > self.max_web_latency:
+                    reason = REASON_WEB_TOO_SLOW
+                elif stats.web_hits / stats.web_calls < self.web_min_hit_rate:
+                    reason = REASON_WEB_RARELY_HELPS
+                web = reason is None
+                if web:
+                    reason = REASON_WEB_HELPS
+                else:
+                    stats.declined += 1
+                    if (self.explore_every
+                            and stats.declined % self.explore_every == 0):
+                        web, reason = True, REASON_EXPLORATION
+            if not web:
+                stats.skipped += 1
+            self._reasons[reason] = self._reasons.get(reason, 0) + 1
+        return {"query_class": query_class, "web": web, "reason": reason}
+
+    def record_web(self, query_class: str, results: List[Dict[str, Any]],
+                   seconds: float) -> None:
+        """Record the outcome of a web call made for ``query_class``."""
+        with self._lock:
+            stats = self._classes.setdefault(query_class, _ClassStats())
+            stats.web_calls += 1
+            if results:
+                stats.web_hits += 1
+            stats.web_ewma = seconds if stats.web_ewma is None else (
+                self.alpha * seconds + (1 - self.alpha) * stats.web_ewma)
+
+    def web_search(self, decision: Dict[str, Any],
+                   web_search_fn: SearchFn) -> SearchFn:
+        """Return the web callable to hand the engine for a decision.
+
+        Skipped queries get a callable returning no results, so hybrid
+        mode falls through to the offline answer; otherwise the real
+        search is wrapped so its outcome feeds the class statistics.
+        """
+        if not decision["web"]:
+            return lambda _query: []
+
+        def _search(query: str) -> List[Dict[str, Any]]:
+            start = time.perf_counter()
+            results: List[Dict[str, Any]] = []
+            try:
+                results = web_search_fn(query) or []
+                return results
+            finally:
+                self.record_web(decision["query_class"], results,
+                                time.perf_counter() - start)
+        return _search
+
+    def stats(self) -> Dict[str, Any]:
+        """Return decision counts by reason and per-class web hit rates."""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                f"reason_{reason}": count
+                for reason, count in self._reasons.items()}
+            for name, cls_stats in self._classes.items():
+                key = name.replace("/", "_")
+                stats[f"{key}_queries"] = cls_stats.queries
+                stats[f"{key}_web_calls"] = cls_stats.web_calls
+                stats[f"{key}_web_skipped"] = cls_stats.skipped
+                if cls_stats.web_calls:
+                    stats[f"{key}_web_hit_rate"] = round(
+                        cls_stats.web_hits / cls_stats.web_calls, 3)
+            return stats
+
+
+def routed_query(engine, query: str, web_search_fn: SearchFn,
+                 offline_search_fn: SearchFn,
+                 router: Optional[SourceRouter] = None,
+                 registry: Optional[MetricsRegistry] = None) -> Dict[str, Any]:
+    """Like ``instrumented_query``, routing hybrid queries via ``router``.
+
+    Outside hybrid mode, or without a router, this is exactly
+    ``instrumented_query``. The offline lookup and the routing decision
+    happen only when the engine asks for a source, so a query it answers
+    from its cache costs neither.
+
+    Args:
+        engine: An ``AIEngine`` instance.
+        query: The search query string.
+        web_search_fn: Web search callable.
+        offline_search_fn: Offline search callable.
+        router: Router deciding whether to call the web.
+        registry: Registry for stage timings; defaults to ``REGISTRY``.
+
+    Returns:
+        The engine result dict with 'timings' and, when the engine asked
+        for the web in hybrid mode, the 'routing' decision.
+    """
+    if router is None or engine.get_mode() != "hybrid":
+        return instrumented_query(
+            engine, query, web_search_fn, offline_search_fn, registry)
+
+    timer = StageTimer(registry)
+    start = time.perf_counter()
+    fetched: Dict[str, Any] = {}
+
+    def _offline(_query: str) -> List[Dict[str, Any]]:
+        if STAGE_OFFLINE not in fetched:
+            fetched[STAGE_OFFLINE] = timer.wrap(
+                STAGE_OFFLINE, offline_search_fn)(query) or []
+        return fetched[STAGE_OFFLINE]
+
+    def _web(_query: str) -> List[Dict[str, Any]]:
+        decision = fetched["decision"] = router.decide(query, _offline(query))
+        web_fn = router.web_search(decision, web_search_fn)
+        if decision["web"]:
+            web_fn = timer.wrap(STAGE_WEB, web_fn)
+        return web_fn(query)
+
+    result = engine.process_query(query, _web, _offline)
+    timings = timer.finish(time.perf_counter() - start)
+    if isinstance(result, dict):
+        result = dict(result)
+        result["timings"] = timings
+        if "decision" in fetched:
+            result["routing"] = fetched["decision"]
+    return result
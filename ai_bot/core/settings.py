@@ -0,0 +1,61 @@
+"""Configuration loading helpers shared by the engine add-ons.
+
+Reads the project ``config.json`` and exposes dotted-key lookups such as
+``get_setting(config, 'online.timeout', 10)``.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config.json"
+
+
+def load_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Load the application configuration.
+
+    Args:
+        path: Path to a config file. Defaults to the project ``config.json``.
+
+    Returns:
+        Parsed configuration dictionary, or an empty dict if the file is
+        missing or unreadable.
+    """
+    config_path = Path(path) if path else DEFAULT_CONFIG_PATH
+    try:
+        with open(config_path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_setting(config: Dict[str, Any], key: str, default: Any = None) -> Any:
+    """Look up a dotted key such as ``'online.timeout'``.
+
+    Args:
+        config: Configuration dictionary from :func:`load_config`.
+        key: Dotted path into the configuration.
+        default: Value returned when any part of the path is missing.
+
+    Returns:
+        The configured value or ``default``.
+    """
+    node: Any = config
+    for part in key.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return default
+        node = node[part]
+    return node
+
+
+def resolve_path(value: Union[str, Path]) -> Path:
+    """Resolve a configured path relative to the project directory.
+
+    Args:
+        value: Absolute path or one relative to the folder holding
+            config.json (e.g. ``'data/cache/web_cassette.db'``).
+
+    Returns:
+        An absolute path.
+    """
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else DEFAULT_CONFIG_PATH.parent / path
@@ -0,0 +1,162 @@
+"""Single-flight coalescing of identical in-flight queries.
+
+When several callers ask for the same (normalized query, mode) at the same
+time, only the first runs the underlying search; the rest wait for it and
+share its result. Both a thread-based and an asyncio variant are provided.
+"""
+import asyncio
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for coalescing: casefold and collapse whitespace."""
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+def query_key(query: str, mode: Optional[str]) -> Tuple[str, str]:
+    """Build the coalescing key for a query in a given mode."""
+    return (normalize_query(query), mode or "")
+
+
+def _share(result: Any) -> Any:
+    """Give each waiter its own top-level copy of a shared result dict."""
+    return dict(result) if isinstance(result, dict) else result
+
+
+class _Call:
+    """An in-flight execution that other callers can wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared future whose caller was cancelled; waiters retry."""
+
+
+class _Counters:
+    """Call/execution counters shared by both coalescer variants."""
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return coalescing metrics.
+
+        Returns:
+            Dict with total 'calls', underlying 'executions' and the number
+            of 'collapsed' calls that reused another caller's execution.
+        """
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.calls - self.executions,
+        }
+
+
+class SingleFlight(_Counters):
+    """Thread-safe single-flight group."""
+
+    def __init__(self):
+        """Initialize an empty group."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key, e.g. from :func:`query_key`.
+            fn: Zero-argument callable performing the real work.
+
+        Returns:
+            The result of ``fn``; waiters receive a shallow copy.
+
+        Raises:
+            Exception: Whatever ``fn`` raised, re-raised in every caller.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as exc:  # pylint: disable=broad-except
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight(_Counters):
+    """Single-flight group for coroutines on one event loop."""
+
+    def __init__(self):
+        """Initialize an empty group."""
+        super().__init__()
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn`` once for all concurrent callers with the same key.
+
+        A waiter that is cancelled does not cancel the shared execution;
+        the execution is cancelled only if its own caller is, and then the
+        waiters do not see that cancellation: the first of them to resume
+        runs ``fn`` again and the others wait on it.
+
+        Args:
+            key: Coalescing key, e.g. from :func:`query_key`.
+            fn: Zero-argument coroutine function performing the real work.
+
+        Returns:
+            The result of ``fn``; waiters receive a shallow copy.
+        """
+        self.calls += 1
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            try:
+                return _share(await asyncio.shield(future))
+            except _LeaderCancelled:
+                continue
+
+        self.executions += 1
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                exc = _LeaderCancelled()
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
@@ -0,0 +1,221 @@
+"""Streaming variant of ``AIEngine.process_query``.
+
+``stream_query`` starts every source the current mode needs at once and
+yields an event as soon as each one answers, followed by the engine's
+merged result. In hybrid mode a front-end can therefore show the offline
+answer after the SQLite lookup instead of waiting for the web. Sources
+start only when the engine asks for one, so answers it has cached cost
+no lookups::
+
+    for event in stream_query(engine, query, online_search, offline_search):
+        if event["event"] == EVENT_FINAL:
+            show(event["result"])
+        else:
+            preview(event["source"], event["results"])
+
+Event dicts always carry ``event`` and ``query``. Source events
+(``EVENT_OFFLINE``, ``EVENT_WEB``) add ``source``, ``results``,
+``elapsed_ms`` and, when the lookup raised, ``error``; with a router the
+offline event also carries its ``routing`` decision. ``EVENT_FINAL`` adds
+``result``: the same dict ``process_query`` returns, with timings.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ai_bot.core.metrics import (
+    STAGE_OFFLINE, STAGE_WEB, MetricsRegistry, StageTimer)
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+EVENT_OFFLINE = "offline"
+EVENT_WEB = "web"
+EVENT_FINAL = "final"
+
+_STAGE_EVENTS = {STAGE_OFFLINE: EVENT_OFFLINE, STAGE_WEB: EVENT_WEB}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_engine_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="aibot-stream")
+        return _executor
+
+
+def _default_engine_executor() -> ThreadPoolExecutor:
+    global _engine_executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _engine_executor is None:
+            # AIEngine keeps cache and history state; serialize access to it
+            _engine_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="aibot-stream-engine")
+        return _engine_executor
+
+
+class _SourceRun:
+    """The source lookups of one streamed query, started on first demand."""
+
+    def __init__(self, query: str, mode: str, web_search_fn: SearchFn,
+                 offline_search_fn: SearchFn, pool: ThreadPoolExecutor,
+                 timer: StageTimer, router=None):
+        self.query = query
+        self.mode = mode
+        self.web_search_fn = web_search_fn
+        self.offline_search_fn = offline_search_fn
+        self.pool = pool
+        self.timer = timer
+        self.router = router if mode == "hybrid" else None
+        self.events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self.decision: Optional[Dict[str, Any]] = None
+        self.waited = 0.0
+        self._results: Dict[str, Future] = {
+            STAGE_OFFLINE: Future(), STAGE_WEB: Future()}
+        self._start = time.perf_counter()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _launch(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if self.mode in ("hybrid", "offline"):
+            self._submit(STAGE_OFFLINE, self.offline_search_fn)
+        else:
+            self._results[STAGE_OFFLINE].set_result([])
+        if self.mode in ("hybrid", "online") and self.router is None:
+            self._submit(STAGE_WEB, self.web_search_fn)
+        elif self.router is None:
+            self._results[STAGE_WEB].set_result([])
+
+    def _submit(self, stage: str, fn: SearchFn) -> None:
+        self.pool.submit(self._lookup, stage, self.timer.wrap(stage, fn))
+
+    def _lookup(self, stage: str, fn: SearchFn) -> None:
+        event: Dict[str, Any] = {"event": _STAGE_EVENTS[stage],
+                                 "query": self.query,
+                                 "source": _STAGE_EVENTS[stage]}
+        error: Optional[BaseException] = None
+        try:
+            event["results"] = fn(self.query) or []
+        except BaseException as exc:  # pylint: disable=broad-except
+            error = exc
+            event.update(results=[], error=str(exc))
+        event["elapsed_ms"] = round((time.perf_counter() - self._start) * 1000, 3)
+        if self.router is not None and stage == STAGE_OFFLINE:
+            self.decision = self.router.decide(self.query, event["results"])
+            event["routing"] = self.decision
+            if self.decision["web"]:
+                self._submit(STAGE_WEB, self.router.web_search(
+                    self.decision, self.web_search_fn))
+            else:
+                self._results[STAGE_WEB].set_result([])
+        # Queued before the engine can see the result, so source events
+        # always precede the final one
+        self.events.put(event)
+        if error is not None:
+            self._results[stage].set_exception(error)
+        else:
+            self._results[stage].set_result(event["results"])
+
+    def source(self, stage: str) -> SearchFn:
+        """Search callable for the engine; starts the lookups when called."""
+        def _search(_query: str) -> List[Dict[str, Any]]:
+            self._launch()
+            start = time.perf_counter()
+            try:
+                return self._results[stage].result()
+            finally:
+                self.waited += time.perf_counter() - start
+        return _search
+
+
+def stream_query(engine, query: str, web_search_fn: SearchFn,
+                 offline_search_fn: SearchFn,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 registry: Optional[MetricsRegistry] = None,
+                 router=None) -> Iterator[Dict[str, Any]]:
+    """Process a query, yielding source results as they become available.
+
+    The engine runs first, on a single engine thread, with source
+    callables that start the lookups only when it asks for one. A query
+    the engine answers from its cache therefore consults no source and
+    yields only the ``EVENT_FINAL`` event; on a miss every source the mode
+    needs starts at once.
+
+    Args:
+        engine: An ``AIEngine`` instance.
+        query: The search query string.
+        web_search_fn: Web search callable.
+        offline_search_fn: Offline search callable.
+        executor: Pool the sources run on; a shared pool by default.
+        registry: Registry for stage timings; defaults to ``REGISTRY``.
+        router: Optional ``SourceRouter``. In hybrid mode the web is then
+            only started once the offline answer shows it is needed, and
+            the final result carries the 'routing' decision.
+
+    Yields:
+        One event per source that answered before the engine finished, in
+        completion order, then the ``EVENT_FINAL`` event. Closing the
+        generator early stops the events; the lookups already started
+        still finish in the background so the engine is not left waiting.
+    """
+    mode = engine.get_mode()
+    timer = StageTimer(registry)
+    start = time.perf_counter()
+    run = _SourceRun(query, mode, web_search_fn, offline_search_fn,
+                     executor or _default_executor(), timer, router)
+    answer = _default_engine_executor().submit(
+        engine.process_query, query,
+        run.source(STAGE_WEB), run.source(STAGE_OFFLINE))
+    answer.add_done_callback(lambda _future: run.events.put(None))
+
+    while True:
+        event = run.events.get()
+        if event is None:
+            break
+        yield event
+
+    result = answer.result()
+    total = time.perf_counter() - start
+    timings = timer.finish(total, max(0.0, total - run.waited))
+    if isinstance(result, dict):
+        result = dict(result)
+        result["timings"] = timings
+        if run.decision is not None:
+            result["routing"] = run.decision
+    yield {"event": EVENT_FINAL, "query": query, "result": result}
+
+
+def preview_results(results: List[Dict[str, Any]], limit: int = 3,
+                    width: int = 160) -> List[str]:
+    """Render source results as short display lines.
+
+    Args:
+        results: Result dicts from a search callable.
+        limit: Maximum number of results shown.
+        width: Maximum snippet length.
+
+    Returns:
+        One line per result: title, then the snippet or summary if any.
+    """
+    lines = []
+    for item in results[:limit]:
+        if not isinstance(item, dict):
+            lines.append(str(item))
+            continue
+        text = str(item.get("snippet") or item.get("summary")
+                   or item.get("content") or "").strip().replace("\n", " ")
+        if len(text) > width:
+            text = text[:width - 3].rstrip() + "..."
+        title = str(item.get("title", ""))
+        lines.append(f"{title}: {text}" if text else title)
+    return lines
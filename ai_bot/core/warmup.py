@@ -0,0 +1,262 @@
+"""Low-priority background cache warmup.
+
+Driven by the ``performance`` section of config.json:
+
+* ``background_sync`` replays the ``warmup_history_queries`` queries
+  asked most often in recent history through the offline search, filling
+  its result cache.
+* ``preload_database`` reads the offline database ahead into the OS page
+  cache and prefetches the text of the ``warmup_hot_titles`` articles
+  those popular queries lead to, weighted by how often each was asked.
+
+The warmer only reads the search history; it never runs queries through
+the engine, so it neither adds history entries nor shares the engine with
+the foreground. It also stays out of the user's way: before every step it
+waits until no interactive query has run for ``warmup_idle_seconds``.
+Front-ends mark interactive work with ``ACTIVITY``::
+
+    with ACTIVITY.interactive():
+        engine.process_query(query, online_search, offline_search)
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from ai_bot.core.settings import get_setting, resolve_path
+from ai_bot.core.singleflight import normalize_query
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+HistoryFn = Callable[[int], List[Dict[str, Any]]]
+
+# Upper bound on database bytes read ahead into the OS page cache
+PRELOAD_LIMIT_BYTES = 256 * 1024 * 1024
+_CHUNK_BYTES = 1024 * 1024
+
+
+def preload_file(path: Union[str, Path],
+                 limit: int = PRELOAD_LIMIT_BYTES,
+                 should_stop: Optional[Callable[[], bool]] = None) -> int:
+    """Read a file sequentially so the OS keeps its pages cached.
+
+    Args:
+        path: File to read.
+        limit: Maximum number of bytes to read.
+        should_stop: Polled between chunks; reading ends when it is true.
+
+    Returns:
+        Number of bytes read; 0 if the file does not exist.
+    """
+    path = Path(path)
+    if not path.is_file():
+        return 0
+    total = 0
+    with open(path, "rb") as fh:
+        while total < limit:
+            if should_stop is not None and should_stop():
+                break
+            chunk = fh.read(min(_CHUNK_BYTES, limit - total))
+            if not chunk:
+                break
+            total += len(chunk)
+    return total
+
+
+class ActivityMonitor:
+    """Tracks interactive queries so background work can stay out of the way."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._active = 0
+        self._last = float("-inf")
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Mark the enclosed block as an interactive query."""
+        with self._cond:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._last = self._clock()
+                self._cond.notify_all()
+
+    @property
+    def busy(self) -> bool:
+        """True while an interactive query is running."""
+        return self._active > 0
+
+    def wait_idle(self, quiet: float, stop: threading.Event) -> bool:
+        """Block until nothing interactive has run for ``quiet`` seconds.
+
+        Args:
+            quiet: Required idle time in seconds.
+            stop: Event that aborts the wait when set.
+
+        Returns:
+            True once idle, False if ``stop`` was set.
+        """
+        with self._cond:
+            while not stop.is_set():
+                if self._active == 0:
+                    remaining = self._last + quiet - self._clock()
+                    if remaining <= 0:
+                        return True
+                    self._cond.wait(min(remaining, 0.25))
+                else:
+                    self._cond.wait(0.25)
+        return False
+
+
+ACTIVITY = ActivityMonitor()
+
+
+class CacheWarmer:
+    """Replays popular queries and prefetches hot articles in the background."""
+
+    def __init__(self, offline_search_fn: SearchFn,
+                 history_fn: Optional[HistoryFn] = None,
+                 article_fn: Optional[Callable[[str], Any]] = None,
+                 database_path: Optional[Union[str, Path]] = None,
+                 history_queries: int = 20, hot_titles: int = 50,
+                 replay: bool = True, idle_seconds: float = 0.5,
+                 activity: Optional[ActivityMonitor] = None):
+        """Initialize the warmer.
+
+        Args:
+            offline_search_fn: Offline search callable whose result cache
+                is filled from history.
+            history_fn: Returns up to n search history entries, oldest
+                first, e.g. ``AIEngine.get_history``; None to skip both
+                replay and prefetching.
+            article_fn: Loads an article by title, e.g.
+                ``OfflineReader.get_article``; None to skip prefetching.
+            database_path: Offline database file to read into the page
+                cache; None to skip.
+            history_queries: Distinct popular queries to replay.
+            hot_titles: Number of articles to prefetch.
+            replay: Replay the popular queries even when no articles are
+                prefetched; finding the hot titles replays them anyway.
+            idle_seconds: Quiet time required after an interactive query
+                before the next warmup step.
+            activity: Interactive activity monitor; defaults to ``ACTIVITY``.
+        """
+        self.offline_search_fn = offline_search_fn
+        self.history_fn = history_fn
+        self.article_fn = article_fn
+        self.database_path = database_path
+        self.history_queries = history_queries
+        self.hot_titles = hot_titles if article_fn is not None else 0
+        self.replay = replay
+        self.idle_seconds = idle_seconds
+        self.activity = activity or ACTIVITY
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counts = {"preloaded_bytes": 0, "replayed": 0,
+                        "prefetched": 0, "errors": 0}
+
+    @classmethod
+    def from_config(cls, offline_search_fn: SearchFn, config: Dict[str, Any],
+                    history_fn: Optional[HistoryFn] = None,
+                    article_fn: Optional[Callable[[str], Any]] = None
+                    ) -> Optional["CacheWarmer"]:
+        """Build a warmer from the ``performance`` settings.
+
+        Returns:
+            A warmer, or None if both ``preload_database`` and
+            ``background_sync`` are disabled.
+        """
+        preload = bool(get_setting(config, "performance.preload_database", False))
+        sync = bool(get_setting(config, "performance.background_sync", False))
+        if not (preload or sync):
+            return None
+        db_file = get_setting(config, "offline.database_file")
+        return cls(
+            offline_search_fn,
+            history_fn=history_fn,
+            article_fn=article_fn if preload else None,
+            database_path=resolve_path(db_file) if preload and db_file else None,
+            history_queries=int(get_setting(
+                config, "performance.warmup_history_queries", 20)),
+            hot_titles=int(get_setting(config, "performance.warmup_hot_titles", 50)),
+            replay=sync,
+            idle_seconds=float(get_setting(
+                config, "performance.warmup_idle_seconds", 0.5)),
+        )
+
+    def _popular_queries(self) -> List[Tuple[str, int]]:
+        """Most frequent distinct recent queries with their counts."""
+        counts: Counter = Counter()
+        spelling: Dict[str, str] = {}
+        # Over-fetch: popularity needs repeats; newest first so that ties
+        # go to the more recent query
+        for item in reversed(self.history_fn(self.history_queries * 10) or []):
+            query = item.get("query") if isinstance(item, dict) else None
+            if not query:
+                continue
+            key = normalize_query(query)
+            spelling.setdefault(key, query)
+            counts[key] += 1
+        return [(spelling[key], count)
+                for key, count in counts.most_common(self.history_queries)]
+
+    def _idle(self) -> bool:
+        return self.activity.wait_idle(self.idle_seconds, self._stop)
+
+    def run(self) -> None:
+        """Run every warmup step in the calling thread."""
+        if self.database_path and self._idle():
+            self._counts["preloaded_bytes"] = preload_file(
+                self.database_path,
+                should_stop=lambda: self._stop.is_set() or self.activity.busy)
+
+        if self.history_fn is None or not (self.replay or self.hot_titles):
+            return
+        if not self._idle():
+            return
+        hot: Counter = Counter()
+        for query, count in self._step(None, self._popular_queries) or []:
+            if not self._idle():
+                return
+            results = self._step("replayed", self.offline_search_fn, query)
+            for item in results or []:
+                if isinstance(item, dict) and item.get("title"):
+                    hot[str(item["title"])] += count
+
+        for title, _ in hot.most_common(self.hot_titles):
+            if not self._idle():
+                return
+            self._step("prefetched", self.article_fn, title)
+
+    def _step(self, counter: Optional[str], fn: Callable, *args) -> Any:
+        try:
+            result = fn(*args)
+        except Exception:  # pylint: disable=broad-except
+            self._counts["errors"] += 1
+            return None
+        if counter is not None:
+            self._counts[counter] += 1
+        return result
+
+    def start(self) -> "CacheWarmer":
+        """Run the warmup on a daemon thread and return immediately."""
+        self._thread = threading.Thread(
+            target=self.run, name="aibot-cache-warmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the warmer to stop after its current step."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Return warmup progress counters."""
+        return dict(self._counts, running=int(
+            self._thread is not None and self._thread.is_alive()))
@@ -0,0 +1,157 @@
+"""Read-only memory-mapped article store.
+
+A store is two files next to the offline database:
+
+* ``articles.dat`` holds the UTF-8 article bodies back to back;
+* ``articles.idx`` is a 16-byte header (magic, slot count) followed by one
+  ``(offset, length)`` pair of little-endian uint64 per article id, so
+  finding a body is a single fixed-offset read.
+
+``ArticleStore`` maps both files and returns bodies as ``memoryview``
+slices of the mapping: no copy is made until a caller decodes the part it
+actually shows, and every process reading the store shares the same
+pages through the OS page cache. ``ArticleStoreWriter`` builds a store
+(``wiki_to_sqlite.py --article-store``).
+"""
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Union
+
+DATA_FILE = "articles.dat"
+INDEX_FILE = "articles.idx"
+
+_MAGIC = b"AIBSTOR1"
+_HEADER = struct.Struct("<8sQ")
+_ENTRY = struct.Struct("<QQ")
+
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ArticleStore:
+    """Zero-copy reader for an article store directory."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """Map the store's files.
+
+        Args:
+            directory: Folder holding ``articles.idx`` and ``articles.dat``.
+
+        Raises:
+            FileNotFoundError: If the store files do not exist.
+            ValueError: If the index file is not an article store index.
+        """
+        self.directory = Path(directory)
+        self._index = _map(self.directory / INDEX_FILE)
+        if self._index is None or len(self._index) < _HEADER.size:
+            raise ValueError(f"Empty article store index in {self.directory}")
+        magic, self.slots = _HEADER.unpack_from(self._index, 0)
+        if magic != _MAGIC:
+            self._index.close()
+            raise ValueError(f"Not an article store index: {self.directory}")
+        self._data = _map(self.directory / DATA_FILE)
+        self._view = memoryview(self._data) if self._data is not None else None
+
+    @staticmethod
+    def exists(directory: Union[str, Path]) -> bool:
+        """True if ``directory`` holds a store."""
+        directory = Path(directory)
+        return (directory / INDEX_FILE).is_file() and (directory / DATA_FILE).is_file()
+
+    def body(self, article_id: int) -> Optional[memoryview]:
+        """Return an article body as a read-only UTF-8 ``memoryview``.
+
+        Args:
+            article_id: The article's id in the ``articles`` table.
+
+        Returns:
+            A slice of the mapped data file, or None if the id is unknown.
+            Release the view (or drop it) before :meth:`close`.
+        """
+        if not 0 <= article_id < self.slots or self._view is None:
+            return None
+        offset, length = _ENTRY.unpack_from(
+            self._index, _HEADER.size + article_id * _ENTRY.size)
+        if length == 0:
+            return None
+        return self._view[offset:offset + length]
+
+    def text(self, article_id: int, max_bytes: Optional[int] = None) -> Optional[str]:
+        """Decode an article body, or just its first ``max_bytes`` bytes.
+
+        A multi-byte character cut at the limit is dropped rather than
+        decoded as garbage.
+        """
+        view = self.body(article_id)
+        if view is None:
+            return None
+        if max_bytes is not None:
+            view = view[:max_bytes]
+        return str(view, "utf-8", "ignore")
+
+    def __len__(self) -> int:
+        return self.slots
+
+    def close(self) -> None:
+        """Unmap the store; fails if body views are still referenced."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._data is not None:
+            self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> "ArticleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ArticleStoreWriter:
+    """Writes an article store; files appear atomically on :meth:`commit`."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """Start a new store in ``directory``.
+
+        Args:
+            directory: Destination folder, usually the database's folder.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._data_tmp = self.directory / (DATA_FILE + ".tmp")
+        self._data = open(self._data_tmp, "wb")
+        self._entries = {}
+        self._offset = 0
+
+    def add(self, article_id: int, text: str) -> None:
+        """Append one article body."""
+        encoded = text.encode("utf-8")
+        self._data.write(encoded)
+        self._entries[article_id] = (self._offset, len(encoded))
+        self._offset += len(encoded)
+
+    def commit(self) -> int:
+        """Write the index and move both files into place.
+
+        Returns:
+            Number of articles written.
+        """
+        self._data.close()
+        slots = max(self._entries, default=-1) + 1
+        index_tmp = self.directory / (INDEX_FILE + ".tmp")
+        with open(index_tmp, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, slots))
+            table = bytearray(slots * _ENTRY.size)
+            for article_id, (offset, length) in self._entries.items():
+                _ENTRY.pack_into(table, article_id * _ENTRY.size, offset, length)
+            fh.write(table)
+        os.replace(self._data_tmp, self.directory / DATA_FILE)
+        os.replace(index_tmp, self.directory / INDEX_FILE)
+        return len(self._entries)
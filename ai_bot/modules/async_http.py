@@ -0,0 +1,175 @@
+"""Minimal asyncio HTTP client built on stdlib streams.
+
+Provides just enough HTTP/1.1 to talk to JSON search APIs from an event
+loop without pulling in aiohttp: GET requests, Content-Length and chunked
+bodies, gzip/deflate decoding and a per-request timeout.
+"""
+import asyncio
+import json
+import ssl
+import zlib
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from ai_bot.modules.http_client import decode_body
+
+
+class AsyncHTTPError(Exception):
+    """Raised when a request fails or returns a non-2xx status."""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+_SSL_CONTEXT: Optional[ssl.SSLContext] = None
+
+
+def _ssl_context() -> ssl.SSLContext:
+    """Return a shared default SSL context (creation is expensive)."""
+    global _SSL_CONTEXT  # pylint: disable=global-statement
+    if _SSL_CONTEXT is None:
+        _SSL_CONTEXT = ssl.create_default_context()
+    return _SSL_CONTEXT
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    """Read a chunked transfer-encoded body."""
+    parts = []
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            # Consume trailers up to the terminating blank line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            break
+        parts.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+    return b"".join(parts)
+
+
+async def _request(
+    url: str,
+    headers: Dict[str, str],
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Perform a single GET request and return (status, headers, body)."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    host = parts.hostname or ""
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    reader, writer = await asyncio.open_connection(
+        host, port,
+        ssl=_ssl_context() if secure else None,
+        server_hostname=host if secure else None,
+    )
+    try:
+        request_headers = {
+            "Host": parts.netloc,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "close",
+        }
+        request_headers.update(headers)
+        head = f"GET {path} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        ) + "\r\n"
+        writer.write(head.encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        fields = status_line.decode("latin-1").split(None, 2)
+        if len(fields) < 2:
+            raise AsyncHTTPError(f"Malformed status line from {host}")
+        status = int(fields[1])
+
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await _read_chunked(reader)
+        elif "content-length" in response_headers:
+            body = await reader.readexactly(
+                int(response_headers["content-length"]))
+        else:
+            body = await reader.read()
+
+        body = decode_body(body, response_headers.get("content-encoding", ""))
+        return status, response_headers, body
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+
+async def fetch(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10.0,
+) -> bytes:
+    """Fetch a URL and return the decoded response body.
+
+    Args:
+        url: Absolute http or https URL.
+        params: Optional query parameters appended to the URL.
+        headers: Extra request headers.
+        timeout: Overall deadline for the request in seconds.
+
+    Returns:
+        Response body with any content encoding removed.
+
+    Raises:
+        AsyncHTTPError: On connection errors, timeouts, undecodable
+            gzip/deflate bodies or non-2xx status.
+    """
+    if params:
+        sep = "&" if "?" in url else "?"
+        url = f"{url}{sep}{urlencode(params)}"
+    try:
+        status, _, body = await asyncio.wait_for(
+            _request(url, headers or {}), timeout)
+    except asyncio.TimeoutError as exc:
+        raise AsyncHTTPError(f"Request timed out after {timeout}s") from exc
+    except (OSError, ValueError, asyncio.IncompleteReadError, zlib.error) as exc:
+        raise AsyncHTTPError(f"Request failed: {exc}") from exc
+    if not 200 <= status < 300:
+        raise AsyncHTTPError(f"HTTP {status} from {url}", status)
+    return body
+
+
+async def fetch_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10.0,
+) -> Any:
+    """Fetch a URL and parse the body as JSON.
+
+    Args:
+        url: Absolute http or https URL.
+        params: Optional query parameters appended to the URL.
+        headers: Extra request headers.
+        timeout: Overall deadline for the request in seconds.
+
+    Returns:
+        The decoded JSON document.
+
+    Raises:
+        AsyncHTTPError: On transport errors or invalid JSON.
+    """
+    body = await fetch(url, params, headers, timeout)
+    try:
+        return json.loads(body.decode("utf-8"))
+    except ValueError as exc:
+        raise AsyncHTTPError(f"Invalid JSON from {url}") from exc
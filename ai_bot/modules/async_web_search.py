@@ -0,0 +1,86 @@
+"""Asyncio variant of the DuckDuckGo web searcher.
+
+Uses the stdlib streams client in ``async_http`` so an event loop can keep
+thousands of online lookups in flight without one thread per request.
+"""
+from typing import Any, Dict, List, Optional
+
+from ai_bot.core.settings import get_setting, load_config
+from ai_bot.modules.async_http import AsyncHTTPError, fetch_json
+
+
+def parse_duckduckgo(data: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
+    """Convert a DuckDuckGo Instant Answer document into result dicts.
+
+    Args:
+        data: Decoded JSON from the Instant Answer API.
+        limit: Maximum number of results to return.
+
+    Returns:
+        List of dicts with 'title', 'snippet', 'url' and 'source' keys.
+    """
+    results: List[Dict[str, Any]] = []
+    if not isinstance(data, dict):
+        return results
+
+    abstract = data.get("AbstractText") or data.get("Answer")
+    if abstract:
+        results.append({
+            "title": data.get("Heading") or "DuckDuckGo",
+            "snippet": abstract,
+            "url": data.get("AbstractURL", ""),
+            "source": "duckduckgo",
+        })
+
+    topics = list(data.get("RelatedTopics") or [])
+    while topics and len(results) < limit:
+        topic = topics.pop(0)
+        if "Topics" in topic:
+            # Grouped topics nest one level deeper
+            topics.extend(topic.get("Topics") or [])
+            continue
+        text = topic.get("Text")
+        if not text:
+            continue
+        results.append({
+            "title": text.split(" - ", 1)[0],
+            "snippet": text,
+            "url": topic.get("FirstURL", ""),
+            "source": "duckduckgo",
+        })
+    return results[:limit]
+
+
+class AsyncWebSearcher:
+    """Native asyncio web searcher against the DuckDuckGo API."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize from the ``online`` section of the configuration.
+
+        Args:
+            config: Parsed configuration; loaded from config.json if omitted.
+        """
+        config = config if config is not None else load_config()
+        self.api_url = get_setting(
+            config, "online.api_url", "https://api.duckduckgo.com/")
+        self.user_agent = get_setting(config, "online.user_agent", "AI-Bot/1.0")
+        self.timeout = float(get_setting(config, "online.timeout", 10))
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        """Search the web for a query.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            List of result dicts; empty when the request fails.
+        """
+        params = {"q": query, "format": "json",
+                  "no_html": 1, "skip_disambig": 1}
+        try:
+            data = await fetch_json(
+                self.api_url, params,
+                {"User-Agent": self.user_agent}, self.timeout)
+        except AsyncHTTPError:
+            return []
+        return parse_duckduckgo(data)
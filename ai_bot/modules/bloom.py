@@ -0,0 +1,119 @@
+"""Persisted Bloom filter for guaranteed offline misses.
+
+``wiki_to_sqlite.py`` adds every normalized title and every search index
+term to a filter and saves it as ``terms.bloom`` next to the database.
+``OfflineReader.search`` checks it first: if neither the query nor any of
+its terms can be in the database, the query is answered with no results
+without touching SQLite. False positives only cost the usual lookup; there
+are no false negatives.
+
+File layout (little-endian): magic, bit count, hash count, item count,
+then the bit array.
+"""
+import hashlib
+import math
+import re
+import struct
+from pathlib import Path
+from typing import Iterable, List, Union
+
+from ai_bot.core.singleflight import normalize_query
+
+FILTER_FILE = "terms.bloom"
+
+_MAGIC = b"AIBBLOM1"
+_HEADER = struct.Struct("<8sQIQ")
+
+
+def index_terms(text: str) -> List[str]:
+    """Terms ``wiki_to_sqlite.py`` puts in ``search_index`` for ``text``."""
+    return re.findall(r"\w+", text.lower())
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        """Create an empty filter.
+
+        Args:
+            num_bits: Size of the bit array.
+            num_hashes: Bit positions set per item.
+        """
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> "BloomFilter":
+        """Size a filter for ``capacity`` items at a false-positive rate.
+
+        Args:
+            capacity: Expected number of distinct items.
+            fp_rate: Target false-positive probability, e.g. 0.01.
+        """
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        num_hashes = round(num_bits / capacity * math.log(2))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """Add an item."""
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7))
+                   for pos in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the bit array in bytes."""
+        return len(self._bits)
+
+    @property
+    def expected_fp_rate(self) -> float:
+        """False-positive probability at the current item count."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) \
+            ** self.num_hashes
+
+    def might_match(self, query: str) -> bool:
+        """False only if ``query`` can match no title and no index term."""
+        if normalize_query(query) in self:
+            return True
+        return any(term in self for term in index_terms(query))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the filter to ``path`` (atomically replaced)."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+            fh.write(self._bits)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BloomFilter":
+        """Read a filter saved with :meth:`save`.
+
+        Raises:
+            ValueError: If the file is not a Bloom filter.
+        """
+        data = Path(path).read_bytes()
+        magic, num_bits, num_hashes, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a Bloom filter: {path}")
+        bloom = cls(num_bits, num_hashes)
+        bloom.count = count
+        bloom._bits = bytearray(data[_HEADER.size:])
+        return bloom
@@ -0,0 +1,165 @@
+"""Record/replay cassettes for web search responses.
+
+A cassette is a small SQLite file mapping normalized queries to the
+zlib-compressed JSON result list a web searcher returned, together with
+the latency observed when it was recorded. ``RecordingSearch`` captures
+live responses; ``ReplaySearch`` serves them back deterministically, with
+optional simulated latency, so the full ``process_query`` path can be
+load tested without a network.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from ai_bot.core.singleflight import normalize_query
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class CassetteMiss(LookupError):
+    """Raised by strict replay when a query was never recorded."""
+
+
+class Cassette:
+    """SQLite-backed store of recorded search responses."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open (or create) a cassette file.
+
+        Args:
+            path: Location of the cassette database.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                query TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                latency REAL NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def put(self, query: str, results: List[Dict[str, Any]],
+            latency: float) -> None:
+        """Store a response, replacing any earlier recording.
+
+        Args:
+            query: Query as issued; stored normalized.
+            results: Result list returned by the searcher.
+            latency: Seconds the live call took.
+        """
+        payload = zlib.compress(
+            json.dumps(results, ensure_ascii=False,
+                       separators=(",", ":")).encode("utf-8"), 9)
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+            (normalize_query(query), payload, latency, time.time()))
+        conn.commit()
+
+    def get(self, query: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """Return (results, recorded latency) for a query, or None."""
+        row = self._conn().execute(
+            'SELECT payload, latency FROM responses WHERE query = ?',
+            (normalize_query(query),)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8")), row[1]
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            'SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class RecordingSearch:
+    """Pass-through search callable that records every response."""
+
+    def __init__(self, search_fn: SearchFn, cassette: Cassette,
+                 record_empty: bool = False):
+        """Initialize the recorder.
+
+        Args:
+            search_fn: Live search callable.
+            cassette: Cassette to record into.
+            record_empty: Also record empty result lists.
+        """
+        self.search_fn = search_fn
+        self.cassette = cassette
+        self.record_empty = record_empty
+
+    def __call__(self, query: str) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        results = self.search_fn(query)
+        if results or self.record_empty:
+            self.cassette.put(query, results or [], time.perf_counter() - start)
+        return results
+
+
+class ReplaySearch:
+    """Search callable that serves responses from a cassette."""
+
+    def __init__(self, cassette: Cassette,
+                 latency: Union[None, str, float] = None,
+                 strict: bool = False):
+        """Initialize the replayer.
+
+        Args:
+            cassette: Cassette to read from.
+            latency: None for no delay, ``'recorded'`` to sleep for the
+                latency seen at record time, or a fixed number of seconds.
+            strict: Raise ``CassetteMiss`` for unknown queries instead of
+                returning no results.
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.strict = strict
+
+    def __call__(self, query: str) -> List[Dict[str, Any]]:
+        entry = self.cassette.get(query)
+        if entry is None:
+            if self.strict:
+                raise CassetteMiss(query)
+            return []
+        results, recorded = entry
+        if self.latency == "recorded":
+            time.sleep(recorded)
+        elif self.latency:
+            time.sleep(float(self.latency))
+        return results
+
+
+class FallbackSearch:
+    """Try sources in order and return the first non-empty result list."""
+
+    def __init__(self, *search_fns: SearchFn):
+        """Initialize with search callables in priority order."""
+        self.search_fns = search_fns
+
+    def __call__(self, query: str) -> List[Dict[str, Any]]:
+        for search_fn in self.search_fns:
+            try:
+                results = search_fn(query)
+            except Exception:  # pylint: disable=broad-except
+                continue
+            if results:
+                return results
+        return []
@@ -0,0 +1,378 @@
+"""Shared connection-pooled HTTP client.
+
+One ``HTTPClient`` keeps a bounded pool of keep-alive connections per host
+so repeated online queries skip TCP and TLS setup. It also caches DNS results,
+transparently decodes gzip/deflate bodies and reports per-request connect
+and time-to-first-byte timings. Used by the web searcher and by
+``wiki_dumps.py`` for dump downloads.
+"""
+import http.client
+import json
+import socket
+import ssl
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from ai_bot.core.metrics import REGISTRY
+from ai_bot.core.settings import get_setting, load_config
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_DNS_TTL = 300.0
+MAX_REDIRECTS = 5
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Errors that mean a reused keep-alive connection was closed by the peer
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                 BrokenPipeError, http.client.BadStatusLine)
+
+
+def decode_body(body: bytes, encoding: str) -> bytes:
+    """Undo gzip/deflate content encoding.
+
+    Args:
+        body: Raw response body.
+        encoding: Value of the Content-Encoding header.
+
+    Returns:
+        The decoded body (unchanged for identity or unknown encodings).
+    """
+    encoding = (encoding or "").lower()
+    if encoding == "gzip":
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+class DNSCache:
+    """Thread-safe TTL cache of ``getaddrinfo`` results."""
+
+    def __init__(self, ttl: float = DEFAULT_DNS_TTL):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a resolved address list stays valid.
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> List[tuple]:
+        """Return cached ``getaddrinfo`` results for (host, port)."""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, infos)
+        return infos
+
+
+def _connect(dns: DNSCache, host: str, port: int, timeout: float) -> socket.socket:
+    """Open a TCP socket to the first reachable cached address."""
+    last_error: Optional[OSError] = None
+    for family, socktype, proto, _, addr in dns.resolve(host, port):
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.settimeout(timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.connect(addr)
+            return sock
+        except OSError as exc:
+            last_error = exc
+            sock.close()
+    raise last_error or OSError(f"Could not resolve {host}")
+
+
+class _HTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that connects through the shared DNS cache."""
+
+    def __init__(self, host: str, port: int, timeout: float, dns: DNSCache):
+        super().__init__(host, port, timeout=timeout)
+        self._dns = dns
+
+    def connect(self):
+        self.sock = _connect(self._dns, self.host, self.port, self.timeout)
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that connects through the shared DNS cache."""
+
+    def __init__(self, host: str, port: int, timeout: float, dns: DNSCache,
+                 context: ssl.SSLContext):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._dns = dns
+        self._ssl_context = context
+
+    def connect(self):
+        sock = _connect(self._dns, self.host, self.port, self.timeout)
+        self.sock = self._ssl_context.wrap_socket(sock, server_hostname=self.host)
+
+
+class HTTPResponse:
+    """A fully read response with timing information."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes,
+                 timings: Dict[str, float]):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.timings = timings
+
+    @property
+    def ok(self) -> bool:
+        """True for 2xx statuses."""
+        return 200 <= self.status < 300
+
+    def text(self, encoding: str = "utf-8") -> str:
+        """Return the body decoded as text."""
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self) -> Any:
+        """Return the body parsed as JSON."""
+        return json.loads(self.body.decode("utf-8"))
+
+
+class HTTPClient:
+    """Keep-alive connection pool with DNS reuse and timing metrics."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = 10.0, user_agent: str = "AI-Bot/1.0",
+                 dns_ttl: float = DEFAULT_DNS_TTL):
+        """Initialize the client.
+
+        Args:
+            pool_size: Maximum connections open per host, in use or idle;
+                further requests wait up to their timeout for one.
+            timeout: Default socket timeout in seconds.
+            user_agent: Default User-Agent header.
+            dns_ttl: Seconds to reuse DNS results.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.dns = DNSCache(dns_ttl)
+        self._ssl_context = ssl.create_default_context()
+        self._pools: Dict[Tuple[str, str, int], Deque[http.client.HTTPConnection]] = {}
+        self._open_counts: Dict[Tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._counts = {"requests": 0, "connections_opened": 0,
+                        "connections_reused": 0, "pool_timeouts": 0}
+
+    def _acquire(self, scheme: str, host: str, port: int,
+                 timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """Check out an idle connection, or open one if the host has room."""
+        key = (scheme, host, port)
+        deadline = time.monotonic() + timeout
+        with self._available:
+            while True:
+                pool = self._pools.get(key)
+                if pool:
+                    conn = pool.pop()
+                    self._counts["connections_reused"] += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                if self._open_counts.get(key, 0) < self.pool_size:
+                    self._open_counts[key] = self._open_counts.get(key, 0) + 1
+                    self._counts["connections_opened"] += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counts["pool_timeouts"] += 1
+                    raise TimeoutError(
+                        f"No free connection to {host}:{port} within {timeout}s")
+                self._available.wait(remaining)
+        if scheme == "https":
+            conn = _HTTPSConnection(host, port, timeout, self.dns, self._ssl_context)
+        else:
+            conn = _HTTPConnection(host, port, timeout, self.dns)
+        return conn, False
+
+    def _release(self, scheme: str, host: str, port: int,
+                 conn: http.client.HTTPConnection, reusable: bool = True) -> None:
+        """Return a checked-out connection to the idle pool, or close it."""
+        key = (scheme, host, port)
+        with self._available:
+            if reusable:
+                self._pools.setdefault(key, deque()).append(conn)
+            else:
+                self._open_counts[key] -= 1
+            self._available.notify()
+        if not reusable:
+            conn.close()
+
+    def _open(self, url: str, params: Optional[Dict[str, Any]],
+              headers: Optional[Dict[str, str]], timeout: Optional[float],
+              accept_encoding: bool):
+        """Send a GET, following redirects.
+
+        Returns:
+            (conn, response, pool key, timings, start) for the final hop.
+        """
+        if params:
+            sep = "&" if "?" in url else "?"
+            url = f"{url}{sep}{urlencode(params)}"
+        request_headers = {"User-Agent": self.user_agent}
+        if accept_encoding:
+            request_headers["Accept-Encoding"] = "gzip, deflate"
+        request_headers.update(headers or {})
+        timeout = timeout if timeout is not None else self.timeout
+
+        for _ in range(MAX_REDIRECTS + 1):
+            conn, response, key, timings, start = self._send(
+                url, request_headers, timeout)
+            location = response.getheader("Location")
+            if response.status not in _REDIRECT_STATUSES or not location:
+                return conn, response, key, timings, start
+            response.read()
+            self._release(*key, conn, reusable=not response.will_close)
+            url = urljoin(url, location)
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+
+    def _send(self, url: str, request_headers: Dict[str, str], timeout: float):
+        """Send one GET, retrying once if a reused connection went stale."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        for attempt in range(2):
+            conn, reused = self._acquire(scheme, host, port, timeout)
+            start = time.perf_counter()
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                connected = time.perf_counter()
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+            except _STALE_ERRORS:
+                self._release(scheme, host, port, conn, reusable=False)
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                self._release(scheme, host, port, conn, reusable=False)
+                raise
+            first_byte = time.perf_counter()
+            timings = {
+                "connect": connected - start,
+                "ttfb": first_byte - connected,
+                "reused": reused,
+            }
+            with self._lock:
+                self._counts["requests"] += 1
+            REGISTRY.observe("http_connect", timings["connect"])
+            REGISTRY.observe("http_ttfb", timings["ttfb"])
+            return conn, response, (scheme, host, port), timings, start
+        raise http.client.HTTPException("Connection could not be established")
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> HTTPResponse:
+        """Perform a GET request over a pooled connection.
+
+        Args:
+            url: Absolute http or https URL.
+            params: Optional query parameters.
+            headers: Extra request headers.
+            timeout: Socket timeout; defaults to the client timeout.
+
+        Returns:
+            The response with a decoded body and 'connect', 'ttfb' and
+            'total' timings in seconds plus a 'reused' flag.
+        """
+        conn, response, key, timings, start = self._open(
+            url, params, headers, timeout, accept_encoding=True)
+        try:
+            body = response.read()
+        except Exception:
+            self._release(*key, conn, reusable=False)
+            raise
+        response_headers = {k.lower(): v for k, v in response.getheaders()}
+        self._release(*key, conn, reusable=not response.will_close)
+        timings["total"] = time.perf_counter() - start
+        body = decode_body(body, response_headers.get("content-encoding", ""))
+        return HTTPResponse(response.status, response_headers, body, timings)
+
+    @contextmanager
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None,
+               timeout: Optional[float] = None) -> Iterator[http.client.HTTPResponse]:
+        """Open a GET request for incremental reading (e.g. large downloads).
+
+        The body is not content-decoded. The connection returns to the pool
+        if the body was read to the end.
+
+        Args:
+            url: Absolute http or https URL.
+            headers: Extra request headers.
+            timeout: Socket timeout; defaults to the client timeout.
+
+        Yields:
+            The raw ``http.client.HTTPResponse``.
+        """
+        conn, response, key, _, _ = self._open(
+            url, None, headers, timeout, accept_encoding=False)
+        try:
+            yield response
+        except BaseException:
+            self._release(*key, conn, reusable=False)
+            raise
+        self._release(*key, conn,
+                      reusable=response.isclosed() and not response.will_close)
+
+    def stats(self) -> Dict[str, int]:
+        """Return request and connection reuse counters."""
+        with self._lock:
+            stats = dict(self._counts)
+            stats["idle_connections"] = sum(len(p) for p in self._pools.values())
+            stats["open_connections"] = sum(self._open_counts.values())
+        return stats
+
+    def close(self) -> None:
+        """Close all idle pooled connections."""
+        with self._available:
+            pools, self._pools = self._pools, {}
+            for key, pool in pools.items():
+                self._open_counts[key] -= len(pool)
+            self._available.notify_all()
+        for pool in pools.values():
+            for conn in pool:
+                conn.close()
+
+
+_DEFAULT_CLIENT: Optional[HTTPClient] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_client() -> HTTPClient:
+    """Return the process-wide shared client, creating it on first use."""
+    global _DEFAULT_CLIENT  # pylint: disable=global-statement
+    with _DEFAULT_LOCK:
+        if _DEFAULT_CLIENT is None:
+            config = load_config()
+            _DEFAULT_CLIENT = HTTPClient(
+                pool_size=int(get_setting(
+                    config, "online.http_pool_size", DEFAULT_POOL_SIZE)),
+                timeout=float(get_setting(config, "online.timeout", 10)),
+                user_agent=get_setting(config, "online.user_agent", "AI-Bot/1.0"),
+            )
+            REGISTRY.add_collector("http", _DEFAULT_CLIENT.stats)
+        return _DEFAULT_CLIENT
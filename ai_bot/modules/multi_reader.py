@@ -0,0 +1,238 @@
+"""Fan-out reader over several per-language offline databases.
+
+``wiki_to_sqlite.py --lang en,de,fr`` builds one database per language
+under ``<outdir>/<lang>/``. ``MultiLanguageReader`` opens an
+:class:`OfflineReader` for each and queries them concurrently, so a
+multilingual lookup costs about as much as the slowest language rather
+than the sum of all of them.
+
+Languages are listed in priority order. Results that arrive within the
+deadline are merged rank by rank: every language's best hit comes before
+any language's second hit, and ties go to the higher-priority language.
+A language that misses the deadline is left out of that answer and
+counted in ``stats()``. Its call keeps running in the background; while a
+language has ``max_pending`` such calls outstanding it is skipped, so a
+stalled database cannot tie up the shared threads.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai_bot.core.settings import get_setting, resolve_path
+from ai_bot.modules.offline_reader import OfflineReader
+
+DEFAULT_DATABASE_PATTERN = "data/wiki_dumps/{lang}/wikipedia.db"
+DEFAULT_DEADLINE = 0.25
+DEFAULT_MAX_PENDING = 4
+
+
+class MultiLanguageReader:
+    """Queries per-language ``OfflineReader`` instances in parallel."""
+
+    thread_safe = True
+
+    def __init__(self, readers: Dict[str, OfflineReader],
+                 max_results: int = 5,
+                 deadline: float = DEFAULT_DEADLINE,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 workers: Optional[int] = None):
+        """Initialize the reader.
+
+        Args:
+            readers: Reader per language code, in priority order.
+            max_results: Maximum number of merged search results.
+            deadline: Seconds to wait for the languages before answering
+                with what has arrived.
+            max_pending: Calls a language may have running at once,
+                including stragglers past the deadline; further calls
+                skip it until one returns.
+            workers: Fan-out threads; defaults to ``max_pending`` per
+                language, so no call ever queues behind another.
+        """
+        self.readers = dict(readers)
+        self.languages = list(self.readers)
+        self.max_results = max_results
+        self.deadline = deadline
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or max(1, self.max_pending * len(self.readers)),
+            thread_name_prefix="aibot-lang")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {lang: 0 for lang in self.languages}
+        self._late: Dict[str, int] = {lang: 0 for lang in self.languages}
+        self._failed: Dict[str, int] = {lang: 0 for lang in self.languages}
+        self._skipped: Dict[str, int] = {lang: 0 for lang in self.languages}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    languages: Optional[Sequence[str]] = None) -> "MultiLanguageReader":
+        """Open the databases listed in ``offline.languages``.
+
+        Each language's database is ``offline.language_database_pattern``
+        with ``{lang}`` filled in; languages without a built database are
+        skipped.
+
+        Args:
+            config: Parsed configuration dictionary.
+            languages: Language codes in priority order; defaults to
+                ``offline.languages``.
+        """
+        if languages is None:
+            languages = get_setting(config, "offline.languages", []) or []
+        pattern = get_setting(config, "offline.language_database_pattern",
+                              DEFAULT_DATABASE_PATTERN)
+        readers = {}
+        for lang in languages:
+            reader = OfflineReader.from_config(
+                config, db_path=resolve_path(pattern.format(lang=lang)))
+            if reader.initialized:
+                readers[lang] = reader
+            else:
+                reader.close()
+        return cls(
+            readers,
+            max_results=int(get_setting(config, "offline.max_results", 5)),
+            deadline=float(get_setting(
+                config, "offline.fanout_deadline_seconds", DEFAULT_DEADLINE)),
+            max_pending=int(get_setting(
+                config, "offline.fanout_max_pending", DEFAULT_MAX_PENDING)),
+        )
+
+    @property
+    def initialized(self) -> bool:
+        """True if at least one language database is available."""
+        return any(reader.initialized for reader in self.readers.values())
+
+    @property
+    def generation(self) -> str:
+        """Combined build ids of all languages."""
+        return ",".join(f"{lang}:{reader.generation}"
+                        for lang, reader in self.readers.items())
+
+    def _finished(self, lang: str) -> None:
+        with self._lock:
+            self._pending[lang] -= 1
+
+    def _fan_out(self, method: str, *args: Any) -> Dict[str, Any]:
+        """Call ``method`` on every reader; return what finished in time."""
+        futures = {}
+        for lang, reader in self.readers.items():
+            with self._lock:
+                if self._pending[lang] >= self.max_pending:
+                    self._skipped[lang] += 1
+                    continue
+                self._pending[lang] += 1
+            future = self._executor.submit(getattr(reader, method), *args)
+            future.add_done_callback(lambda _future, lang=lang: self._finished(lang))
+            futures[future] = lang
+        done, pending = wait(futures, timeout=self.deadline)
+        answers: Dict[str, Any] = {}
+        with self._lock:
+            for future in pending:
+                # Let it finish in the background; its result is dropped
+                self._late[futures[future]] += 1
+            for future in done:
+                lang = futures[future]
+                if future.exception() is not None:
+                    self._failed[lang] += 1
+                else:
+                    answers[lang] = future.result()
+        return answers
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Search all languages concurrently and merge by rank and priority.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            Merged result dicts, each with an added 'language' key.
+        """
+        answers = self._fan_out("search", query)
+        ranked = []
+        for priority, lang in enumerate(self.languages):
+            for rank, item in enumerate(answers.get(lang) or []):
+                ranked.append((rank, priority, lang, item))
+        ranked.sort(key=lambda entry: entry[:2])
+        merged = []
+        for _, _, lang, item in ranked[:self.max_results]:
+            item = dict(item)
+            item["language"] = lang
+            merged.append(item)
+        return merged
+
+    def similar(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the ``k`` most similar articles across all languages.
+
+        Merged by cosine score, ties going to the higher-priority language.
+        """
+        answers = self._fan_out("similar", query, k)
+        ranked = []
+        for priority, lang in enumerate(self.languages):
+            for item in answers.get(lang) or []:
+                ranked.append((-item.get("score", 0.0), priority, lang, item))
+        ranked.sort(key=lambda entry: entry[:2])
+        merged = []
+        for _, _, lang, item in ranked[:k]:
+            item = dict(item)
+            item["language"] = lang
+            merged.append(item)
+        return merged
+
+    def get_article(self, title: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """Return the article from the highest-priority language having it.
+
+        All languages are asked at once; one that misses the deadline is
+        passed over in favour of the next that has the article.
+        """
+        answers = self._fan_out("get_article", title, max_chars)
+        for lang in self.languages:
+            if answers.get(lang) is not None:
+                return answers[lang]
+        return None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return title completions from all languages, priority first."""
+        answers = self._fan_out("suggest", prefix, limit)
+        titles: List[str] = []
+        for lang in self.languages:
+            titles.extend(answers.get(lang) or [])
+        return list(dict.fromkeys(titles))[:limit]
+
+    def list_articles(self, limit: int = 20,
+                      after: Optional[str] = None) -> List[str]:
+        """Return a page of titles across all languages in title order.
+
+        Every language is paged from the same keyset, so passing the last
+        title of a page as ``after`` continues the merged listing. Titles
+        present in several languages are listed once.
+        """
+        titles = set()
+        for reader in self.readers.values():
+            titles.update(reader.list_articles(limit, after))
+        return sorted(titles)[:limit]
+
+    def get_article_count(self) -> int:
+        """Return the number of articles across all languages."""
+        return sum(reader.get_article_count() for reader in self.readers.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Return per-language reader counters, fan-out misses and skips."""
+        stats: Dict[str, int] = {}
+        for lang, reader in self.readers.items():
+            for key, value in reader.stats().items():
+                stats[f"{lang}_{key}"] = value
+        with self._lock:
+            for lang in self.languages:
+                stats[f"{lang}_late"] = self._late[lang]
+                stats[f"{lang}_failed"] = self._failed[lang]
+                stats[f"{lang}_skipped"] = self._skipped[lang]
+                stats[f"{lang}_pending"] = self._pending[lang]
+        return stats
+
+    def close(self) -> None:
+        """Stop the fan-out threads and close every language database."""
+        self._executor.shutdown(wait=True)
+        for reader in self.readers.values():
+            reader.close()
+
@@ -0,0 +1,742 @@
+"""Concurrent read-only access to the offline Wikipedia database.
+
+``OfflineReader`` is a drop-in for ``WikipediaOffline``'s read methods
+(``search``, ``list_articles``, ``get_article_count``) over a database
+built by ``wiki_to_sqlite.py``. Every thread gets its own read-only
+connection from a ``ReadOnlyConnectionPool`` (``mode=ro`` URI,
+``query_only``, tuned page cache and memory map), so GUI workers, the
+query server and batch jobs read in parallel instead of serializing on
+one connection. The builder puts the database in WAL mode and publishes
+rebuilds side by side through a ``CURRENT`` pointer file, which readers
+pick up without a restart, as they do a rebuild made in place.
+"""
+import itertools
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from ai_bot.core.metrics import REGISTRY
+from ai_bot.core.settings import get_setting, resolve_path
+from ai_bot.core.singleflight import normalize_query
+from ai_bot.modules.article_store import DATA_FILE as STORE_DATA_FILE
+from ai_bot.modules.article_store import INDEX_FILE as STORE_INDEX_FILE
+from ai_bot.modules.article_store import ArticleStore
+from ai_bot.modules.bloom import FILTER_FILE, BloomFilter
+from ai_bot.modules.similarity import INDEX_DIR as SIMILARITY_DIR
+from ai_bot.modules.similarity import SimilarityIndex
+from ai_bot.modules.title_index import INDEX_FILE as TITLE_INDEX_FILE
+from ai_bot.modules.title_index import TitleIndex
+
+POINTER_FILE = "CURRENT"
+
+DEFAULT_CACHE_MB = 64
+DEFAULT_MMAP_MB = 256
+# Cosine scores below this are too weak a match to offer as an answer
+DEFAULT_SIMILARITY_MIN_SCORE = 0.1
+SUMMARY_BYTES = 500
+
+# Read-side files next to the database; the builder replaces each by rename
+_SIDECARS = (TITLE_INDEX_FILE, FILTER_FILE, STORE_INDEX_FILE, STORE_DATA_FILE,
+             SIMILARITY_DIR)
+_SNAPSHOT_IDS = itertools.count()
+
+
+class ReadOnlyConnectionPool:
+    """One read-only SQLite connection per thread."""
+
+    def __init__(self, db_path: Union[str, Path],
+                 cache_size_mb: int = DEFAULT_CACHE_MB,
+                 mmap_size_mb: int = DEFAULT_MMAP_MB):
+        """Initialize the pool; connections are opened on first use.
+
+        Args:
+            db_path: SQLite database file.
+            cache_size_mb: Page cache per connection.
+            mmap_size_mb: Bytes of the file each connection memory-maps;
+                mapped pages are shared through the OS page cache.
+        """
+        self.db_path = Path(db_path)
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _open(self) -> sqlite3.Connection:
+        uri = f"file:{quote(self.db_path.resolve().as_posix())}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=30)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_mb) * 1024}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close every connection handed out by this pool.
+
+        Threads that call :meth:`connection` afterwards get a new one.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+
+class _ResultCache:
+    """Thread-safe LRU of search results keyed by (build, query)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            if key[0] != self.generation:
+                # Everything cached so far belongs to another build
+                self._entries.clear()
+                self.generation = key[0]
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def resolve_database(db_path: Union[str, Path]) -> Path:
+    """Return the live database for a configured path.
+
+    ``wiki_to_sqlite.py`` builds side by side and publishes a build by
+    rewriting the ``CURRENT`` pointer file next to the configured path;
+    without a pointer the configured path itself is used.
+    """
+    db_path = Path(db_path)
+    pointer = db_path.parent / POINTER_FILE
+    try:
+        target = pointer.read_text(encoding="utf-8").strip()
+    except OSError:
+        return db_path
+    return db_path.parent / target / db_path.name if target else db_path
+
+
+def _build_stamp(db_path: Union[str, Path]) -> Tuple[Any, ...]:
+    """Identify the files of a build: the database, its WAL and sidecars.
+
+    Rewriting any of them, in place or by rename, changes the stamp; a
+    rebuild with ``--in-place`` writes all of them.
+    """
+    db_path = Path(db_path)
+    paths = [db_path, db_path.with_name(db_path.name + "-wal")]
+    paths += [db_path.parent / name for name in _SIDECARS]
+    stamp: List[Any] = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+class _Snapshot:
+    """One database build as opened, and everything opened for it."""
+
+    def __init__(self, db_path: Path, cache_size_mb: int, mmap_size_mb: int,
+                 preload_titles: bool, use_bloom_filter: bool):
+        self.db_path = db_path
+        # Taken before anything is read, so a rewrite while opening shows
+        self.stamp = _build_stamp(db_path)
+        self.id = next(_SNAPSHOT_IDS)
+        self.pool = ReadOnlyConnectionPool(db_path, cache_size_mb, mmap_size_mb)
+        self.title_index: Optional[TitleIndex] = None
+        title_file = db_path.parent / TITLE_INDEX_FILE
+        if preload_titles and title_file.is_file():
+            self.title_index = TitleIndex.load(title_file)
+        self.bloom: Optional[BloomFilter] = None
+        bloom_file = db_path.parent / FILTER_FILE
+        if use_bloom_filter and bloom_file.is_file():
+            self.bloom = BloomFilter.load(bloom_file)
+        self.store: Optional[ArticleStore] = None
+        if ArticleStore.exists(db_path.parent):
+            self.store = ArticleStore(db_path.parent)
+        self._similarity: Optional[SimilarityIndex] = None
+        self._similarity_checked = False
+        self._users = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    @property
+    def similarity(self) -> Optional[SimilarityIndex]:
+        """TF-IDF index of this build, opened on first use."""
+        if not self._similarity_checked:
+            with self._lock:
+                if not self._similarity_checked:
+                    if SimilarityIndex.exists(self.db_path.parent):
+                        self._similarity = SimilarityIndex(self.db_path.parent)
+                    self._similarity_checked = True
+        return self._similarity
+
+    def acquire(self) -> "_Snapshot":
+        with self._lock:
+            self._users += 1
+        return self
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            drained = self._retired and self._users == 0
+        if drained:
+            self._close()
+
+    def retire(self) -> None:
+        """Close once the queries still running on this build finish."""
+        with self._lock:
+            self._retired = True
+            drained = self._users == 0
+        if drained:
+            self._close()
+
+    def _close(self) -> None:
+        self.pool.close()
+        if self.store is not None:
+            try:
+                self.store.close()
+            except BufferError:
+                pass  # a caller still holds a body view; unmapped on GC
+            self.store = None
+        self._similarity = None
+
+
+class OfflineReader:
+    """Thread-safe reader for a ``wiki_to_sqlite.py`` database.
+
+    The reader follows the ``CURRENT`` pointer written by the builder:
+    when a new build is published, or the current one is rebuilt in place,
+    it is opened in the background, swapped in atomically, and the
+    previous snapshot is closed as soon as the queries still using it
+    complete.
+    """
+
+    # Safe to share between threads, unlike ``WikipediaOffline``
+    thread_safe = True
+
+    def __init__(self, db_path: Union[str, Path],
+                 cache_size_mb: int = DEFAULT_CACHE_MB,
+                 mmap_size_mb: int = DEFAULT_MMAP_MB,
+                 max_results: int = 5,
+                 preload_titles: bool = False,
+                 use_bloom_filter: bool = True,
+                 result_cache_size: int = 1024,
+                 reload_interval: float = 1.0,
+                 similarity_fallback: bool = False,
+                 similarity_min_score: float = DEFAULT_SIMILARITY_MIN_SCORE):
+        """Initialize the reader.
+
+        Args:
+            db_path: SQLite database file, or where it would be if built
+                in place; a ``CURRENT`` pointer next to it takes precedence.
+            cache_size_mb: Page cache per connection.
+            mmap_size_mb: Memory-mapped bytes per connection.
+            max_results: Maximum number of search results.
+            preload_titles: Load the compact title index (``titles.idx``)
+                now, so title lookups are answered from memory.
+            use_bloom_filter: Consult ``terms.bloom`` before searching, so
+                queries that cannot match skip SQLite entirely.
+            result_cache_size: Search result sets kept in memory; 0
+                disables the cache.
+            reload_interval: Minimum seconds between checks for a newly
+                published build; 0 disables hot-swapping.
+            similarity_fallback: Answer searches without a title or
+                keyword match from the TF-IDF index, when one was built.
+            similarity_min_score: Cosine score below which similar
+                articles are dropped rather than offered as an answer.
+        """
+        self.configured_path = Path(db_path)
+        self.max_results = max_results
+        self.reload_interval = reload_interval
+        self.similarity_fallback = similarity_fallback
+        self.similarity_min_score = similarity_min_score
+        self._options = (cache_size_mb, mmap_size_mb, preload_titles, use_bloom_filter)
+        self._snapshot = _Snapshot(resolve_database(self.configured_path), *self._options)
+        self._swap_lock = threading.Lock()
+        self._swapping = False
+        self._next_check = time.monotonic() + reload_interval
+        self._count: Optional[int] = None
+        self._count_generation: Optional[str] = None
+        self._seen = threading.local()
+        self.results = _ResultCache(result_cache_size) if result_cache_size > 0 else None
+        self.bloom_skips = 0
+        self.similarity_fallbacks = 0
+        self.swaps = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    db_path: Optional[Union[str, Path]] = None) -> "OfflineReader":
+        """Create a reader from the ``offline`` settings.
+
+        Args:
+            config: Parsed configuration dictionary.
+            db_path: Database to open; defaults to ``offline.database_file``.
+        """
+        if db_path is None:
+            db_path = resolve_path(get_setting(
+                config, "offline.database_file", "data/wikipedia/wikipedia.db"))
+        return cls(
+            db_path,
+            cache_size_mb=int(get_setting(
+                config, "offline.cache_size_mb", DEFAULT_CACHE_MB)),
+            mmap_size_mb=int(get_setting(
+                config, "offline.mmap_size_mb", DEFAULT_MMAP_MB)),
+            max_results=int(get_setting(config, "offline.max_results", 5)),
+            preload_titles=bool(get_setting(
+                config, "performance.preload_database", False)),
+            use_bloom_filter=bool(get_setting(config, "offline.bloom_filter", True)),
+            result_cache_size=int(get_setting(
+                config, "offline.result_cache_size", 1024)),
+            reload_interval=float(get_setting(
+                config, "offline.reload_interval_seconds", 1.0)),
+            similarity_fallback=bool(get_setting(
+                config, "offline.similarity_fallback", False)),
+            similarity_min_score=float(get_setting(
+                config, "offline.similarity_min_score",
+                DEFAULT_SIMILARITY_MIN_SCORE)),
+        )
+
+    @property
+    def db_path(self) -> Path:
+        """The database file currently being served."""
+        return self._snapshot.db_path
+
+    @property
+    def pool(self) -> ReadOnlyConnectionPool:
+        """Connection pool of the current build."""
+        return self._snapshot.pool
+
+    @property
+    def store(self) -> Optional[ArticleStore]:
+        """The memory-mapped article store of the current build, if built."""
+        return self._snapshot.store
+
+    @property
+    def title_index(self) -> Optional[TitleIndex]:
+        """In-memory title index of the current build, if loaded."""
+        return self._snapshot.title_index
+
+    @property
+    def bloom(self) -> Optional[BloomFilter]:
+        """Negative-lookup filter of the current build, if present."""
+        return self._snapshot.bloom
+
+    @property
+    def initialized(self) -> bool:
+        """True if the database file exists."""
+        return self.db_path.is_file()
+
+    def setup_database(self) -> None:
+        """Readers never create data; build it with ``wiki_to_sqlite.py``.
+
+        Raises:
+            FileNotFoundError: If the database has not been built yet.
+        """
+        if not self.initialized:
+            raise FileNotFoundError(
+                f"Offline database not found: {self.db_path} "
+                "(build it with wiki_to_sqlite.py)")
+
+    def _check_for_swap(self) -> None:
+        """Start reopening a new or rewritten build, at most once per interval."""
+        if not self.reload_interval or time.monotonic() < self._next_check:
+            return
+        with self._swap_lock:
+            if self._swapping or time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.reload_interval
+            target = resolve_database(self.configured_path)
+            if not target.is_file():
+                return
+            if (target == self._snapshot.db_path
+                    and _build_stamp(target) == self._snapshot.stamp):
+                return
+            self._swapping = True
+        # Loading indexes for the new build happens off the query path
+        threading.Thread(target=self._swap, args=(target,),
+                         name="aibot-offline-swap", daemon=True).start()
+
+    def _swap(self, target: Path) -> None:
+        try:
+            fresh = _Snapshot(target, *self._options)
+        except Exception:  # pylint: disable=broad-except
+            with self._swap_lock:
+                self._swapping = False
+            return
+        with self._swap_lock:
+            old, self._snapshot = self._snapshot, fresh
+            self._swapping = False
+            self.swaps += 1
+        old.retire()
+
+    @contextmanager
+    def _use(self) -> Iterator[_Snapshot]:
+        """Pin the current build for the duration of one operation."""
+        self._check_for_swap()
+        with self._swap_lock:
+            snap = self._snapshot.acquire()
+        try:
+            yield snap
+        finally:
+            snap.release()
+
+    @staticmethod
+    def _article_id(snap: _Snapshot, title: str) -> Optional[int]:
+        row = snap.pool.connection().execute(
+            'SELECT id FROM articles WHERE title = ?', (title,)).fetchone()
+        return row[0] if row else None
+
+    def article_body(self, title: str) -> Optional[memoryview]:
+        """Return an article body as UTF-8 bytes without copying it.
+
+        Args:
+            title: Exact article title.
+
+        Returns:
+            A ``memoryview`` into the article store, or None if the title
+            is unknown or no store was built; decode only what is shown.
+        """
+        with self._use() as snap:
+            if snap.store is None:
+                return None
+            article_id = self._article_id(snap, title)
+            return None if article_id is None else snap.store.body(article_id)
+
+    def get_article(self, title: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """Return an article's text, or only its first ``max_chars`` chars.
+
+        Bodies come from the article store when present, decoding just the
+        requested prefix; otherwise from the ``content`` column.
+        """
+        with self._use() as snap:
+            if snap.store is not None:
+                article_id = self._article_id(snap, title)
+                if article_id is None:
+                    return None
+                # UTF-8 needs at most 4 bytes per character
+                text = snap.store.text(
+                    article_id, None if max_chars is None else max_chars * 4)
+                return text if max_chars is None or text is None else text[:max_chars]
+            row = snap.pool.connection().execute(
+                'SELECT content FROM articles WHERE title = ?', (title,)).fetchone()
+        if row is None:
+            return None
+        return row[0] if max_chars is None else row[0][:max_chars]
+
+    def _generation(self, snap: _Snapshot) -> str:
+        version = snap.pool.connection().execute(
+            'PRAGMA data_version').fetchone()[0]
+        if getattr(self._seen, "key", None) != (snap, version):
+            metadata = self._metadata(snap)
+            self._seen.generation = metadata.get(
+                "generation", metadata.get("built_at", ""))
+            self._seen.key = (snap, version)
+        return self._seen.generation
+
+    @property
+    def generation(self) -> str:
+        """Build id stamped into the database by ``wiki_to_sqlite.py``.
+
+        Re-read only after a swap, or when SQLite's ``data_version`` shows
+        that another connection changed the database in place, so the
+        check is nearly free.
+        """
+        with self._use() as snap:
+            return self._generation(snap)
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Search articles by title, then by title keywords.
+
+        Results are cached per opened build and generation, so repeated
+        queries are served from memory until the database is rebuilt.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            List of result dicts with 'title', 'summary' and 'source'.
+        """
+        with self._use() as snap:
+            if self.results is None:
+                return self._search(snap, query)
+            key = ((snap.id, self._generation(snap)), normalize_query(query))
+            results = self.results.get(key)
+            if results is None:
+                results = self._search(snap, query)
+                self.results.put(key, results)
+        # Callers may annotate result dicts; keep the cached ones pristine
+        return [dict(item) for item in results]
+
+    def _search(self, snap: _Snapshot, query: str) -> List[Dict[str, Any]]:
+        if snap.bloom is not None and not snap.bloom.might_match(query):
+            self.bloom_skips += 1
+            return self._fallback(snap, query)
+        conn = snap.pool.connection()
+        store = snap.store
+        # With a store, summaries are decoded from the mapped bodies instead
+        # of being copied out of SQLite
+        summary = "NULL" if store is not None else "a.summary"
+        if snap.title_index is not None:
+            # Case-insensitive title hits from memory, exact case first
+            title = query.strip()
+            hits = sorted(snap.title_index.lookup_casefold(title),
+                          key=lambda hit: hit[1] != title)[:self.max_results]
+            rows = [self._row(conn, article_id, summary) for article_id, _ in hits]
+            rows = [row for row in rows if row is not None]
+        else:
+            rows = conn.execute(
+                f'SELECT a.id, a.title, {summary} FROM articles a '
+                'WHERE a.title = ?', (query.strip(),)).fetchall()
+        keywords = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+        if keywords and len(rows) < self.max_results:
+            placeholders = ",".join("?" * len(keywords))
+            rows += conn.execute(
+                f'''SELECT a.id, a.title, {summary} FROM search_index s
+                    JOIN articles a ON a.id = s.article_id
+                    WHERE s.keyword IN ({placeholders})
+                    GROUP BY a.id ORDER BY COUNT(*) DESC, a.title
+                    LIMIT ?''',
+                (*keywords, self.max_results + len(rows))).fetchall()
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        for article_id, title, text in rows:
+            if article_id in seen:
+                continue
+            seen.add(article_id)
+            results.append(self._result(snap, article_id, title, text))
+            if len(results) >= self.max_results:
+                break
+        return results or self._fallback(snap, query)
+
+    @staticmethod
+    def _result(snap: _Snapshot, article_id: int, title: str,
+                text: Optional[str]) -> Dict[str, Any]:
+        if snap.store is not None:
+            text = snap.store.text(article_id, SUMMARY_BYTES)
+        return {"title": title, "summary": text or "", "source": "wikipedia"}
+
+    def _fallback(self, snap: _Snapshot, query: str) -> List[Dict[str, Any]]:
+        if not self.similarity_fallback or snap.similarity is None:
+            return []
+        results = self._similar(snap, query, self.max_results)
+        if results:
+            self.similarity_fallbacks += 1
+        return results
+
+    def _similar(self, snap: _Snapshot, query: str, k: int) -> List[Dict[str, Any]]:
+        index = snap.similarity
+        if index is None:
+            return []
+        conn = snap.pool.connection()
+        summary = "NULL" if snap.store is not None else "a.summary"
+        results = []
+        for article_id, score in index.top_k(query, k):
+            if score < self.similarity_min_score:
+                break  # best first, so the rest score lower still
+            row = self._row(conn, article_id, summary)
+            if row is not None:
+                result = self._result(snap, *row)
+                result["score"] = round(score, 4)
+                results.append(result)
+        return results
+
+    def similar(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the ``k`` articles whose lead sections best match ``query``.
+
+        Ranked by TF-IDF cosine similarity, so articles are found even
+        when no title word matches. Needs the index written by
+        ``wiki_to_sqlite.py --similarity-index`` and numpy; otherwise the
+        result is empty. Articles scoring below ``similarity_min_score``
+        are left out.
+
+        Returns:
+            Result dicts as from :meth:`search`, plus the cosine 'score'.
+        """
+        with self._use() as snap:
+            return self._similar(snap, query, k)
+
+    @staticmethod
+    def _row(conn: sqlite3.Connection, article_id: int, summary: str):
+        return conn.execute(
+            f'SELECT a.id, a.title, {summary} FROM articles a WHERE a.id = ?',
+            (article_id,)).fetchone()
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return up to ``limit`` titles starting with ``prefix``.
+
+        Case-insensitive and served from memory when the title index is
+        loaded; otherwise a case-sensitive range scan of the title index
+        in SQLite.
+        """
+        with self._use() as snap:
+            if snap.title_index is not None:
+                return [title for _, title in snap.title_index.prefix(prefix, limit)]
+            rows = snap.pool.connection().execute(
+                'SELECT title FROM articles WHERE title >= ? AND title < ? '
+                'ORDER BY title LIMIT ?', (prefix, prefix + "\U0010ffff", limit))
+            return [row[0] for row in rows]
+
+    def list_articles(self, limit: int = 20,
+                      after: Optional[str] = None) -> List[str]:
+        """Return a page of article titles in title order.
+
+        Pages are addressed by keyset rather than offset, so every page
+        costs one index seek regardless of how deep it is.
+
+        Args:
+            limit: Maximum number of titles.
+            after: Return titles sorting after this one, typically the
+                last title of the previous page; None for the first page.
+        """
+        with self._use() as snap:
+            conn = snap.pool.connection()
+            if after is None:
+                rows = conn.execute(
+                    'SELECT title FROM articles ORDER BY title LIMIT ?', (limit,))
+            else:
+                rows = conn.execute(
+                    'SELECT title FROM articles WHERE title > ? ORDER BY title '
+                    'LIMIT ?', (after, limit))
+            return [row[0] for row in rows]
+
+    @staticmethod
+    def _metadata(snap: _Snapshot) -> Dict[str, str]:
+        try:
+            rows = snap.pool.connection().execute(
+                'SELECT key, value FROM metadata')
+        except sqlite3.OperationalError:  # built before metadata existed
+            return {}
+        return dict(rows.fetchall())
+
+    def get_metadata(self) -> Dict[str, str]:
+        """Return the build metadata written by ``wiki_to_sqlite.py``."""
+        with self._use() as snap:
+            return self._metadata(snap)
+
+    def get_article_count(self) -> int:
+        """Return the number of articles in the database.
+
+        Read from the build metadata; databases built without it fall
+        back to counting rows once.
+        """
+        with self._use() as snap:
+            generation = self._generation(snap)
+            if self._count is None or self._count_generation != generation:
+                count = self._metadata(snap).get("article_count")
+                if count is None:
+                    count = snap.pool.connection().execute(
+                        'SELECT COUNT(*) FROM articles').fetchone()[0]
+                self._count = int(count)
+                self._count_generation = generation
+            return self._count
+
+    def stats(self) -> Dict[str, int]:
+        """Return result cache, Bloom filter, fallback and hot-swap counters."""
+        stats = {"bloom_skips": self.bloom_skips, "swaps": self.swaps,
+                 "similarity_fallbacks": self.similarity_fallbacks}
+        if self.results is not None:
+            stats.update(cache_hits=self.results.hits,
+                         cache_misses=self.results.misses,
+                         cache_entries=len(self.results))
+        return stats
+
+    def close(self) -> None:
+        """Close all pooled connections and the article store."""
+        with self._swap_lock:
+            snap = self._snapshot
+        snap.retire()
+        self._seen = threading.local()
+
+
+def open_pooled_reader(config: Dict[str, Any]):
+    """Open the thread-safe pooled reader if the configuration allows it.
+
+    Args:
+        config: Parsed configuration dictionary.
+
+    Returns:
+        A :class:`OfflineReader`, or a
+        :class:`~ai_bot.modules.multi_reader.MultiLanguageReader` when
+        ``offline.languages`` lists several languages; None when
+        ``offline.read_pool`` is disabled or no built database exists.
+    """
+    if not get_setting(config, "offline.read_pool", False):
+        return None
+    if len(get_setting(config, "offline.languages", []) or []) > 1:
+        from ai_bot.modules.multi_reader import MultiLanguageReader
+        reader = MultiLanguageReader.from_config(config)
+    else:
+        reader = OfflineReader.from_config(config)
+    if not reader.initialized:
+        return None
+    REGISTRY.add_collector("offline", reader.stats)
+    return reader
+
+
+def open_offline_source(config: Dict[str, Any]):
+    """Open the offline searcher the configuration asks for.
+
+    This is the pooled reader from :func:`open_pooled_reader` when one is
+    available; otherwise the classic ``WikipediaOffline``, which can also
+    create the sample database. Its connection belongs to the thread that
+    opened it.
+
+    Args:
+        config: Parsed configuration dictionary.
+
+    Returns:
+        An object with ``search``, ``list_articles`` and
+        ``get_article_count`` that is ready for queries.
+    """
+    reader = open_pooled_reader(config)
+    if reader is not None:
+        return reader
+    from ai_bot.modules.wikipedia_offline import WikipediaOffline
+    wiki_offline = WikipediaOffline()
+    if not wiki_offline.initialized:
+        wiki_offline.setup_database()
+    return wiki_offline
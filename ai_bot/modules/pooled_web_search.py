@@ -0,0 +1,61 @@
+"""DuckDuckGo web searcher on the shared pooled HTTP client.
+
+Drop-in ``search(query)`` callable for ``AIEngine.process_query`` that
+reuses keep-alive connections and cached DNS across queries, so only the
+first online lookup pays the TCP and TLS handshake.
+"""
+from typing import Any, Dict, List, Optional
+
+from ai_bot.core.settings import get_setting, load_config
+from ai_bot.modules.async_web_search import parse_duckduckgo
+from ai_bot.modules.http_client import HTTPClient, default_client
+from ai_bot.modules.resilience import attempt_timeout
+
+
+class PooledWebSearcher:
+    """Web searcher backed by a connection-pooled HTTP client."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 client: Optional[HTTPClient] = None):
+        """Initialize from the ``online`` section of the configuration.
+
+        Args:
+            config: Parsed configuration; loaded from config.json if omitted.
+            client: HTTP client to use; defaults to the shared client.
+        """
+        config = config if config is not None else load_config()
+        self.api_url = get_setting(
+            config, "online.api_url", "https://api.duckduckgo.com/")
+        self.user_agent = get_setting(config, "online.user_agent", "AI-Bot/1.0")
+        self.timeout = float(get_setting(config, "online.timeout", 10))
+        self.client = client or default_client()
+        self.last_timings: Dict[str, float] = {}
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Search the web for a query.
+
+        Inside a ``ResilientSearch`` attempt the socket timeout is cut to
+        the time the attempt has left, so an abandoned attempt does not
+        keep its worker busy for the full ``online.timeout``.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            List of result dicts with 'title', 'snippet', 'url', 'source'.
+
+        Raises:
+            OSError: On connection failures (handled by ``ResilientSearch``).
+            ValueError: If the provider returns an error status or bad JSON.
+        """
+        response = self.client.get(
+            self.api_url,
+            params={"q": query, "format": "json",
+                    "no_html": 1, "skip_disambig": 1},
+            headers={"User-Agent": self.user_agent},
+            timeout=attempt_timeout(self.timeout),
+        )
+        self.last_timings = response.timings
+        if not response.ok:
+            raise ValueError(f"Search provider returned HTTP {response.status}")
+        return parse_duckduckgo(response.json())
@@ -0,0 +1,231 @@
+"""Pluggable web search providers with parallel fan-out.
+
+Each backend is a ``SearchProvider``. ``FanOutSearch`` queries the fastest
+healthy providers in parallel and either returns the first non-empty
+answer or merges the top-k results, deduplicated by URL or title. Latency
+is tracked per provider as an exponentially weighted moving average and
+drives which providers are asked first; providers that keep failing are
+benched for a cooldown period. A fan-out in which no provider answers
+raises :class:`ProvidersUnavailable`, so the ``ResilientSearch`` around it
+retries and counts the failure towards its circuit breaker.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+STRATEGY_FIRST = "first"
+STRATEGY_MERGE = "merge"
+
+
+class ProvidersUnavailable(Exception):
+    """Raised when none of the queried providers returned an answer."""
+
+
+class SearchProvider:
+    """A named web search backend."""
+
+    def __init__(self, name: str, search_fn: SearchFn):
+        """Initialize the provider.
+
+        Args:
+            name: Identifier used in config, metrics and result metadata.
+            search_fn: Callable returning a list of result dicts.
+        """
+        self.name = name
+        self.search_fn = search_fn
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Run the backend search."""
+        return self.search_fn(query) or []
+
+
+class ProviderHealth:
+    """Latency EWMA and failure tracking for one provider."""
+
+    def __init__(self, alpha: float = 0.3, failure_threshold: int = 3,
+                 cooldown: float = 30.0):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.benched_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        """Record the outcome of one call."""
+        with self._lock:
+            self.calls += 1
+            self.ewma = seconds if self.ewma is None else (
+                self.alpha * seconds + (1 - self.alpha) * self.ewma)
+            if ok:
+                self.consecutive_failures = 0
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.benched_until = time.monotonic() + self.cooldown
+
+    @property
+    def healthy(self) -> bool:
+        """False while the provider sits out its failure cooldown."""
+        return time.monotonic() >= self.benched_until
+
+
+def _dedupe_key(item: Dict[str, Any]) -> str:
+    url = str(item.get("url") or "").strip().lower()
+    if url:
+        url = url.split("://", 1)[-1].rstrip("/")
+        return f"url:{url}"
+    return f"title:{str(item.get('title', '')).strip().casefold()}"
+
+
+def merge_results(result_lists: Sequence[List[Dict[str, Any]]],
+                  top_k: int) -> List[Dict[str, Any]]:
+    """Interleave ranked result lists, dropping duplicates.
+
+    Args:
+        result_lists: Per-provider results, best provider first.
+        top_k: Maximum number of merged results.
+
+    Returns:
+        Up to ``top_k`` unique results in round-robin rank order.
+    """
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    depth = max((len(r) for r in result_lists), default=0)
+    for rank in range(depth):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            item = results[rank]
+            key = _dedupe_key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+            if len(merged) >= top_k:
+                return merged
+    return merged
+
+
+class FanOutSearch:
+    """Search callable that fans a query out to several providers."""
+
+    def __init__(self, providers: Sequence[SearchProvider],
+                 strategy: str = STRATEGY_FIRST, top_k: int = 5,
+                 max_parallel: int = 2, timeout: float = 10.0):
+        """Initialize the fan-out.
+
+        Args:
+            providers: Providers in configured preference order.
+            strategy: ``'first'`` for the first non-empty answer or
+                ``'merge'`` for deduplicated top-k across providers.
+            top_k: Maximum number of results returned.
+            max_parallel: How many of the best-ranked providers to query.
+            timeout: Deadline for the whole fan-out in seconds.
+        """
+        self.providers = list(providers)
+        self.strategy = strategy
+        self.top_k = top_k
+        self.max_parallel = max(1, max_parallel)
+        self.timeout = timeout
+        self.health: Dict[str, ProviderHealth] = {
+            p.name: ProviderHealth() for p in self.providers}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, len(self.providers) * 4),
+            thread_name_prefix="aibot-provider")
+
+    def ranked(self) -> List[SearchProvider]:
+        """Healthy providers by observed latency, then benched ones.
+
+        Providers without samples keep their configured order ahead of
+        slower measured ones so that each gets tried at least once.
+        """
+        order = {p.name: i for i, p in enumerate(self.providers)}
+
+        def sort_key(provider: SearchProvider):
+            health = self.health[provider.name]
+            ewma = health.ewma if health.ewma is not None else 0.0
+            return (not health.healthy, ewma, order[provider.name])
+        return sorted(self.providers, key=sort_key)
+
+    def _run(self, provider: SearchProvider, query: str) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            results = provider.search(query)
+        except Exception:
+            self.health[provider.name].record(time.perf_counter() - start, False)
+            raise
+        self.health[provider.name].record(time.perf_counter() - start, True)
+        for item in results:
+            if isinstance(item, dict):
+                item.setdefault("provider", provider.name)
+        return results
+
+    def __call__(self, query: str) -> List[Dict[str, Any]]:
+        """Query the chosen providers and combine their results.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            Up to ``top_k`` results; empty if the providers that answered
+            found nothing.
+
+        Raises:
+            ProvidersUnavailable: If every chosen provider failed or missed
+                the deadline.
+        """
+        chosen = self.ranked()[:self.max_parallel]
+        # Each provider runs in a copy of the caller's context so that the
+        # search priority and attempt deadline reach its rate limiter
+        futures = {self._executor.submit(
+            contextvars.copy_context().run, self._run, p, query): p for p in chosen}
+        deadline = time.monotonic() + self.timeout
+
+        if self.strategy == STRATEGY_FIRST:
+            answered = False
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, remaining, FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        continue
+                    answered = True
+                    results = future.result()
+                    if results:
+                        return results[:self.top_k]
+            if answered:
+                return []
+        else:
+            wait(futures, max(0.0, deadline - time.monotonic()))
+            completed = [f.result() for f in futures
+                         if f.done() and f.exception() is None]
+            if completed:
+                return merge_results(completed, self.top_k)
+
+        errors = [f.exception() for f in futures
+                  if f.done() and f.exception() is not None]
+        names = ", ".join(p.name for p in chosen)
+        raise ProvidersUnavailable(
+            f"No answer from providers: {names}") from (errors[-1] if errors else None)
+
+    def stats(self) -> Dict[str, float]:
+        """Return per-provider latency and failure counters."""
+        stats: Dict[str, float] = {}
+        for name, health in self.health.items():
+            stats[f"{name}_ewma_ms"] = round((health.ewma or 0.0) * 1000, 3)
+            stats[f"{name}_calls"] = health.calls
+            stats[f"{name}_failures"] = health.failures
+            stats[f"{name}_healthy"] = int(health.healthy)
+        return stats
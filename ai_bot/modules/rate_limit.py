@@ -0,0 +1,223 @@
+"""Client-side rate limiting and priority scheduling for online queries.
+
+A token bucket paces requests to the provider's limit, and a priority
+queue in front of it lets interactive queries from the GUI and CLI jump
+ahead of batch work. The priority of the current caller is carried in a
+context variable, so batch jobs opt in with ``search_priority``::
+
+    with search_priority(PRIORITY_BATCH):
+        engine.process_query(query, online_search, offline_search)
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ai_bot.core.metrics import REGISTRY
+from ai_bot.modules.resilience import AttemptRejected, attempt_timeout
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "aibot_search_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def search_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed searches at the given scheduling priority.
+
+    Args:
+        priority: Lower runs first; see ``PRIORITY_INTERACTIVE`` and
+            ``PRIORITY_BATCH``.
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """Classic token bucket; not thread-safe on its own."""
+
+    def __init__(self, rate: float, burst: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._tokens = self.burst
+        self._last = clock()
+
+    def try_take(self) -> float:
+        """Take a token if available.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one is due.
+        """
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+
+class RequestScheduler:
+    """Priority queue of callers waiting on a shared token bucket."""
+
+    def __init__(self, rate: float, burst: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the scheduler.
+
+        Args:
+            rate: Sustained requests per second allowed to the provider.
+            burst: Requests that may be sent back to back after idling.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.bucket = TokenBucket(rate, burst, clock)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._counts = {"granted": 0, "dropped": 0}
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> bool:
+        """Wait for this caller's turn and a token.
+
+        Args:
+            priority: Scheduling priority; lower values go first, FIFO
+                within the same priority.
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            True if a token was granted, False if the wait timed out.
+        """
+        start = self._clock()
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            self._cond.notify_all()
+            try:
+                while True:
+                    delay: Optional[float] = None
+                    if self._queue[0] == entry:
+                        delay = self.bucket.try_take()
+                        if delay == 0.0:
+                            granted = True
+                            break
+                    if timeout is not None:
+                        remaining = start + timeout - self._clock()
+                        if remaining <= 0:
+                            granted = False
+                            break
+                        delay = remaining if delay is None else min(delay, remaining)
+                    self._cond.wait(delay)
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+            self._counts["granted" if granted else "dropped"] += 1
+
+        name = _PRIORITY_NAMES.get(priority, f"priority_{priority}")
+        REGISTRY.observe(f"queue_wait_{name}", self._clock() - start)
+        return granted
+
+    def stats(self) -> Dict[str, int]:
+        """Return grant/drop counters and the current queue depth."""
+        with self._cond:
+            return dict(self._counts, queued=len(self._queue))
+
+
+class QueueTimeout(AttemptRejected, TimeoutError):
+    """Raised when a search gave up waiting for a scheduler slot."""
+
+
+class SchedulerAdmission:
+    """``ResilientSearch`` admission check that waits on a scheduler.
+
+    The wait runs in the caller's thread before the attempt takes a worker
+    slot, so a batch backlog queued behind the rate limit never holds the
+    slots an interactive search needs to get ahead of it.
+    """
+
+    def __init__(self, scheduler: RequestScheduler,
+                 max_wait: Optional[float] = None, tokens: int = 1):
+        """Initialize the check.
+
+        Args:
+            scheduler: Shared scheduler for the provider.
+            max_wait: Longest queue wait before giving up.
+            tokens: Tokens each attempt takes, one per web request it sends.
+        """
+        self.scheduler = scheduler
+        self.max_wait = max_wait
+        self.tokens = max(1, tokens)
+
+    def __call__(self, timeout: float) -> bool:
+        """Wait for the attempt's tokens at the caller's priority.
+
+        Args:
+            timeout: Seconds the attempt may spend waiting.
+
+        Returns:
+            True once every token was granted, False if the wait timed out.
+        """
+        if self.max_wait is not None:
+            timeout = min(timeout, self.max_wait)
+        deadline = time.monotonic() + timeout
+        priority = _current_priority.get()
+        for _ in range(self.tokens):
+            if not self.scheduler.acquire(
+                    priority, max(0.0, deadline - time.monotonic())):
+                return False
+        return True
+
+
+class RateLimitedSearch:
+    """Search callable that waits for a scheduler slot before searching."""
+
+    def __init__(self, search_fn: SearchFn, scheduler: RequestScheduler,
+                 max_wait: Optional[float] = None):
+        """Initialize the wrapper.
+
+        Args:
+            search_fn: Search callable to pace.
+            scheduler: Shared scheduler for the provider.
+            max_wait: Longest queue wait before giving up. Inside a
+                ``ResilientSearch`` attempt the wait also ends with the
+                attempt.
+        """
+        self.search_fn = search_fn
+        self.scheduler = scheduler
+        self.max_wait = max_wait
+
+    def __call__(self, query: str) -> List[Dict[str, Any]]:
+        """Wait for a token at the caller's priority, then search.
+
+        Raises:
+            QueueTimeout: If no token was granted in time; the resilience
+                layer ends the call without a retry or a breaker failure.
+        """
+        max_wait = self.max_wait
+        if max_wait is not None:
+            max_wait = attempt_timeout(max_wait)
+        if not self.scheduler.acquire(_current_priority.get(), max_wait):
+            raise QueueTimeout(f"No search slot within {max_wait:.2f}s")
+        return self.search_fn(query)
@@ -0,0 +1,326 @@
+"""Timeout, retry and circuit-breaker layer for the online provider.
+
+``ResilientSearch`` wraps a web search callable such as
+``WebSearcher.search``. Each attempt gets its own deadline, failed attempts
+are retried with jittered exponential backoff within an overall budget,
+and repeated failures trip a circuit breaker. While the breaker is open
+the wrapper returns no results immediately, so hybrid mode falls straight
+through to the offline source until a half-open probe succeeds.
+
+An abandoned attempt cannot be interrupted, so its deadline is also made
+available to the search itself through :func:`attempt_timeout`; the HTTP
+searchers use it as their socket timeout. Attempts that are still running
+keep their worker slot, and once every slot is taken new calls return no
+results instead of queueing behind them. A search that gives up for a
+local reason, such as waiting too long for a rate-limit token, raises
+:class:`AttemptRejected`; that ends the call without a retry and without
+counting against the provider.
+"""
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+from ai_bot.core.settings import get_setting
+
+SearchFn = Callable[[str], List[Dict[str, Any]]]
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_attempt_deadline: contextvars.ContextVar = contextvars.ContextVar(
+    "aibot_attempt_deadline", default=None)
+
+
+class AttemptRejected(Exception):
+    """Raised by a wrapped search that gave up before reaching the provider.
+
+    ``ResilientSearch`` neither retries it nor records it as a breaker
+    failure.
+    """
+
+
+def attempt_timeout(default: float) -> float:
+    """Seconds left for the current ``ResilientSearch`` attempt.
+
+    Args:
+        default: Timeout to use outside of an attempt, and the upper bound
+            inside one.
+
+    Returns:
+        ``default``, shortened to the time left before the attempt is
+        abandoned when called from within an attempt.
+    """
+    deadline = _attempt_deadline.get()
+    if deadline is None:
+        return default
+    return max(0.001, min(default, deadline - time.monotonic()))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds to stay open before allowing a probe.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open -> half_open once the timeout passed."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if (self._state == STATE_OPEN
+                and self._clock() - self._opened_at >= self.reset_timeout):
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now.
+
+        In the half-open state only one probe call is let through.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe that never reached the provider."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if (self._state == STATE_HALF_OPEN
+                    or self._failures >= self.failure_threshold):
+                if self._state != STATE_OPEN:
+                    self.trips += 1
+                self._state = STATE_OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+
+def backoff_delay(attempt: int, base: float, cap: float,
+                  rng: Callable[[], float] = random.random) -> float:
+    """Full-jitter exponential backoff delay for a retry attempt.
+
+    Args:
+        attempt: Zero-based retry number.
+        base: Delay scale for the first retry in seconds.
+        cap: Maximum delay in seconds.
+        rng: Uniform [0, 1) source (injectable for tests).
+
+    Returns:
+        Seconds to sleep before the retry.
+    """
+    return rng() * min(cap, base * (2 ** attempt))
+
+
+class ResilientSearch:
+    """Callable wrapper adding deadlines, retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        search_fn: SearchFn,
+        attempt_timeout: float = 10.0,
+        retries: int = 3,
+        total_timeout: Optional[float] = None,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 8,
+        admit: Optional[Callable[[float], bool]] = None,
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            search_fn: Underlying search callable returning a result list.
+            attempt_timeout: Deadline for a single attempt in seconds.
+            retries: Extra attempts after the first failure.
+            total_timeout: Overall budget for all attempts and backoff;
+                unlimited if None.
+            backoff_base: Scale of the first backoff delay in seconds.
+            backoff_cap: Upper bound on any single backoff delay.
+            breaker: Circuit breaker to consult; a default one is created.
+            max_workers: Attempts that may run at once, including ones
+                abandoned after their deadline that have not returned yet.
+            admit: Called in the caller's thread before each attempt takes
+                a worker slot, with the seconds the attempt may wait; returns
+                False to end the call like ``AttemptRejected``. Rate limiting
+                waits here, so queued calls hold no worker slot.
+        """
+        self.search_fn = search_fn
+        self.attempt_timeout = attempt_timeout
+        self.retries = max(0, retries)
+        self.total_timeout = total_timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self.admit = admit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aibot-online")
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "attempts": 0, "failures": 0,
+                        "timeouts": 0, "short_circuited": 0, "saturated": 0,
+                        "rejected": 0}
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counts[name] += 1
+
+    def _attempt(self, query: str, deadline: float) -> List[Dict[str, Any]]:
+        _attempt_deadline.set(deadline)
+        return self.search_fn(query)
+
+    def _release_slot(self, _future) -> None:
+        self._slots.release()
+
+    @classmethod
+    def from_config(cls, search_fn: SearchFn, config: Dict[str, Any],
+                    admit: Optional[Callable[[float], bool]] = None
+                    ) -> "ResilientSearch":
+        """Build a wrapper from the ``online`` and ``search`` config sections.
+
+        Args:
+            search_fn: Underlying search callable.
+            config: Parsed configuration dictionary.
+            admit: Optional admission check run before each attempt.
+
+        Returns:
+            A configured ``ResilientSearch``.
+        """
+        breaker = CircuitBreaker(
+            int(get_setting(config, "online.circuit_breaker_threshold", 5)),
+            float(get_setting(config, "online.circuit_breaker_reset_seconds", 30)),
+        )
+        return cls(
+            search_fn,
+            attempt_timeout=float(get_setting(config, "online.timeout", 10)),
+            retries=int(get_setting(config, "online.retry_count", 3)),
+            total_timeout=float(get_setting(config, "search.timeout_seconds", 10)),
+            breaker=breaker,
+            admit=admit,
+        )
+
+    def __call__(self, query: str) -> List[Dict[str, Any]]:
+        """Search with deadlines, retries and circuit breaking.
+
+        Args:
+            query: The search query string.
+
+        Returns:
+            Results from the underlying search, or an empty list when the
+            breaker is open, every worker slot is held by a running attempt,
+            the search raised ``AttemptRejected`` or every attempt failed.
+        """
+        self._count("calls")
+        deadline = (time.monotonic() + self.total_timeout
+                    if self.total_timeout else None)
+
+        for attempt in range(self.retries + 1):
+            timeout = self.attempt_timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+
+            if self.admit is not None:
+                # Skip the wait for a breaker that would refuse the attempt
+                if self.breaker.state == STATE_OPEN:
+                    self._count("short_circuited")
+                    return []
+                started = time.monotonic()
+                if not self.admit(timeout):
+                    self._count("rejected")
+                    return []
+                timeout -= time.monotonic() - started
+                if timeout <= 0:
+                    self._count("rejected")
+                    return []
+
+            if not self._slots.acquire(blocking=False):
+                self._count("saturated")
+                return []
+            if not self.breaker.allow():
+                self._slots.release()
+                self._count("short_circuited")
+                return []
+
+            self._count("attempts")
+            # The copied context carries the caller's search priority
+            context = contextvars.copy_context()
+            try:
+                future = self._executor.submit(
+                    context.run, self._attempt, query, time.monotonic() + timeout)
+            except RuntimeError:
+                self._slots.release()
+                raise
+            future.add_done_callback(self._release_slot)
+            try:
+                result = future.result(timeout=timeout)
+            except AttemptRejected:
+                # Checked first: a rejection may also be a TimeoutError
+                self._count("rejected")
+                self.breaker.release_probe()
+                return []
+            except FutureTimeout:
+                self._count("timeouts", "failures")
+                self.breaker.record_failure()
+            except Exception:  # pylint: disable=broad-except
+                self._count("failures")
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+                return result if result is not None else []
+
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if deadline is not None:
+                    delay = min(delay, max(0.0, deadline - time.monotonic()))
+                time.sleep(delay)
+        return []
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters and the breaker state."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counts)
+        stats["breaker_open"] = int(self.breaker.state != STATE_CLOSED)
+        stats["breaker_trips"] = self.breaker.trips
+        return stats
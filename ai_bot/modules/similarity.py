@@ -0,0 +1,227 @@
+"""TF-IDF similarity index over article lead sections.
+
+Keyword search only finds articles whose titles share a word with the
+query. ``wiki_to_sqlite.py --similarity-index`` additionally writes a
+``tfidf/`` folder next to the database holding a sparse TF-IDF matrix of
+every article's title and lead section, so conceptual queries can be
+answered offline by cosine similarity:
+
+* ``indptr.npy``, ``indices.npy``, ``data.npy``: the matrix in term-major
+  compressed sparse form; the documents containing term ``t`` are
+  ``indices[indptr[t]:indptr[t + 1]]`` with weights in the same slice of
+  ``data``. Document vectors are L2-normalized.
+* ``ids.npy``: article id of each document row.
+* ``idf.npy``: inverse document frequency of each term.
+* ``vocab.idx``: term to column lookup, in the ``titles.idx`` format.
+
+The arrays are opened with ``numpy.load(mmap_mode="r")``: nothing is read
+up front, pages come in on demand and are shared between processes.
+Scoring only reads the posting lists of the query's terms and sums them
+per document, so cost grows with how common those terms are rather than
+with the number of articles.
+
+numpy is optional; without it the index is neither built nor used.
+"""
+import re
+import shutil
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore
+
+from ai_bot.modules.bloom import index_terms
+from ai_bot.modules.title_index import TitleIndex, write_title_index
+
+INDEX_DIR = "tfidf"
+LEAD_CHARS = 2000
+
+_ARRAYS = ("indptr", "indices", "data", "ids", "idf")
+_VOCAB_FILE = "vocab.idx"
+# Queries whose postings exceed this fraction of the documents are scored
+# over a dense vector; sorting that many postings would cost more
+_DENSE_FRACTION = 1 / 8
+
+
+def lead_section(text: str, max_chars: int = LEAD_CHARS) -> str:
+    """Return an article's text before its first section heading."""
+    match = re.search(r"^\s*==", text, re.MULTILINE)
+    return (text[:match.start()] if match else text)[:max_chars]
+
+
+def write_similarity_index(directory: Union[str, Path],
+                           documents: Iterable[Tuple[int, str, str]],
+                           min_df: int = 1, max_df: float = 0.5) -> int:
+    """Build the TF-IDF index into ``<directory>/tfidf``.
+
+    Args:
+        directory: Folder holding the database.
+        documents: ``(article_id, title, text)`` triples; only the title
+            and lead section of ``text`` are indexed.
+        min_df: Terms in fewer documents are dropped; 2 drops most typos
+            but also the rare names that make a lookup precise.
+        max_df: Terms in more than this fraction of documents are dropped
+            (they do not discriminate).
+
+    Returns:
+        Number of documents indexed.
+
+    Raises:
+        RuntimeError: If numpy is not installed.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for the similarity index")
+    vocab: Dict[str, int] = {}
+    terms, rows, counts, ids = array("I"), array("I"), array("H"), array("q")
+    for row, (article_id, title, text) in enumerate(documents):
+        ids.append(article_id)
+        for term, count in Counter(
+                index_terms(f"{title}\n{lead_section(text)}")).items():
+            terms.append(vocab.setdefault(term, len(vocab)))
+            rows.append(row)
+            counts.append(min(count, 0xFFFF))
+    n_docs = len(ids)
+    terms, rows = np.asarray(terms, np.int64), np.asarray(rows, np.int64)
+    counts = np.asarray(counts, np.float32)
+
+    df = np.bincount(terms, minlength=len(vocab))
+    keep = (df >= min_df) & (df <= max(1, max_df * n_docs))
+    column = np.full(len(vocab), -1, np.int64)
+    column[keep] = np.arange(int(keep.sum()))
+    mask = keep[terms]
+    terms, rows, counts = column[terms[mask]], rows[mask], counts[mask]
+    n_terms = int(keep.sum())
+
+    idf = (np.log((1 + n_docs) / (1 + df[keep])) + 1).astype(np.float32)
+    weights = (1 + np.log(counts)) * idf[terms]
+    norms = np.sqrt(np.bincount(rows, weights * weights, minlength=n_docs))
+    weights /= norms[rows]
+    order = np.lexsort((rows, terms))
+    indptr = np.zeros(n_terms + 1, np.int64)
+    np.cumsum(np.bincount(terms, minlength=n_terms), out=indptr[1:])
+    arrays = {
+        "indptr": indptr,
+        "indices": rows[order].astype(np.uint32),
+        "data": weights[order].astype(np.float32),
+        "ids": np.asarray(ids, np.int64),
+        "idf": idf,
+    }
+
+    target = Path(directory) / INDEX_DIR
+    tmp = target.with_name(INDEX_DIR + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, values in arrays.items():
+        np.save(tmp / f"{name}.npy", values)
+    words = [word for word, old in vocab.items() if keep[old]]
+    write_title_index(tmp / _VOCAB_FILE,
+                      ((int(column[vocab[word]]), word) for word in words))
+    # Readers map the old files; on POSIX they stay valid until unmapped
+    shutil.rmtree(target, ignore_errors=True)
+    tmp.rename(target)
+    return n_docs
+
+
+class SimilarityIndex:
+    """Memory-mapped TF-IDF index with top-k cosine scoring."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """Open ``<directory>/tfidf``.
+
+        Raises:
+            RuntimeError: If numpy is not installed.
+            FileNotFoundError: If the index has not been built.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for the similarity index")
+        folder = Path(directory) / INDEX_DIR
+        arrays = {name: np.load(folder / f"{name}.npy", mmap_mode="r")
+                  for name in _ARRAYS}
+        self._indptr = arrays["indptr"]
+        self._indices = arrays["indices"]
+        self._data = arrays["data"]
+        self._ids = arrays["ids"]
+        self._idf = arrays["idf"]
+        self._vocab = TitleIndex.load(folder / _VOCAB_FILE)
+
+    @staticmethod
+    def exists(directory: Union[str, Path]) -> bool:
+        """True if ``directory`` holds an index and numpy is available."""
+        folder = Path(directory) / INDEX_DIR
+        return np is not None and all(
+            (folder / f"{name}.npy").is_file() for name in _ARRAYS)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _postings(self, query: str):
+        """Documents and weight contributions of ``query``'s terms."""
+        counts = Counter(
+            column for column in map(self._vocab.lookup, index_terms(query))
+            if column is not None)
+        if not counts:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        columns = np.fromiter(counts, np.int64, len(counts))
+        tf = np.fromiter(counts.values(), np.float32, len(counts))
+        weights = (1 + np.log(tf)) * self._idf[columns]
+        weights /= np.linalg.norm(weights)
+        docs, contributions = [], []
+        for column, weight in zip(columns, weights):
+            start, end = self._indptr[column], self._indptr[column + 1]
+            docs.append(self._indices[start:end])
+            contributions.append(self._data[start:end] * weight)
+        return (np.concatenate(docs).astype(np.int64),
+                np.concatenate(contributions))
+
+    def _top(self, docs, scores, k: int) -> List[Tuple[int, float]]:
+        if len(docs) > k:
+            best = np.argpartition(-scores, k)[:k]
+            docs, scores = docs[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(self._ids[docs[i]]), float(scores[i])) for i in order]
+
+    def top_k(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(article_id, cosine)`` pairs, best first."""
+        return self.top_k_batch([query], k)[0]
+
+    def top_k_batch(self, queries: Sequence[str],
+                    k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Score several queries together.
+
+        Postings of all queries are summed in one sorted pass; a query
+        with very common terms is scored on its own over a dense score
+        vector instead.
+
+        Returns:
+            One ``(article_id, cosine)`` list per query, best first.
+        """
+        n_docs = len(self._ids)
+        results: List[List[Tuple[int, float]]] = [[] for _ in queries]
+        batch_keys, batch_weights, batch_queries = [], [], []
+        for i, query in enumerate(queries):
+            docs, weights = self._postings(query)
+            if not len(docs):
+                continue
+            if len(docs) >= n_docs * _DENSE_FRACTION:
+                scores = np.bincount(docs, weights, minlength=n_docs)
+                touched = np.flatnonzero(scores)
+                results[i] = self._top(touched, scores[touched], k)
+            else:
+                batch_keys.append(docs + len(batch_queries) * n_docs)
+                batch_weights.append(weights)
+                batch_queries.append(i)
+        if batch_queries:
+            keys, inverse = np.unique(np.concatenate(batch_keys),
+                                      return_inverse=True)
+            sums = np.bincount(inverse, np.concatenate(batch_weights))
+            bounds = np.searchsorted(
+                keys, np.arange(len(batch_queries) + 1) * n_docs)
+            for slot, i in enumerate(batch_queries):
+                start, end = bounds[slot], bounds[slot + 1]
+                results[i] = self._top(
+                    keys[start:end] - slot * n_docs, sums[start:end], k)
+        return results
@@ -0,0 +1,153 @@
+"""Compact in-memory index of article titles.
+
+``wiki_to_sqlite.py`` writes ``titles.idx`` next to the database: a
+header, then three flat arrays, all little-endian:
+
+* ``ids``: uint32 article id per title;
+* ``offsets``: uint32 start of each title in the string table, plus one
+  end offset;
+* the string table: UTF-8 titles back to back, sorted case-insensitively
+  (by ``casefold()``, ties by exact title).
+
+``TitleIndex`` reads the file into one buffer and binary searches typed
+views over it, so there is no Python object per title: memory is the file
+size, about 8 bytes plus the UTF-8 title length per entry. Exact, case-insensitive
+and prefix lookups never touch the database.
+"""
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+INDEX_FILE = "titles.idx"
+
+_MAGIC = b"AIBTITL1"
+_HEADER = struct.Struct("<8sII")
+
+
+def write_title_index(path: Union[str, Path],
+                      rows: Iterable[Tuple[int, str]]) -> int:
+    """Write a title index file.
+
+    Args:
+        path: Destination file.
+        rows: ``(article_id, title)`` pairs in any order.
+
+    Returns:
+        Number of titles written.
+    """
+    entries = sorted(rows, key=lambda row: (row[1].casefold(), row[1]))
+    ids = array("I", (article_id for article_id, _ in entries))
+    offsets = array("I", [0])
+    table = bytearray()
+    for _, title in entries:
+        table += title.encode("utf-8")
+        offsets.append(len(table))
+    if sys.byteorder != "little":
+        ids.byteswap()
+        offsets.byteswap()
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, len(entries), len(table)))
+        fh.write(ids.tobytes())
+        fh.write(offsets.tobytes())
+        fh.write(table)
+    tmp.replace(path)
+    return len(entries)
+
+
+class TitleIndex:
+    """Sorted, array-backed title table with binary search lookups."""
+
+    def __init__(self, ids: Sequence[int], offsets: Sequence[int],
+                 table: memoryview):
+        self._ids = ids
+        self._offsets = offsets
+        self._table = table
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TitleIndex":
+        """Read a title index file into memory.
+
+        The id and offset arrays are views into the file's buffer rather
+        than copies, except on big-endian hosts.
+
+        Raises:
+            ValueError: If the file is not a title index.
+        """
+        data = memoryview(Path(path).read_bytes())
+        magic, count, table_size = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a title index: {path}")
+        pos = _HEADER.size
+        ids = data[pos:pos + 4 * count].cast("I")
+        pos += 4 * count
+        offsets = data[pos:pos + 4 * (count + 1)].cast("I")
+        pos += 4 * (count + 1)
+        if sys.byteorder != "little":
+            # The file is little-endian; swapped copies instead of views
+            ids, offsets = array("I", ids), array("I", offsets)
+            ids.byteswap()
+            offsets.byteswap()
+        return cls(ids, offsets, data[pos:pos + table_size])
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index buffers."""
+        return (len(self._ids) * self._ids.itemsize
+                + len(self._offsets) * self._offsets.itemsize
+                + len(self._table))
+
+    def _title(self, i: int) -> str:
+        return str(self._table[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def _lower_bound(self, folded: str) -> int:
+        lo, hi = 0, len(self._ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title(mid).casefold() < folded:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, title: str) -> Optional[int]:
+        """Return the id of the article titled exactly ``title``."""
+        for article_id, found in self.lookup_casefold(title):
+            if found == title:
+                return article_id
+        return None
+
+    def lookup_casefold(self, title: str) -> List[Tuple[int, str]]:
+        """Return ``(id, title)`` for every case-insensitive match."""
+        folded = title.casefold()
+        matches = []
+        i = self._lower_bound(folded)
+        while i < len(self._ids):
+            found = self._title(i)
+            if found.casefold() != folded:
+                break
+            matches.append((self._ids[i], found))
+            i += 1
+        return matches
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Return up to ``limit`` ``(id, title)`` pairs starting with ``prefix``.
+
+        Matching is case-insensitive; results are in index order.
+        """
+        folded = prefix.casefold()
+        matches = []
+        i = self._lower_bound(folded)
+        while i < len(self._ids) and len(matches) < limit:
+            found = self._title(i)
+            if not found.casefold().startswith(folded):
+                break
+            matches.append((self._ids[i], found))
+            i += 1
+        return matches
@@ -7,22 +7,114 @@ import sys
 import os
 import json
 import hashlib
+import threading
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from PyQt5.QtWidgets import (
     QApplication, QDialog, QVBoxLayout, QLabel,
-    QLineEdit, QPushButton, QMessageBox
+    QLineEdit, QPushButton, QMessageBox, QSplashScreen
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QPixmap
+
+CONFIG_FILE = Path.home() / "AI Bot" / "config.json"
+APP_DIR = Path(__file__).resolve().parent
+
+
+def load_user_config() -> Optional[Dict[str, Any]]:
+    """Read the installed configuration once.
+
+    Returns:
+        The parsed config, or None if the app has not been installed yet.
+    """
+    if not CONFIG_FILE.exists():
+        return None
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"Warning: Could not read config: {exc}")
+        return {}
+
+
+def _database_candidates(config: Dict[str, Any],
+                         app_config: Dict[str, Any]) -> List[Path]:
+    """Likely locations of the offline database for this installation."""
+    candidates = []
+    install_path = config.get("install_path")
+    language = config.get("language", "en")
+    if install_path:
+        candidates.append(
+            Path(install_path) / "data" / "wiki_dumps" / language / "wikipedia.db")
+    db_file = app_config.get("offline", {}).get("database_file")
+    if db_file:
+        candidates.append(APP_DIR / db_file)
+    return candidates
+
+
+class StartupWarmup(threading.Thread):
+    """Background import and database warmup while the login is shown.
+
+    ``imported`` is set once the GUI modules are loaded, which is all the
+    main window needs; the database read-ahead that follows carries on
+    behind the window. ``AIBotGUI`` still creates its engine and opens the
+    SQLite database on the main thread; the warmup only makes that cheaper,
+    with the imports done and the database pages already cached.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize the warmup thread.
+
+        Args:
+            config: Installed configuration from :func:`load_user_config`.
+        """
+        super().__init__(name="aibot-startup-warmup", daemon=True)
+        self.config = config
+        self.imported = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def run(self):
+        """Import the engine and GUI modules, then prime the database."""
+        try:
+            # Importing here fills sys.modules so the main thread's import
+            # after login is a dictionary lookup.
+            import ai_bot.gui.main_window  # noqa: F401  # pylint: disable=unused-import
+        except BaseException as exc:  # pylint: disable=broad-except
+            self.error = exc
+            return
+        finally:
+            self.imported.set()
+        try:
+            from ai_bot.core.settings import get_setting, load_config
+            app_config = load_config()
+            if get_setting(app_config, "performance.preload_database", False):
+                self._preload_database(app_config)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Warning: Database preload failed: {exc}")
+
+    def _preload_database(self, app_config: Dict[str, Any]) -> None:
+        from ai_bot.core.warmup import preload_file
+        from ai_bot.modules.offline_reader import resolve_database
+        for db_path in _database_candidates(self.config, app_config):
+            db_path = resolve_database(db_path)
+            # Sequential read-ahead pulls the SQLite pages into the OS page
+            # cache so the main window's first queries do not hit disk.
+            if preload_file(db_path):
+                return
 
 
 class LoginDialog(QDialog):
     """Password login dialog."""
 
-    def __init__(self):
-        """Initialize login dialog."""
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize login dialog.
+
+        Args:
+            config: Installed configuration holding the password hash.
+        """
         super().__init__()
+        self.config = config
         self.setWindowTitle("AI Bot - Login")
         self.setGeometry(100, 100, 400, 200)
         self.authenticated = False
@@ -56,21 +148,12 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Error", "Please enter your password")
             return
 
-        # Read stored password hash
-        config_file = Path.home() / "AI Bot" / "config.json"
-        if not config_file.exists():
-            QMessageBox.critical(self, "Error", "Configuration not found")
-            return
-
         try:
-            with open(config_file, "r", encoding="utf-8") as f:
-                config = json.load(f)
-
             password_hash = hashlib.sha256(
                 password.encode()
             ).hexdigest()
 
-            if password_hash == config.get("password_hash"):
+            if password_hash == self.config.get("password_hash"):
                 self.authenticated = True
                 self.accept()
             else:
@@ -80,43 +163,65 @@ class LoginDialog(QDialog):
             QMessageBox.critical(self, "Error", f"Failed to verify: {exc}")
 
 
-def check_first_run():
-    """Check if this is first run, show installer if needed."""
-    config_file = Path.home() / "AI Bot" / "config.json"
+def show_installer(app: QApplication) -> None:
+    """Show the installer on first run and exit when it closes."""
+    from installer import AIBotInstaller
+    installer = AIBotInstaller()
+    installer.show()
+    sys.exit(app.exec_())
+
+
+def show_splash() -> QSplashScreen:
+    """Show a splash screen while the main window is prepared."""
+    icon = APP_DIR / "installer_icon.png"
+    pixmap = QPixmap(str(icon)) if icon.exists() else QPixmap(320, 160)
+    if not icon.exists():
+        pixmap.fill(Qt.white)
+    splash = QSplashScreen(pixmap)
+    splash.showMessage("Loading AI Bot...", Qt.AlignBottom | Qt.AlignHCenter)
+    splash.show()
+    return splash
+
 
-    if not config_file.exists():
-        # First run - show installer
-        from installer import AIBotInstaller
-        app = QApplication(sys.argv)
-        installer = AIBotInstaller()
-        installer.show()
-        sys.exit(app.exec_())
+def wait_for_warmup(app: QApplication, warmup: StartupWarmup) -> None:
+    """Keep the UI responsive until the background imports are done."""
+    while not warmup.imported.wait(0.02):
+        app.processEvents()
+    if warmup.error is not None:
+        print(f"Warning: Startup warmup failed: {warmup.error}")
 
 
 def main():
     """Main entry point."""
-    # Check installation
-    check_first_run()
-
-    # Show login if password is set
     app = QApplication(sys.argv)
 
-    config_file = Path.home() / "AI Bot" / "config.json"
-    try:
-        with open(config_file, "r", encoding="utf-8") as f:
-            config = json.load(f)
+    config = load_user_config()
+    if config is None:
+        show_installer(app)
 
-        if "password_hash" in config:
-            login = LoginDialog()
-            if login.exec_() != QDialog.Accepted:
-                sys.exit(0)
-    except Exception as exc:  # pylint: disable=broad-except
-        print(f"Warning: Could not read config: {exc}")
+    # Heavy imports and database warmup overlap with the password prompt;
+    # only the imports have to finish before the main window opens. The
+    # window itself still builds its engine and database handle here.
+    warmup = StartupWarmup(config)
+    warmup.start()
+
+    if "password_hash" in config:
+        login = LoginDialog(config)
+        if login.exec_() != QDialog.Accepted:
+            sys.exit(0)
+
+    splash = None
+    if not warmup.imported.is_set():
+        splash = show_splash()
+        wait_for_warmup(app, warmup)
 
-    # Launch main application
+    # Launch main application (modules already imported by the warmup;
+    # AIBotGUI takes no prebuilt engine, so it opens the database itself)
     from ai_bot.gui.main_window import AIBotGUI
     window = AIBotGUI()
     window.show()
+    if splash is not None:
+        splash.finish(window)
     sys.exit(app.exec_())
 
 
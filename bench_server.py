@@ -0,0 +1,117 @@
+"""Throughput benchmark for the local query server.
+
+Drives a running ``query_server.py`` from a local load generator: each
+client thread holds one keep-alive connection and issues queries back to
+back. Reports requests/second and latency percentiles.
+
+Usage:
+    python query_server.py &
+    python bench_server.py --clients 16 --requests 2000 --mode offline
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import urlencode
+
+DEFAULT_QUERIES = [
+    "Python", "Albert Einstein", "Photosynthesis", "World War II",
+    "Mount Everest", "Machine learning", "Ancient Rome", "DNA",
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of pre-sorted samples."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+    return samples[index]
+
+
+def run_client(host: str, port: int, paths: List[str],
+               latencies: List[float], errors: List[int]) -> None:
+    """Issue requests over a single keep-alive connection."""
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    local: List[float] = []
+    failed = 0
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                failed += 1
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            continue
+        local.append(time.perf_counter() - start)
+    conn.close()
+    latencies.extend(local)
+    errors.append(failed)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Benchmark the query server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=8,
+                        help="Concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=1000,
+                        help="Total number of requests")
+    parser.add_argument("--mode", default="offline",
+                        choices=["hybrid", "online", "offline"])
+    parser.add_argument("--json", action="store_true",
+                        help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    per_client = max(1, args.requests // args.clients)
+    latencies: List[float] = []
+    errors: List[int] = []
+    threads = []
+    for c in range(args.clients):
+        paths = [
+            "/query?" + urlencode({
+                "q": DEFAULT_QUERIES[(c + i) % len(DEFAULT_QUERIES)],
+                "mode": args.mode,
+            })
+            for i in range(per_client)
+        ]
+        threads.append(threading.Thread(
+            target=run_client,
+            args=(args.host, args.port, paths, latencies, errors)))
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    summary = {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"{summary['requests']} requests in {summary['seconds']}s "
+              f"({summary['rps']} req/s), {summary['errors']} errors")
+        print(f"latency p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+              f"p99={summary['p99_ms']}ms")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
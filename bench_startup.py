@@ -0,0 +1,91 @@
+"""Startup budget check for the command line interface.
+
+Measures wall-clock time for ``cli_interface.py --help`` and for reaching
+the first prompt (answering ``quit``), and uses ``-X importtime`` to list
+the slowest imports. The timings depend on the machine and are only
+informational; CI checks the imports instead (tests/test_cli_startup.py).
+Exits non-zero when a run fails or exceeds the budget.
+
+Usage:
+    python bench_startup.py --budget-ms 100 --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli_interface.py")
+
+
+def time_run(args: List[str], stdin: str = "") -> float:
+    """Return the wall time in seconds of one CLI invocation.
+
+    Raises:
+        RuntimeError: If the CLI exits with a non-zero status, which would
+            make the timing meaningless.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, CLI] + args, input=stdin.encode(),
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          check=False)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        error = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise RuntimeError(f"cli_interface.py {' '.join(args)} exited with "
+                           f"{proc.returncode}: {error[-1] if error else ''}")
+    return elapsed
+
+
+def slowest_imports(args: List[str], stdin: str = "",
+                    top: int = 10) -> List[Tuple[int, str]]:
+    """Return (cumulative microseconds, module) for the slowest imports."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", CLI] + args,
+                          input=stdin.encode(), stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, check=False)
+    rows = []
+    for line in proc.stderr.decode("utf-8", "replace").splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        # Only top-level imports; nested ones are indented
+        if name.startswith("  "):
+            continue
+        rows.append((int(fields[1]), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Run the startup checks and print a report."""
+    parser = argparse.ArgumentParser(description="Check CLI startup time")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="Maximum allowed median wall time per scenario")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Runs per scenario (median is compared)")
+    args = parser.parse_args(argv)
+
+    scenarios = [("--help", ["--help"], ""), ("first prompt", [], "quit\n")]
+    failed = False
+    for label, cli_args, stdin in scenarios:
+        try:
+            samples = sorted(time_run(cli_args, stdin) for _ in range(args.runs))
+        except RuntimeError as exc:
+            print(f"{label:<14} FAILED: {exc}")
+            failed = True
+            continue
+        median_ms = samples[len(samples) // 2] * 1000
+        status = "ok" if median_ms <= args.budget_ms else "OVER BUDGET"
+        failed = failed or median_ms > args.budget_ms
+        print(f"{label:<14} median {median_ms:7.1f} ms "
+              f"(budget {args.budget_ms:.0f} ms) {status}")
+        for micros, module in slowest_imports(cli_args, stdin, top=5):
+            print(f"    {micros / 1000:7.1f} ms  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,27 +2,146 @@
 
 Use this if you prefer command-line over GUI.
 """
-from ai_bot.core.ai_engine import AIEngine
-from ai_bot.modules.web_search import WebSearcher
-from ai_bot.modules.wikipedia_offline import WikipediaOffline
 import sys
 import os
+import threading
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
 class AIBOT_CLI:
-    """Command line interface for AI Bot."""
+    """Command line interface for AI Bot.
+
+    Components are built on first use so that ``help``, ``history`` and the
+    first prompt do not pay for database setup or HTTP client imports, and
+    offline-only sessions never import the web search stack.
+    """
 
     def __init__(self):
-        """Initialize the CLI with AI engine and search modules."""
-        self.engine = AIEngine()
-        self.web_searcher = WebSearcher()
-        self.wiki_offline = WikipediaOffline()
+        """Initialize the CLI; heavy components are created lazily."""
+        self._config = None
+        self._engine = None
+        self._web_searcher = None
+        self._wiki_offline = None
+        self._online_search = None
+        self._offline_search = None
+        self._warmer = None
+        self._router = None
+        # Guard lazy construction against the background cache warmer; one
+        # lock per component, so opening the offline database on the warmer
+        # thread does not hold up e.g. the history command
+        self._locks = {name: threading.Lock() for name in (
+            'config', 'engine', 'web_searcher', 'wiki_offline', 'router',
+            'online_search', 'offline_search')}
+
+    @property
+    def config(self):
+        """Parsed config.json, loaded on first access."""
+        with self._locks['config']:
+            if self._config is None:
+                from ai_bot.core.settings import load_config
+                self._config = load_config()
+        return self._config
+
+    @property
+    def engine(self):
+        """The AIEngine, constructed on first access."""
+        with self._locks['engine']:
+            if self._engine is None:
+                from ai_bot.core.ai_engine import AIEngine
+                self._engine = AIEngine()
+        return self._engine
+
+    @property
+    def web_searcher(self):
+        """The web searcher, constructed on the first online search."""
+        with self._locks['web_searcher']:
+            if self._web_searcher is None:
+                from ai_bot.core.settings import get_setting
+                if get_setting(self.config, 'online.pooled_http', False):
+                    from ai_bot.modules.pooled_web_search import PooledWebSearcher
+                    self._web_searcher = PooledWebSearcher(self.config)
+                else:
+                    from ai_bot.modules.web_search import WebSearcher
+                    self._web_searcher = WebSearcher()
+        return self._web_searcher
+
+    @property
+    def wiki_offline(self):
+        """The offline Wikipedia database, set up on first access."""
+        with self._locks['wiki_offline']:
+            if self._wiki_offline is None:
+                from ai_bot.modules.offline_reader import open_offline_source
+                self._wiki_offline = open_offline_source(self.config)
+        return self._wiki_offline
+
+    @property
+    def router(self):
+        """Hybrid-mode source router, or None if routing is disabled."""
+        with self._locks['router']:
+            if self._router is None:
+                from ai_bot.core.metrics import REGISTRY
+                from ai_bot.core.routing import SourceRouter
+                self._router = SourceRouter.from_config(self.config) or False
+                if self._router:
+                    REGISTRY.add_collector('routing', self._router.stats)
+        return self._router or None
+
+    def online_search(self, query: str):
+        """Online search callable; builds the online pipeline on first call."""
+        with self._locks['online_search']:
+            if self._online_search is None:
+                from ai_bot.core.pipeline import build_online_search
+                self._online_search = build_online_search(
+                    self.web_searcher.search, self.config)
+        return self._online_search(query)
+
+    def offline_search(self, query: str):
+        """Offline search callable; opens the database on first call."""
+        with self._locks['offline_search']:
+            if self._offline_search is None:
+                from ai_bot.core.pipeline import build_offline_search
+                self._offline_search = build_offline_search(
+                    self.wiki_offline.search, self.config)
+        return self._offline_search(query)
+
+    def start_warmup(self) -> None:
+        """Warm caches in the background when enabled in config.json.
+
+        Components are built on the warmer thread, so the prompt appears
+        without waiting for them. Only the thread-safe pooled reader is
+        warmed; the ``WikipediaOffline`` fallback keeps its connection on
+        the thread that opens it, so it is left to the first query.
+        """
+        from ai_bot.core.settings import get_setting
+
+        if not (get_setting(self.config, 'performance.preload_database', False)
+                or get_setting(self.config, 'performance.background_sync', False)):
+            return
+
+        def warm():
+            from ai_bot.core.metrics import REGISTRY
+            from ai_bot.core.warmup import CacheWarmer
 
-        # Initialize Wikipedia
-        if not self.wiki_offline.initialized:
-            self.wiki_offline.setup_database()
+            try:
+                with self._locks['wiki_offline']:
+                    if self._wiki_offline is None:
+                        from ai_bot.modules.offline_reader import open_pooled_reader
+                        self._wiki_offline = open_pooled_reader(self.config)
+                    if not getattr(self._wiki_offline, 'thread_safe', False):
+                        return
+                self._warmer = CacheWarmer.from_config(
+                    self.offline_search, self.config,
+                    history_fn=lambda limit: self.engine.get_history(limit),
+                    article_fn=getattr(self.wiki_offline, 'get_article', None))
+                if self._warmer is not None:
+                    REGISTRY.add_collector('warmup', self._warmer.stats)
+                    self._warmer.run()
+            except Exception:  # pylint: disable=broad-except
+                pass  # Warmup is best effort; queries build what they need
+
+        threading.Thread(target=warm, name='aibot-cache-warmer',
+                         daemon=True).start()
 
     def print_header(self):
         """Print welcome header."""
@@ -37,7 +156,8 @@ class AIBOT_CLI:
         print("  search <query>  - Search for something")
         print("  mode <m>        - Change mode (hybrid/online/offline)")
         print("  history         - Show search history")
-        print("  offline-list    - List available offline articles")
+        print("  offline-list [t] - List offline articles (after title t)")
+        print("  stats [prom]    - Show latency stats (prom = Prometheus text)")
         print("  clear           - Clear cache")
         print("  help            - Show this menu")
         print("  quit/exit       - Exit the application\n")
@@ -52,16 +172,34 @@ class AIBOT_CLI:
             print("❌ Empty search query")
             return
 
-        print(f"\n🔍 Searching for: {query}")
-        print("Please wait...\n")
+        print(f"\n🔍 Searching for: {query}\n")
+
+        from ai_bot.core.streaming import EVENT_FINAL, preview_results, stream_query
+        from ai_bot.core.warmup import ACTIVITY
 
-        result = self.engine.process_query(
-            query,
-            self.web_searcher.search,
-            self.wiki_offline.search
-        )
+        labels = {'offline': '📚 Offline', 'web': '🌐 Web'}
+        result = {}
+        with ACTIVITY.interactive():
+            # Show each source as soon as it answers, then the merged result
+            for event in stream_query(self.engine, query,
+                                      self.online_search, self.offline_search,
+                                      router=self.router):
+                if event['event'] == EVENT_FINAL:
+                    result = event['result']
+                    break
+                label = labels.get(event['event'], event['event'])
+                if event.get('error'):
+                    print(f"{label} ({event['elapsed_ms']:.0f}ms): "
+                          f"unavailable ({event['error']})")
+                elif event['results']:
+                    print(f"{label} ({event['elapsed_ms']:.0f}ms):")
+                    for line in preview_results(event['results']):
+                        print(f"  • {line}")
+                else:
+                    print(f"{label} ({event['elapsed_ms']:.0f}ms): no results")
+        print()
 
-        if result['success']:
+        if result.get('success'):
             print("✅ Search successful!\n")
             print("-" * 60)
             print(result['response'])
@@ -69,6 +207,15 @@ class AIBOT_CLI:
             print(f"\nMode: {result['mode']}")
             print(f"Sources: {', '.join(result['sources'])}")
             print(f"Time: {result['timestamp']}")
+            routing = result.get('routing')
+            if routing:
+                web = 'web' if routing['web'] else 'offline only'
+                print(f"Routing: {web} ({routing['reason']})")
+            timings = result.get('timings', {})
+            if timings:
+                stages = ', '.join(
+                    f"{stage} {ms:.0f}ms" for stage, ms in timings.items())
+                print(f"Timings: {stages}")
         else:
             error_msg = result.get('response', 'Unknown error')
             print(f"❌ Search failed: {error_msg}")
@@ -103,9 +250,34 @@ class AIBOT_CLI:
             timestamp = item.get('timestamp', 'N/A')[:16]
             print(f"  {i}. [{timestamp}] ({mode}) {query}")
 
-    def list_offline_articles(self) -> None:
-        """List available offline articles."""
-        articles = self.wiki_offline.list_articles(20)
+    def show_stats(self, fmt: str = "") -> None:
+        """Show per-stage latency percentiles for this session.
+
+        Args:
+            fmt: 'prom' or 'prometheus' for Prometheus text output.
+        """
+        from ai_bot.core.metrics import REGISTRY, format_stats
+
+        if fmt.lower() in ('prom', 'prometheus'):
+            print(REGISTRY.to_prometheus(), end='')
+            return
+        snapshot = REGISTRY.snapshot()
+        if not snapshot['latency']:
+            print("No queries timed yet")
+            return
+        print("\n⏱️  Latency by stage:\n")
+        print(format_stats(snapshot))
+
+    def list_offline_articles(self, after: str = "") -> None:
+        """List available offline articles.
+
+        Args:
+            after: Continue the listing after this title (next page).
+        """
+        if after:
+            articles = self.wiki_offline.list_articles(20, after=after)
+        else:
+            articles = self.wiki_offline.list_articles(20)
         count = self.wiki_offline.get_article_count()
 
         print("\n📚 Wikipedia Offline Database")
@@ -115,6 +287,8 @@ class AIBOT_CLI:
             print("Available articles:")
             for i, article in enumerate(articles, 1):
                 print(f"  {i}. {article}")
+            if len(articles) == 20:
+                print(f"\nNext page: offline-list {articles[-1]}")
         else:
             print("No articles found in database")
 
@@ -122,6 +296,7 @@ class AIBOT_CLI:
         """Main CLI loop."""
         self.print_header()
         self.print_menu()
+        self.start_warmup()
 
         while True:
             try:
@@ -155,7 +330,10 @@ class AIBOT_CLI:
                     self.show_history()
 
                 elif cmd == 'offline-list':
-                    self.list_offline_articles()
+                    self.list_offline_articles(arg)
+
+                elif cmd == 'stats':
+                    self.show_stats(arg)
 
                 elif cmd == 'clear':
                     self.engine.clear_cache()
@@ -175,11 +353,138 @@ class AIBOT_CLI:
                 print(f"❌ Error: {exc}")
 
 
-def main():
+def _print_json(payload) -> None:
+    """Write one JSON document to stdout."""
+    import json
+
+    print(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def run_command(args) -> int:
+    """Execute a one-shot subcommand and return the process exit code.
+
+    Args:
+        args: Parsed arguments from :func:`build_parser`.
+
+    Returns:
+        0 on success, 1 if the search failed or nothing was found.
+    """
+    cli = AIBOT_CLI()
+
+    if args.command == 'search':
+        from ai_bot.core.routing import routed_query
+
+        if args.mode and not cli.engine.set_mode(args.mode):
+            print(f"Invalid mode: {args.mode}", file=sys.stderr)
+            return 2
+        if args.stream:
+            from ai_bot.core.streaming import EVENT_FINAL, stream_query
+
+            result = {}
+            for event in stream_query(cli.engine, args.query,
+                                      cli.online_search, cli.offline_search,
+                                      router=cli.router):
+                _print_json(event)
+                sys.stdout.flush()
+                if event['event'] == EVENT_FINAL:
+                    result = event['result']
+            return 0 if result.get('success') else 1
+        result = routed_query(
+            cli.engine, args.query, cli.online_search, cli.offline_search,
+            cli.router)
+        if args.json:
+            _print_json(result)
+        elif result.get('success'):
+            print(result.get('response', ''))
+        else:
+            print(result.get('response', 'Unknown error'), file=sys.stderr)
+        return 0 if result.get('success') else 1
+
+    if args.command == 'lookup':
+        from ai_bot.core.pipeline import lookup_title
+
+        found = lookup_title(cli.offline_search, args.title)
+        if args.json:
+            _print_json(found)
+        else:
+            for item in found['results']:
+                if isinstance(item, dict):
+                    print(item.get('title', ''))
+                else:
+                    print(item)
+        return 0 if found['found'] else 1
+
+    if args.command == 'history':
+        history = cli.engine.get_history(args.limit)
+        if args.json:
+            _print_json(history)
+        else:
+            for item in history:
+                print(f"{item.get('timestamp', '')[:16]}\t"
+                      f"{item.get('mode', '')}\t{item.get('query', '')}")
+        return 0
+
+    if args.command == 'count':
+        count = cli.wiki_offline.get_article_count()
+        if args.json:
+            _print_json({'count': count})
+        else:
+            print(count)
+        return 0
+
+    return 2
+
+
+def build_parser():
+    """Create the argument parser for one-shot subcommands."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="AI Bot - hybrid search engine (command line version). "
+                    "Run without a command for the interactive prompt.")
+    sub = parser.add_subparsers(dest='command')
+
+    search = sub.add_parser('search', help='Run one query and exit')
+    search.add_argument('query', help='Search query')
+    search.add_argument('--mode', choices=['hybrid', 'online', 'offline'],
+                        help='Search mode for this query')
+    search.add_argument('--json', action='store_true',
+                        help='Print the full result as JSON')
+    search.add_argument('--stream', action='store_true',
+                        help='Print one JSON event per line as each source '
+                             'answers, ending with the merged result')
+
+    lookup = sub.add_parser('lookup', help='Look up an offline article by title')
+    lookup.add_argument('title', help='Article title')
+    lookup.add_argument('--json', action='store_true', help='Print JSON')
+
+    history = sub.add_parser('history', help='Print recent searches')
+    history.add_argument('--limit', type=int, default=10,
+                         help='Number of entries (default: 10)')
+    history.add_argument('--json', action='store_true', help='Print JSON')
+
+    count = sub.add_parser('count', help='Print the offline article count')
+    count.add_argument('--json', action='store_true', help='Print JSON')
+
+    sub.add_parser('serve', add_help=False,
+                   help='Run the local HTTP query server (see query_server.py)')
+    return parser
+
+
+def main(argv=None):
     """Main entry point for the CLI application."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'serve':
+        import query_server
+        return query_server.main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if args.command:
+        return run_command(args)
     cli = AIBOT_CLI()
     cli.run()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
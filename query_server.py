@@ -0,0 +1,311 @@
+"""Local HTTP/JSON query server for AI Bot.
+
+Keeps one warm AIEngine, WebSearcher and WikipediaOffline in memory so
+scripts, the GUI and the CLI on the same host can share caches instead of
+each building their own. Caches are warmed in the background at startup
+according to the ``performance`` section of config.json. Requests are handled by a bounded worker pool
+over keep-alive HTTP/1.1 connections.
+
+Endpoints:
+    GET /query?q=<text>[&mode=hybrid|online|offline][&priority=batch]
+    GET /lookup?title=<title>
+    GET /history?limit=<n>
+    GET /stats     (latency percentiles per stage, JSON)
+    GET /metrics   (Prometheus text format)
+    GET /health
+
+Usage:
+    python query_server.py --port 8765
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai_bot.core.metrics import REGISTRY  # noqa: E402
+from ai_bot.core.pipeline import (  # noqa: E402
+    build_offline_search, build_online_search, lookup_title)
+from ai_bot.core.routing import SourceRouter, routed_query  # noqa: E402
+from ai_bot.core.settings import get_setting, load_config  # noqa: E402
+from ai_bot.core.singleflight import SingleFlight, query_key  # noqa: E402
+from ai_bot.core.warmup import ACTIVITY, CacheWarmer  # noqa: E402
+from ai_bot.modules.rate_limit import (  # noqa: E402
+    PRIORITY_BATCH, PRIORITY_INTERACTIVE, search_priority)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+VALID_MODES = ("hybrid", "online", "offline")
+
+
+class QueryService:
+    """Shared warm engine state behind the HTTP handlers."""
+
+    def __init__(self, web_searcher=None, wiki_offline=None, engine_factory=None):
+        """Initialize the service.
+
+        Args:
+            web_searcher: Shared ``WebSearcher``; created if omitted.
+            wiki_offline: Shared ``WikipediaOffline``; created if omitted.
+            engine_factory: Callable returning a new ``AIEngine``; defaults
+                to the ``AIEngine`` class.
+        """
+        if engine_factory is None:
+            from ai_bot.core.ai_engine import AIEngine
+            engine_factory = AIEngine
+        config = load_config()
+        if web_searcher is None:
+            if get_setting(config, "online.pooled_http", False):
+                from ai_bot.modules.pooled_web_search import PooledWebSearcher
+                web_searcher = PooledWebSearcher(config)
+            else:
+                from ai_bot.modules.web_search import WebSearcher
+                web_searcher = WebSearcher()
+        if wiki_offline is None:
+            from ai_bot.modules.offline_reader import open_offline_source
+            wiki_offline = open_offline_source(config)
+
+        self.web_searcher = web_searcher
+        self.wiki_offline = wiki_offline
+        self.online_search = build_online_search(web_searcher.search, config)
+        self.offline_search = build_offline_search(wiki_offline.search, config)
+        self._engine_factory = engine_factory
+        self._engines: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.coalescer = SingleFlight()
+        REGISTRY.add_collector("coalescing", self.coalescer.stats)
+        self.router = SourceRouter.from_config(config)
+        if self.router is not None:
+            REGISTRY.add_collector("routing", self.router.stats)
+        self.default_engine = self.engine_for(None)
+        self.warmer = CacheWarmer.from_config(
+            self.offline_search, config,
+            history_fn=self.recent_history,
+            article_fn=getattr(wiki_offline, "get_article", None))
+        if self.warmer is not None:
+            REGISTRY.add_collector("warmup", self.warmer.stats)
+
+    def engine_for(self, mode: Optional[str]):
+        """Return the shared engine for a mode, creating it on first use.
+
+        Each mode gets its own engine so concurrent requests never race on
+        ``set_mode``; each engine keeps its cache warm across requests.
+        ``recent_history`` merges their histories.
+
+        Args:
+            mode: One of hybrid/online/offline, or None for the default.
+
+        Returns:
+            An ``AIEngine`` instance.
+        """
+        key = mode or ""
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._engine_factory()
+                if mode:
+                    engine.set_mode(mode)
+                self._engines[key] = engine
+            return engine
+
+    def query(self, query: str, mode: Optional[str] = None,
+              batch: bool = False) -> Dict[str, Any]:
+        """Run ``process_query`` on the shared engine for ``mode``.
+
+        Identical queries already in flight for the same mode share a
+        single execution. Batch queries yield to interactive ones when
+        online requests are rate limited. Hybrid queries skip the web when
+        the source router finds the offline answer sufficient.
+        """
+        engine = self.engine_for(mode)
+        priority = PRIORITY_BATCH if batch else PRIORITY_INTERACTIVE
+
+        def run() -> Dict[str, Any]:
+            with search_priority(priority):
+                return routed_query(
+                    engine, query, self.online_search, self.offline_search,
+                    self.router)
+        key = query_key(query, mode or engine.get_mode())
+        if batch:
+            return self.coalescer.do(key, run)
+        with ACTIVITY.interactive():
+            return self.coalescer.do(key, run)
+
+    def lookup(self, title: str) -> Dict[str, Any]:
+        """Look up an offline article by title."""
+        return lookup_title(self.offline_search, title)
+
+    def recent_history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` history entries across every mode's engine.
+
+        Entries are ordered oldest first by timestamp, like
+        ``AIEngine.get_history``; entries that several engines share are
+        returned once.
+        """
+        with self._lock:
+            engines = list(self._engines.values())
+        merged: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for engine in engines:
+            for item in engine.get_history(limit) or []:
+                key = (item.get("timestamp"), item.get("mode"), item.get("query"))
+                merged.setdefault(key, item)
+        entries = sorted(merged.values(),
+                         key=lambda item: str(item.get("timestamp") or ""))
+        return entries[-limit:] if limit > 0 else []
+
+    def history(self, limit: int = 10) -> Dict[str, Any]:
+        """Return recent search history across all modes."""
+        return {"history": self.recent_history(limit)}
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler; one instance per request."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "AIBotQueryServer/1.0"
+    # Close idle keep-alive connections so they do not pin pool workers
+    timeout = 30
+    # Headers and body are written separately; avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Dispatch a GET request to the matching endpoint."""
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        try:
+            status, payload = self._dispatch(parts.path, params)
+        except Exception as exc:  # pylint: disable=broad-except
+            status, payload = 500, {"error": str(exc)}
+        self._send_json(status, payload)
+
+    def _dispatch(self, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        service: QueryService = self.server.service  # type: ignore[attr-defined]
+        if path == "/query":
+            query = params.get("q", "").strip()
+            mode = params.get("mode") or None
+            if not query:
+                return 400, {"error": "Missing 'q' parameter"}
+            if mode and mode not in VALID_MODES:
+                return 400, {"error": f"Invalid mode: {mode}"}
+            batch = params.get("priority", "") == "batch"
+            return 200, service.query(query, mode, batch)
+        if path == "/lookup":
+            title = params.get("title", "").strip()
+            if not title:
+                return 400, {"error": "Missing 'title' parameter"}
+            return 200, service.lookup(title)
+        if path == "/history":
+            try:
+                limit = int(params.get("limit", "10"))
+            except ValueError:
+                return 400, {"error": "'limit' must be an integer"}
+            return 200, service.history(limit)
+        if path == "/stats":
+            return 200, REGISTRY.snapshot()
+        if path == "/metrics":
+            return 200, REGISTRY.to_prometheus()
+        if path == "/health":
+            return 200, {"status": "ok",
+                         "coalescing": service.coalescer.stats()}
+        return 404, {"error": f"Unknown endpoint: {path}"}
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False,
+                              default=str).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence per-request logging."""
+
+
+class QueryServer(HTTPServer):
+    """HTTP server that hands connections to a bounded worker pool."""
+
+    def __init__(self, address: Tuple[str, int], service: QueryService,
+                 workers: int = 16):
+        """Initialize the server.
+
+        Args:
+            address: (host, port) to bind.
+            service: Shared query service.
+            workers: Maximum connections served concurrently.
+        """
+        super().__init__(address, QueryRequestHandler)
+        self.service = service
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="aibot-serve")
+
+    def process_request(self, request, client_address):
+        """Serve each keep-alive connection on a pool worker."""
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-except
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Close the socket and stop the worker pool."""
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          workers: int = 16, service: Optional[QueryService] = None) -> None:
+    """Run the query server until interrupted.
+
+    Args:
+        host: Interface to bind; loopback by default.
+        port: TCP port to listen on.
+        workers: Size of the worker pool.
+        service: Pre-built service; a warm one is created if omitted.
+    """
+    service = service or QueryService()
+    server = QueryServer((host, port), service, workers)
+    print(f"AI Bot query server listening on http://{host}:{server.server_port}")
+    if service.warmer is not None:
+        service.warmer.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        if service.warmer is not None:
+            service.warmer.stop(timeout=1.0)
+        server.server_close()
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point for ``serve``."""
+    parser = argparse.ArgumentParser(description="Run the AI Bot query server")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="Interface to bind (default: loopback only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help="TCP port to listen on")
+    parser.add_argument("--workers", type=int, default=16,
+                        help="Number of worker threads")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -25,6 +25,10 @@ setup(
         "PyQt5>=5.15.0",
         "wikipedia-api>=0.5.0",
     ],
+    extras_require={
+        # Offline similarity search (wiki_to_sqlite.py --similarity-index)
+        "similarity": ["numpy>=1.21"],
+    },
     entry_points={
         "console_scripts": [
             "ai-bot=ai_bot.gui.main_window:main",
@@ -0,0 +1,155 @@
+"""Local fake search provider with latency and error injection.
+
+Serves DuckDuckGo Instant Answer shaped JSON on loopback so the online
+path (retries, circuit breaker, pooling, fan-out) can be exercised without
+the network. Latency and failure behaviour can be changed while running.
+
+Usage:
+    python tests/fake_search_server.py --port 8900 --latency 0.5 --error-rate 0.3
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+class FaultPlan:
+    """Mutable fault-injection settings shared with the handlers."""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None):
+        """Initialize the plan.
+
+        Args:
+            latency: Seconds to sleep before answering each request.
+            error_rate: Fraction of requests answered with ``error_status``.
+            error_status: HTTP status used for injected errors.
+            seed: Optional seed for reproducible error sequences.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_outcome(self) -> bool:
+        """Count a request and return True if it should fail."""
+        with self._lock:
+            self.requests += 1
+            return self._rng.random() < self.error_rate
+
+
+def fake_answer(query: str) -> Dict[str, Any]:
+    """Build a deterministic Instant Answer document for ``query``."""
+    slug = query.replace(" ", "_")
+    return {
+        "Heading": query,
+        "AbstractText": f"{query} is a topic served by the local fake provider.",
+        "AbstractURL": f"http://fake.local/wiki/{slug}",
+        "RelatedTopics": [
+            {"Text": f"{query} history - Background on {query}",
+             "FirstURL": f"http://fake.local/wiki/{slug}_history"},
+        ],
+    }
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer a search request, applying the fault plan."""
+        plan: FaultPlan = self.server.plan  # type: ignore[attr-defined]
+        fail = plan.next_outcome()
+        if plan.latency:
+            time.sleep(plan.latency)
+        if fail:
+            body = b'{"error": "injected failure"}'
+            self.send_response(plan.error_status)
+        else:
+            params = parse_qs(urlsplit(self.path).query)
+            query = (params.get("q") or [""])[-1]
+            body = json.dumps(fake_answer(query)).encode("utf-8")
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence per-request logging."""
+
+
+class FakeSearchServer:
+    """Background fake provider bound to an ephemeral loopback port."""
+
+    def __init__(self, plan: Optional[FaultPlan] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        """Initialize the server (not started).
+
+        Args:
+            plan: Fault plan; a healthy plan is used if omitted.
+            host: Interface to bind.
+            port: Port to bind; 0 picks a free port.
+        """
+        self.plan = plan or FaultPlan()
+        self._server = ThreadingHTTPServer((host, port), _FakeHandler)
+        self._server.daemon_threads = True
+        self._server.plan = self.plan  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as ``online.api_url``."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeSearchServer":
+        """Start serving on a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeSearchServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Run the fake provider in the foreground."""
+    parser = argparse.ArgumentParser(description="Local fake search provider")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds of delay added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests that fail (0-1)")
+    parser.add_argument("--status", type=int, default=503,
+                        help="HTTP status returned for injected failures")
+    args = parser.parse_args(argv)
+    server = FakeSearchServer(
+        FaultPlan(args.latency, args.error_rate, args.status), port=args.port)
+    print(f"Fake search provider on {server.url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,37 @@
+"""Tests for the asyncio HTTP client."""
+import asyncio
+import gzip
+
+import pytest
+
+from ai_bot.modules.async_http import AsyncHTTPError, fetch
+
+
+def _serve(body: bytes, encoding: str):
+    """Run ``fetch`` against a one-shot local server returning ``body``."""
+
+    async def handler(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Encoding: %s\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (encoding.encode(), len(body), body))
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await fetch(f"http://127.0.0.1:{port}/", timeout=5)
+
+    return asyncio.run(run())
+
+
+def test_gzip_body_is_decoded():
+    assert _serve(gzip.compress(b'{"ok": true}'), "gzip") == b'{"ok": true}'
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_corrupt_compressed_body_is_a_failed_fetch(encoding):
+    with pytest.raises(AsyncHTTPError):
+        _serve(b"definitely not compressed", encoding)
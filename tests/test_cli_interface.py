@@ -0,0 +1,20 @@
+"""Tests for the CLI's lazily built components."""
+import threading
+
+from cli_interface import AIBOT_CLI
+
+
+def _join_warmer():
+    for thread in threading.enumerate():
+        if thread.name == "aibot-cache-warmer":
+            thread.join(5)
+
+
+def test_warmer_leaves_the_unpooled_source_to_the_main_thread():
+    cli = AIBOT_CLI()
+    cli._config = {"performance": {"preload_database": True},
+                   "offline": {"read_pool": False}}
+    cli.start_warmup()
+    _join_warmer()
+    assert cli._wiki_offline is None
+    assert cli._warmer is None
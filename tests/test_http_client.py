@@ -0,0 +1,33 @@
+"""Tests for the pooled HTTP client."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_bot.modules.http_client import HTTPClient
+from fake_search_server import FakeSearchServer, FaultPlan
+
+
+def test_open_connections_never_exceed_the_pool_size():
+    with FakeSearchServer(FaultPlan(latency=0.05)) as server:
+        client = HTTPClient(pool_size=2, timeout=5)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            statuses = list(pool.map(
+                lambda n: client.get(server.url, {"q": str(n)}).status, range(12)))
+        stats = client.stats()
+        client.close()
+    assert statuses == [200] * 12
+    assert stats["connections_opened"] == 2
+    assert stats["requests"] == 12
+    assert stats["open_connections"] == stats["idle_connections"] == 2
+
+
+def test_waiting_for_a_connection_times_out():
+    with FakeSearchServer(FaultPlan(latency=0.5)) as server:
+        client = HTTPClient(pool_size=1, timeout=0.2)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            slow = pool.submit(client.get, server.url, {"q": "a"}, None, 5)
+            with pytest.raises(TimeoutError):
+                client.get(server.url, {"q": "b"})
+            assert slow.result().ok
+        assert client.stats()["pool_timeouts"] == 1
+        client.close()
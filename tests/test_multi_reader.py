@@ -0,0 +1,72 @@
+"""Tests for the per-language fan-out reader."""
+import threading
+import time
+
+from ai_bot.modules.multi_reader import MultiLanguageReader
+
+
+class FakeReader:
+    """Duck-typed OfflineReader with an optional stall."""
+
+    def __init__(self, lang, articles=(), gate=None):
+        self.lang = lang
+        self.articles = set(articles)
+        self.gate = gate
+
+    def _stall(self):
+        if self.gate is not None:
+            self.gate.wait(5)
+
+    def search(self, query):
+        self._stall()
+        return [{"title": f"{query} ({self.lang})"}]
+
+    def get_article(self, title, max_chars=None):
+        self._stall()
+        return f"{title} in {self.lang}" if title in self.articles else None
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def test_stalled_language_is_skipped_until_its_calls_return():
+    gate = threading.Event()
+    reader = MultiLanguageReader(
+        {"en": FakeReader("en"), "de": FakeReader("de", gate=gate)},
+        deadline=0.05, max_pending=1)
+    try:
+        assert [r["language"] for r in reader.search("q")] == ["en"]
+        assert [r["language"] for r in reader.search("q")] == ["en"]
+        stats = reader.stats()
+        assert stats["de_late"] == 1 and stats["de_skipped"] == 1
+        assert stats["de_pending"] == 1
+
+        gate.set()
+        deadline = time.monotonic() + 5
+        while reader.stats()["de_pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [r["language"] for r in reader.search("q")] == ["en", "de"]
+    finally:
+        gate.set()
+        reader.close()
+
+
+def test_get_article_prefers_priority_and_passes_over_stalls():
+    gate = threading.Event()
+    reader = MultiLanguageReader({
+        "en": FakeReader("en"),
+        "de": FakeReader("de", ["Berlin"], gate=gate),
+        "fr": FakeReader("fr", ["Berlin", "Paris"]),
+    }, deadline=0.05)
+    try:
+        assert reader.get_article("Paris") == "Paris in fr"
+        assert reader.get_article("Berlin") == "Berlin in fr"
+        gate.set()
+        assert reader.get_article("Berlin") == "Berlin in de"
+        assert reader.get_article("Rome") is None
+    finally:
+        gate.set()
+        reader.close()
@@ -0,0 +1,84 @@
+"""Tests for the offline reader."""
+import time
+
+import pytest
+
+import wiki_to_sqlite
+from ai_bot.modules.offline_reader import OfflineReader
+
+ARTICLES = {
+    "Python": "Python is a large snake of tropical forests.",
+    "Rust": "Rust is an iron oxide formed by corrosion.",
+    "Go": "Go is a board game played with stones.",
+    "Chess": "Chess is a board game for two players.",
+}
+
+
+def _build_in_place(outdir, articles, *flags):
+    folder = outdir / "en" / "articles"
+    folder.mkdir(parents=True, exist_ok=True)
+    for title, text in articles.items():
+        (folder / f"{title}.txt").write_text(text, encoding="utf-8")
+    assert wiki_to_sqlite.main(["--outdir", str(outdir), "--in-place", *flags]) == 0
+    return outdir / "en" / "wikipedia.db"
+
+
+@pytest.fixture(name="db_path")
+def fixture_db_path(tmp_path):
+    pytest.importorskip("numpy")
+    return _build_in_place(tmp_path, ARTICLES, "--similarity-index")
+
+
+def test_in_place_rebuild_reopens_the_sidecars(tmp_path):
+    db_path = _build_in_place(tmp_path, ARTICLES, "--article-store")
+    reader = OfflineReader(db_path, preload_titles=True, reload_interval=0.01)
+    try:
+        assert reader.title_index is not None and reader.store is not None
+        assert reader.search("Berlin") == []
+        assert reader.get_article("Python").startswith("Python is a large snake")
+
+        _build_in_place(tmp_path, {"Berlin": "Berlin is the capital of Germany.",
+                                   "Python": "Python is a programming language."},
+                        "--article-store")
+        deadline = time.monotonic() + 5
+        while not reader.search("Berlin") and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert reader.swaps >= 1
+        assert [item["title"] for item in reader.search("Berlin")] == ["Berlin"]
+        assert reader.search("Python")[0]["summary"].startswith(
+            "Python is a programming language")
+        assert reader.get_article("Python").startswith("Python is a programming")
+    finally:
+        reader.close()
+
+
+def test_fallback_is_off_by_default(db_path):
+    reader = OfflineReader.from_config({"offline": {}}, db_path=db_path)
+    try:
+        assert reader.search("tropical snake") == []
+        assert reader.similar("tropical snake")[0]["title"] == "Python"
+    finally:
+        reader.close()
+
+
+def test_weak_matches_are_dropped(db_path):
+    reader = OfflineReader(db_path, similarity_fallback=True,
+                           similarity_min_score=0.0)
+    try:
+        scores = {item["title"]: item["score"]
+                  for item in reader.search("tropical board")}
+    finally:
+        reader.close()
+    assert set(scores) == {"Python", "Go", "Chess"}
+    assert min(scores.values()) < max(scores.values())
+
+    cutoff = (min(scores.values()) + max(scores.values())) / 2
+    reader = OfflineReader(db_path, similarity_fallback=True,
+                           similarity_min_score=cutoff)
+    try:
+        found = {item["title"] for item in reader.search("tropical board")}
+        assert reader.stats()["similarity_fallbacks"] == 1
+    finally:
+        reader.close()
+    assert found == {title for title, score in scores.items() if score >= cutoff}
+    assert found and found != set(scores)
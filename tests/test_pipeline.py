@@ -0,0 +1,70 @@
+"""Tests for the assembly of the online search stack."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_bot.core.metrics import REGISTRY
+from ai_bot.core.pipeline import build_online_search
+from ai_bot.modules.rate_limit import PRIORITY_BATCH, search_priority
+
+
+def _config(**online):
+    settings = {"rate_limit_per_second": 1000, "rate_limit_burst": 1000,
+                "retry_count": 3}
+    settings.update(online)
+    return {"online": settings, "search": {"timeout_seconds": 5}}
+
+
+def test_every_attempt_takes_a_token():
+    calls = []
+
+    def flaky(query):
+        calls.append(query)
+        if len(calls) < 3:
+            raise OSError("provider down")
+        return [{"title": query}]
+
+    search = build_online_search(flaky, _config())
+    assert search("q") == [{"title": "q"}]
+    counters = REGISTRY.snapshot()["counters"]
+    assert counters["rate_limit"]["granted"] == 3
+    assert counters["online"]["attempts"] == 3
+
+
+def test_priority_reaches_the_limiter_through_the_workers():
+    REGISTRY.reset()
+    search = build_online_search(lambda query: [], _config())
+    with search_priority(PRIORITY_BATCH):
+        search("q")
+    assert REGISTRY.snapshot()["latency"]["queue_wait_batch"]["count"] == 1
+    assert "queue_wait_interactive" not in REGISTRY.snapshot()["latency"]
+
+
+def test_interactive_search_overtakes_a_batch_backlog():
+    REGISTRY.reset()
+    search = build_online_search(
+        lambda query: [{"title": query}],
+        _config(rate_limit_per_second=10, rate_limit_burst=1))
+
+    def batch(n):
+        with search_priority(PRIORITY_BATCH):
+            return search(f"batch {n}")
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        backlog = [pool.submit(batch, n) for n in range(12)]
+        time.sleep(0.15)
+        start = time.monotonic()
+        assert search("now") == [{"title": "now"}]
+        waited = time.monotonic() - start
+        assert all(future.result() for future in backlog)
+    assert waited < 0.5
+    assert REGISTRY.snapshot()["counters"]["online"]["saturated"] == 0
+
+
+def test_fan_out_providers_are_paced_in_the_callers_priority():
+    REGISTRY.reset()
+    search = build_online_search(
+        lambda query: [{"title": query}],
+        _config(provider=["duckduckgo", "duckduckgo"], fanout_max_parallel=2))
+    with search_priority(PRIORITY_BATCH):
+        assert search("q")
+    assert "queue_wait_interactive" not in REGISTRY.snapshot()["latency"]
@@ -0,0 +1,54 @@
+"""Tests for the multi-provider fan-out."""
+import pytest
+
+from ai_bot.modules.providers import (
+    STRATEGY_FIRST, STRATEGY_MERGE, FanOutSearch, ProvidersUnavailable,
+    SearchProvider)
+from ai_bot.modules.resilience import ResilientSearch
+
+
+def _down(query):
+    raise OSError("provider down")
+
+
+def _answer(name):
+    return lambda query: [{"title": f"{query} ({name})", "url": f"http://{name}/"}]
+
+
+@pytest.mark.parametrize("strategy", [STRATEGY_FIRST, STRATEGY_MERGE])
+def test_all_providers_failing_raises(strategy):
+    fanout = FanOutSearch([SearchProvider("a", _down), SearchProvider("b", _down)],
+                          strategy=strategy)
+    with pytest.raises(ProvidersUnavailable):
+        fanout("q")
+    assert fanout.stats()["a_failures"] == 1
+    assert fanout.stats()["b_failures"] == 1
+
+
+@pytest.mark.parametrize("strategy", [STRATEGY_FIRST, STRATEGY_MERGE])
+def test_one_failing_provider_is_tolerated(strategy):
+    fanout = FanOutSearch([SearchProvider("a", _down),
+                           SearchProvider("b", _answer("b"))], strategy=strategy)
+    results = fanout("q")
+    assert [item["provider"] for item in results] == ["b"]
+
+
+def test_empty_answers_are_not_failures():
+    fanout = FanOutSearch([SearchProvider("a", _down),
+                           SearchProvider("b", lambda query: [])])
+    assert fanout("q") == []
+
+
+def test_resilient_search_retries_a_failed_fan_out():
+    calls = []
+
+    def flaky(query):
+        calls.append(query)
+        if len(calls) < 2:
+            raise OSError("provider down")
+        return [{"title": query}]
+
+    fanout = FanOutSearch([SearchProvider("a", flaky)], max_parallel=1)
+    search = ResilientSearch(fanout, retries=2, backoff_base=0.0)
+    assert search("q") == [{"title": "q", "provider": "a"}]
+    assert search.stats()["failures"] == 1
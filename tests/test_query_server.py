@@ -0,0 +1,49 @@
+"""Tests for the shared query service behind the HTTP server."""
+import itertools
+
+from query_server import QueryService
+
+_CLOCK = itertools.count()
+
+
+class HistoryEngine:
+    """Stand-in for AIEngine: records each query with its mode."""
+
+    def __init__(self):
+        self.mode = "hybrid"
+        self.entries = []
+
+    def get_mode(self):
+        return self.mode
+
+    def set_mode(self, mode):
+        self.mode = mode
+
+    def process_query(self, query, web_search_fn, offline_search_fn):
+        self.entries.append({"query": query, "mode": self.mode,
+                             "timestamp": f"2026-01-01T00:00:{next(_CLOCK):02d}"})
+        return {"query": query, "results": offline_search_fn(query)}
+
+    def get_history(self, limit=10):
+        return self.entries[-limit:]
+
+
+class Source:
+    def search(self, query):
+        return [{"title": query.title()}]
+
+    def get_article(self, title):
+        return None
+
+
+def test_history_covers_every_mode():
+    service = QueryService(web_searcher=Source(), wiki_offline=Source(),
+                           engine_factory=HistoryEngine)
+    service.query("first", "offline")
+    service.query("second")
+    service.query("third", "offline")
+
+    history = service.history(10)["history"]
+    assert [item["query"] for item in history] == ["first", "second", "third"]
+    assert [item["query"] for item in service.history(2)["history"]] == [
+        "second", "third"]
@@ -0,0 +1,157 @@
+"""Tests for the timeout, retry and circuit-breaker layer."""
+import threading
+import time
+
+from fake_search_server import FakeSearchServer, FaultPlan
+
+from ai_bot.modules.http_client import HTTPClient
+from ai_bot.modules.pooled_web_search import PooledWebSearcher
+from ai_bot.modules.rate_limit import (
+    PRIORITY_BATCH, RateLimitedSearch, RequestScheduler, search_priority)
+from ai_bot.modules.resilience import (
+    STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, ResilientSearch,
+    attempt_timeout)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _failing(query):
+    raise OSError("provider down")
+
+
+def test_breaker_opens_at_threshold_and_half_opens_after_reset():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    search = ResilientSearch(_failing, retries=0, breaker=breaker)
+
+    assert search("a") == [] and breaker.state == STATE_CLOSED
+    assert search("b") == [] and breaker.state == STATE_OPEN
+    assert search("c") == []
+    assert search.stats()["short_circuited"] == 1
+    assert search.stats()["attempts"] == 2
+
+    clock.now = 30
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    outcomes = iter([OSError("down"), OSError("still down"), None])
+
+    def flaky(query):
+        error = next(outcomes)
+        if error:
+            raise error
+        return [{"title": query}]
+
+    search = ResilientSearch(flaky, retries=0, breaker=breaker)
+    assert search("q") == [] and breaker.state == STATE_OPEN
+    clock.now = 10
+    assert search("q") == [] and breaker.state == STATE_OPEN
+    clock.now = 20
+    assert search("q") == [{"title": "q"}]
+    assert breaker.state == STATE_CLOSED
+    assert breaker.trips == 2
+
+
+def test_failed_attempts_are_retried():
+    calls = []
+
+    def flaky(query):
+        calls.append(query)
+        if len(calls) < 3:
+            raise ValueError("HTTP 503")
+        return [{"title": query}]
+
+    search = ResilientSearch(flaky, retries=3, backoff_base=0.0)
+    assert search("q") == [{"title": "q"}]
+    stats = search.stats()
+    assert stats["attempts"] == 3 and stats["failures"] == 2
+    assert stats["breaker_open"] == 0
+
+
+def test_retries_stop_at_limit():
+    search = ResilientSearch(_failing, retries=2, backoff_base=0.0)
+    assert search("q") == []
+    assert search.stats()["attempts"] == 3
+
+
+def test_queue_timeouts_are_not_provider_failures():
+    calls = []
+    scheduler = RequestScheduler(rate=0.5, burst=1)
+    limited = RateLimitedSearch(lambda query: calls.append(query) or [{"title": query}],
+                                scheduler, max_wait=0.05)
+    breaker = CircuitBreaker(failure_threshold=1)
+    search = ResilientSearch(limited, retries=3, backoff_base=0.0, breaker=breaker)
+    with search_priority(PRIORITY_BATCH):
+        results = [search(str(n)) for n in range(4)]
+    assert results == [[{"title": "0"}], [], [], []]
+    assert calls == ["0"]
+    stats = search.stats()
+    assert stats["rejected"] == 3 and stats["attempts"] == 4
+    assert stats["failures"] == 0 and stats["timeouts"] == 0
+    assert breaker.state == STATE_CLOSED
+
+
+def test_attempt_timeout_is_visible_to_the_search():
+    seen = []
+    search = ResilientSearch(
+        lambda query: seen.append(attempt_timeout(10.0)) or [],
+        attempt_timeout=0.5, retries=0)
+    search("q")
+    assert 0 < seen[0] <= 0.5
+    assert attempt_timeout(10.0) == 10.0
+
+
+def test_running_attempts_hold_their_slot():
+    release = threading.Event()
+    search = ResilientSearch(lambda query: release.wait() and [],
+                             attempt_timeout=0.05, retries=0, max_workers=1)
+    try:
+        assert search("slow") == []
+        assert search("next") == []
+        stats = search.stats()
+        assert stats["timeouts"] == 1
+        assert stats["saturated"] == 1
+        assert stats["attempts"] == 1
+    finally:
+        release.set()
+
+
+def test_slow_provider_times_out_and_frees_the_worker():
+    with FakeSearchServer(FaultPlan(latency=0.5)) as server:
+        config = {"online": {"api_url": server.url, "timeout": 10}}
+        searcher = PooledWebSearcher(config, client=HTTPClient())
+        search = ResilientSearch(searcher.search, attempt_timeout=0.1,
+                                 retries=0, max_workers=1)
+        start = time.monotonic()
+        assert search("slow") == []
+        assert time.monotonic() - start < 0.4
+        # The socket timeout followed the attempt deadline, so the
+        # abandoned request has given its worker back well before 0.5s
+        time.sleep(0.2)
+        server.plan.latency = 0.0
+        assert search("fast")[0]["title"] == "fast"
+        stats = search.stats()
+        assert stats["timeouts"] == 1 and stats["saturated"] == 0
+
+
+def test_injected_errors_trip_the_breaker():
+    with FakeSearchServer(FaultPlan(error_rate=1.0)) as server:
+        config = {"online": {"api_url": server.url}}
+        searcher = PooledWebSearcher(config, client=HTTPClient())
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        search = ResilientSearch(searcher.search, retries=5,
+                                 backoff_base=0.0, breaker=breaker)
+        assert search("q") == []
+        assert breaker.state == STATE_OPEN
+        assert server.plan.requests == 3
@@ -0,0 +1,64 @@
+"""Tests for hybrid-mode source routing."""
+from ai_bot.core.metrics import STAGE_CACHE, MetricsRegistry
+from ai_bot.core.routing import (
+    REASON_EXACT_TITLE, REASON_NO_OFFLINE, SourceRouter, routed_query)
+
+
+class CachingEngine:
+    """Stand-in for AIEngine's hybrid mode: web first, cached responses."""
+
+    def __init__(self):
+        self.cache = {}
+
+    def get_mode(self):
+        return "hybrid"
+
+    def process_query(self, query, web_search_fn, offline_search_fn):
+        if query not in self.cache:
+            results = web_search_fn(query) or offline_search_fn(query)
+            self.cache[query] = {"query": query, "results": results}
+        return self.cache[query]
+
+
+def _sources(calls, offline_titles):
+    def web(query):
+        calls.append("web")
+        return [{"title": f"{query} on the web"}]
+
+    def offline(query):
+        calls.append("offline")
+        return [{"title": title} for title in offline_titles]
+    return web, offline
+
+
+def test_exact_offline_title_skips_the_web():
+    calls = []
+    web, offline = _sources(calls, ["Python"])
+    result = routed_query(CachingEngine(), "python", web, offline,
+                          SourceRouter(), MetricsRegistry())
+    assert calls == ["offline"]
+    assert result["routing"]["reason"] == REASON_EXACT_TITLE
+    assert result["results"] == [{"title": "Python"}]
+
+
+def test_no_offline_results_go_to_the_web():
+    calls = []
+    web, offline = _sources(calls, [])
+    result = routed_query(CachingEngine(), "rust", web, offline,
+                          SourceRouter(), MetricsRegistry())
+    assert calls == ["offline", "web"]
+    assert result["routing"]["reason"] == REASON_NO_OFFLINE
+
+
+def test_cached_answer_skips_lookup_and_routing():
+    calls = []
+    web, offline = _sources(calls, ["Python"])
+    engine, router = CachingEngine(), SourceRouter()
+    routed_query(engine, "python", web, offline, router, MetricsRegistry())
+    calls.clear()
+    result = routed_query(engine, "python", web, offline, router,
+                          MetricsRegistry())
+    assert calls == []
+    assert "routing" not in result
+    assert STAGE_CACHE in result["timings"]
+    assert router.stats()["keywords_exact_queries"] == 1
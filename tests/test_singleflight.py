@@ -0,0 +1,92 @@
+"""Tests for single-flight query coalescing."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_bot.core.singleflight import AsyncSingleFlight, SingleFlight, query_key
+
+
+def test_query_key_normalizes_case_and_whitespace():
+    assert query_key("  Hello   World ", "web") == query_key("hello world", "web")
+
+
+def test_threads_share_one_execution():
+    group = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        release.wait(5)
+        return {"answer": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", work)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while group.calls < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(runs) == 1
+    assert results == [{"answer": 42}] * 4
+    assert group.stats() == {"calls": 4, "executions": 1, "collapsed": 3}
+
+
+def test_async_waiters_share_one_execution():
+    group = AsyncSingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def run():
+        return await asyncio.gather(*(group.do("k", work) for _ in range(3)))
+
+    assert asyncio.run(run()) == [{"answer": 42}] * 3
+    assert len(runs) == 1
+
+
+def test_async_error_reaches_every_waiter():
+    group = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*(group.do("k", work) for _ in range(3)),
+                                    return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(run()))
+
+
+def test_cancelled_leader_hands_off_to_a_waiter():
+    group = AsyncSingleFlight()
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(group.do("k", work))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(group.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == ["done", "done"]
+    # The first waiter re-ran the work; the second waited on it
+    assert len(started) == 2
+    assert group.executions == 2
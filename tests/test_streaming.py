@@ -0,0 +1,92 @@
+"""Tests for the streaming query front-end."""
+from ai_bot.core.metrics import STAGE_CACHE, STAGE_WEB, MetricsRegistry
+from ai_bot.core.routing import SourceRouter
+from ai_bot.core.streaming import EVENT_FINAL, stream_query
+
+
+class CachingEngine:
+    """Stand-in for AIEngine: prefers the web, keeps a response cache."""
+
+    def __init__(self, mode="hybrid"):
+        self.mode = mode
+        self.cache = {}
+
+    def get_mode(self):
+        return self.mode
+
+    def process_query(self, query, web_search_fn, offline_search_fn):
+        if query in self.cache:
+            return self.cache[query]
+        results, offline = [], []
+        if self.mode != "offline":
+            try:
+                results = web_search_fn(query)
+            except OSError:
+                pass
+        if self.mode != "online":
+            offline = offline_search_fn(query)
+        source = "web" if results else "offline"
+        results = results or offline
+        self.cache[query] = {"query": query, "source": source, "results": results}
+        return self.cache[query]
+
+
+def _sources(calls):
+    def web(query):
+        calls.append("web")
+        return [{"title": f"{query} on the web"}]
+
+    def offline(query):
+        calls.append("offline")
+        return [{"title": query.title()}]
+    return web, offline
+
+
+def test_cache_miss_streams_every_source():
+    calls = []
+    web, offline = _sources(calls)
+    events = list(stream_query(CachingEngine(), "python", web, offline,
+                               registry=MetricsRegistry()))
+    assert sorted(e["event"] for e in events[:-1]) == ["offline", "web"]
+    assert events[-1]["event"] == EVENT_FINAL
+    assert events[-1]["result"]["source"] == "web"
+    assert sorted(calls) == ["offline", "web"]
+
+
+def test_cache_hit_skips_the_sources():
+    calls = []
+    web, offline = _sources(calls)
+    engine = CachingEngine()
+    list(stream_query(engine, "python", web, offline, registry=MetricsRegistry()))
+    calls.clear()
+    events = list(stream_query(engine, "python", web, offline,
+                               registry=MetricsRegistry()))
+    assert [e["event"] for e in events] == [EVENT_FINAL]
+    assert calls == []
+    assert STAGE_CACHE in events[0]["result"]["timings"]
+
+
+def test_source_errors_reach_the_engine_and_the_events():
+    def broken(query):
+        raise OSError("provider down")
+
+    calls = []
+    _, offline = _sources(calls)
+    events = list(stream_query(CachingEngine(), "python", broken, offline,
+                               registry=MetricsRegistry()))
+    web_event = next(e for e in events if e["event"] == "web")
+    assert web_event["error"] == "provider down"
+    assert events[-1]["event"] == EVENT_FINAL
+
+
+def test_router_skips_the_web_for_an_exact_title():
+    calls = []
+    web, offline = _sources(calls)
+    events = list(stream_query(CachingEngine(), "python", web, offline,
+                               registry=MetricsRegistry(), router=SourceRouter()))
+    assert [e["event"] for e in events] == ["offline", EVENT_FINAL]
+    assert calls == ["offline"]
+    final = events[-1]["result"]
+    assert final["routing"]["web"] is False
+    assert final["source"] == "offline"
+    assert STAGE_WEB not in final["timings"]
@@ -0,0 +1,23 @@
+"""Tests for the compact title index."""
+from ai_bot.modules.title_index import TitleIndex, write_title_index
+
+
+def test_lookups_run_on_views_of_the_file(tmp_path):
+    path = tmp_path / "titles.idx"
+    write_title_index(path, [(3, "python"), (1, "Python"), (2, "Pythagoras"),
+                             (4, "Über")])
+    index = TitleIndex.load(path)
+
+    assert index.lookup("Python") == 1
+    assert sorted(index.lookup_casefold("PYTHON")) == [(1, "Python"), (3, "python")]
+    assert [title for _, title in index.prefix("pyth")] == [
+        "Pythagoras", "Python", "python"]
+    assert index.lookup("über") is None and index.lookup("Über") == 4
+    assert index.nbytes == path.stat().st_size - 16
+
+
+def test_empty_index(tmp_path):
+    path = tmp_path / "titles.idx"
+    write_title_index(path, [])
+    index = TitleIndex.load(path)
+    assert len(index) == 0 and index.lookup("Python") is None
@@ -0,0 +1,54 @@
+"""Tests for the background cache warmer."""
+from ai_bot.core.warmup import ActivityMonitor, CacheWarmer
+
+
+def _history(*queries):
+    return lambda limit: [{"query": query} for query in queries][-limit:]
+
+
+def _warmer(history, **kwargs):
+    searched, fetched = [], []
+
+    def offline_search(query):
+        searched.append(query)
+        return [{"title": f"{query.title()} article"}, {"title": "Shared"}]
+
+    warmer = CacheWarmer(offline_search, history_fn=history,
+                         article_fn=fetched.append, idle_seconds=0,
+                         activity=ActivityMonitor(), **kwargs)
+    return warmer, searched, fetched
+
+
+def test_replays_the_most_frequent_queries():
+    warmer, searched, _ = _warmer(
+        _history("rust", "python", "go", "Python", "rust", "python"),
+        history_queries=2, hot_titles=0)
+    warmer.run()
+    assert searched == ["python", "rust"]
+    assert warmer.stats()["replayed"] == 2
+
+
+def test_ties_go_to_the_more_recent_query():
+    warmer, searched, _ = _warmer(_history("old", "new"), history_queries=1)
+    warmer.run()
+    assert searched == ["new"]
+
+
+def test_prefetches_titles_weighted_by_query_popularity():
+    warmer, _, fetched = _warmer(
+        _history("rust", "python", "python", "python"), hot_titles=2)
+    warmer.run()
+    assert fetched == ["Shared", "Python article"]
+    assert warmer.stats()["prefetched"] == 2
+
+
+def test_from_config_respects_the_switches():
+    config = {"performance": {"preload_database": False,
+                              "background_sync": False}}
+    assert CacheWarmer.from_config(lambda query: [], config) is None
+
+    config["performance"]["background_sync"] = True
+    warmer = CacheWarmer.from_config(
+        lambda query: [], config, history_fn=_history("q"),
+        article_fn=lambda title: None)
+    assert warmer.hot_titles == 0 and warmer.database_path is None
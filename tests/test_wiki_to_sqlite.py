@@ -0,0 +1,25 @@
+"""Tests for the offline database builder."""
+import hashlib
+import tarfile
+
+import wiki_to_sqlite
+
+
+def test_transport_holds_the_database_and_its_sidecars(tmp_path):
+    articles = tmp_path / "en" / "articles"
+    articles.mkdir(parents=True)
+    for title in ("Python", "Rust", "Go"):
+        (articles / f"{title}.txt").write_text(
+            f"{title} is a programming language.", encoding="utf-8")
+
+    assert wiki_to_sqlite.main(["--outdir", str(tmp_path), "--finalize",
+                                "--transport", "--article-store"]) == 0
+
+    build = tmp_path / "en" / (tmp_path / "en" / "CURRENT").read_text().strip()
+    transport = build / "wikipedia.tar.xz"
+    with tarfile.open(transport) as archive:
+        names = set(archive.getnames())
+    assert names == {"wikipedia.db", "titles.idx", "terms.bloom",
+                     "articles.idx", "articles.dat"}
+    checksum = (build / "wikipedia.tar.xz.sha256").read_text().split()[0]
+    assert checksum == hashlib.sha256(transport.read_bytes()).hexdigest()
@@ -8,6 +8,7 @@ each article to an individual .txt file under the output directory.
 Usage examples:
     python wiki_dumps.py --lang en --outdir "C:\\AI Bot\\data\\wiki_dumps"
     python wiki_dumps.py --lang en --outdir ./data/wiki_dumps --max 1000
+    python wiki_dumps.py --lang en,de,fr --outdir ./data/wiki_dumps
 
 Notes:
 - This script is a pragmatic extractor: it writes the raw wiki markup
@@ -15,11 +16,14 @@ Notes:
   be used to render a cleaner plain-text output.
 - For very large dumps it may take many hours and require tens of GB.
   Use `--max` to limit articles during testing.
+- Several comma-separated languages are downloaded and extracted in
+  parallel processes, one output folder per language.
 """
 from __future__ import annotations
 
 import argparse
 import bz2
+import concurrent.futures
 import html
 import json
 import os
@@ -34,6 +38,11 @@ try:
 except Exception:
     mwparserfromhell = None  # type: ignore
 
+try:
+    from ai_bot.modules.http_client import default_client
+except Exception:
+    default_client = None  # type: ignore
+
 
 def safe_filename(title: str, max_length: int = 200) -> str:
     """Create a filesystem-safe filename from an article title."""
@@ -109,13 +118,21 @@ def render_plaintext(wiki_text: str) -> str:
 def download_dump(url: str, dest: Path) -> None:
     """Download the given URL to dest (streaming).
 
-    Uses urllib to avoid adding requests as a hard dependency.
+    Uses the shared pooled HTTP client when the ai_bot package is available
+    (connections and DNS results are reused by later downloads in the same
+    process, e.g. a ``--jobs`` worker handling several languages) and falls
+    back to urllib.
     """
-    import urllib.request
-
     dest.parent.mkdir(parents=True, exist_ok=True)
     print(f"Downloading: {url}")
-    with urllib.request.urlopen(url) as resp:
+    if default_client is not None:
+        opener = default_client().stream(url, timeout=60)
+    else:
+        import urllib.request
+        opener = urllib.request.urlopen(url)
+    with opener as resp:
+        if resp.status >= 400:
+            raise OSError(f"HTTP {resp.status} downloading {url}")
         total = resp.getheader('Content-Length')
         total = int(total) if total else None
         with open(dest, 'wb') as out:
@@ -134,22 +151,13 @@ def download_dump(url: str, dest: Path) -> None:
     print("\nDownload complete.")
 
 
-def main(argv: Optional[list[str]] = None) -> int:
-    parser = argparse.ArgumentParser(
-        description="Download and extract Wikipedia dumps into text files")
-    parser.add_argument("--lang", default="en",
-                        help="Language code (e.g. en, es, fr)")
-    parser.add_argument("--outdir", default="data/wiki_dumps",
-                        help="Output directory for extracted files")
-    parser.add_argument("--max", type=int, default=0,
-                        help="Maximum number of articles to extract (0 = all)")
-    parser.add_argument("--skip-download", action="store_true",
-                        help="Skip download step and use existing .bz2 file in outdir")
-    parser.add_argument("--use-wikiextractor", action="store_true",
-                        help="If WikiExtractor.py is available in PATH use it for faster extraction")
-    args = parser.parse_args(argv)
+def parse_langs(value: str) -> list[str]:
+    """Split a comma-separated ``--lang`` value, keeping order."""
+    return list(dict.fromkeys(code.strip() for code in value.split(",") if code.strip()))
 
-    lang = args.lang
+
+def dump_language(args: argparse.Namespace, lang: str) -> int:
+    """Download and extract the dump for one language."""
     outdir = Path(args.outdir) / lang
     outdir.mkdir(parents=True, exist_ok=True)
 
@@ -256,5 +264,48 @@ def main(argv: Optional[list[str]] = None) -> int:
     return 0
 
 
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Download and extract Wikipedia dumps into text files")
+    parser.add_argument("--lang", default="en",
+                        help="Language code (e.g. en, es, fr), or several "
+                             "separated by commas")
+    parser.add_argument("--outdir", default="data/wiki_dumps",
+                        help="Output directory for extracted files")
+    parser.add_argument("--max", type=int, default=0,
+                        help="Maximum number of articles to extract (0 = all)")
+    parser.add_argument("--skip-download", action="store_true",
+                        help="Skip download step and use existing .bz2 file in outdir")
+    parser.add_argument("--use-wikiextractor", action="store_true",
+                        help="If WikiExtractor.py is available in PATH use it for faster extraction")
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="Languages processed at once (0 = all of them)")
+    args = parser.parse_args(argv)
+
+    langs = parse_langs(args.lang)
+    if not langs:
+        print("No language given")
+        return 2
+    if len(langs) == 1:
+        return dump_language(args, langs[0])
+
+    # Downloads wait on the network and extraction on the CPU; separate
+    # processes let one language's parsing overlap another's download
+    status = 0
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=args.jobs or len(langs)) as pool:
+        futures = {pool.submit(dump_language, args, lang): lang for lang in langs}
+        for future in concurrent.futures.as_completed(futures):
+            lang = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                print(f"Dump for {lang} failed: {exc}")
+                result = 1
+            print(f"Finished {lang} with status {result}")
+            status = max(status, result)
+    return status
+
+
 if __name__ == '__main__':
     raise SystemExit(main())
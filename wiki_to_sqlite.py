@@ -1,24 +1,79 @@
 #!/usr/bin/env python3
 """Convert per-article .txt files produced by wiki_dumps.py into a sqlite database.
 
-This script reads <outdir>/<lang>/articles/*.txt and writes a sqlite DB at
-<outdir>/<lang>/wikipedia.db with tables `articles` and `search_index` compatible
-with `ai_bot/modules/wikipedia_offline.py`.
+This script reads <outdir>/<lang>/articles/*.txt and writes a sqlite DB with
+tables `articles` and `search_index` compatible with
+`ai_bot/modules/wikipedia_offline.py`.
+
+Each run builds a fresh <outdir>/<lang>/builds/<stamp>/wikipedia.db next to
+the live one and then atomically points <outdir>/<lang>/CURRENT at it, so
+running readers switch over without seeing a half-built database. Use
+--in-place to update <outdir>/<lang>/wikipedia.db directly instead.
+
+--finalize turns the finished build into the release artifact: build-only
+tables dropped, statistics gathered and the file rewritten compactly with a
+read-optimized page size. --transport additionally writes an xz-compressed
+tar of the database and its read-side files, with a sha256 checksum, for
+the installer and mirrors.
+
+--similarity-index writes a TF-IDF matrix over the lead sections (numpy
+required) for ``OfflineReader.similar``.
+
+--lang accepts a comma-separated list (e.g. en,de,fr); each language is
+built into its own folder in a separate process.
 """
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import hashlib
 import sqlite3
+import tarfile
 from pathlib import Path
 import os
 import re
-import json
+import shutil
+import uuid
+from datetime import datetime, timezone
 from typing import Optional
 
+try:
+    from ai_bot.modules.article_store import ArticleStoreWriter
+    from ai_bot.modules.title_index import INDEX_FILE as TITLE_INDEX_FILE
+    from ai_bot.modules.title_index import write_title_index
+    from ai_bot.modules.bloom import FILTER_FILE, BloomFilter
+    from ai_bot.core.singleflight import normalize_query
+except Exception:
+    ArticleStoreWriter = None  # type: ignore
+    write_title_index = None  # type: ignore
+    BloomFilter = None  # type: ignore
+
+try:
+    from ai_bot.modules.similarity import (
+        INDEX_DIR as SIMILARITY_DIR, LEAD_CHARS, write_similarity_index)
+    import numpy  # noqa: F401  # pylint: disable=unused-import
+except Exception:
+    write_similarity_index = None  # type: ignore
+
+# Side-by-side builds live in <lang>/builds/<stamp>; CURRENT names the live one
+BUILDS_DIR = 'builds'
+POINTER_FILE = 'CURRENT'
+
+# Tables readers query; anything else in a build is scratch for --finalize to drop
+READ_TABLES = ('articles', 'search_index', 'metadata')
+SCHEMA_VERSION = 1
+# Larger pages keep article text off overflow chains and B-trees shallow
+FINAL_PAGE_SIZE = 16384
+TRANSPORT_SUFFIX = '.tar.xz'
+# Read-side files write_sidecars may put next to the database
+SIDECAR_NAMES = ('titles.idx', 'terms.bloom', 'articles.idx', 'articles.dat', 'tfidf')
+
 
 def create_db(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(db_path))
+    # WAL lets read-only app connections keep reading during a rebuild
+    conn.execute('PRAGMA journal_mode=WAL')
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS articles (
@@ -37,10 +92,26 @@ def create_db(db_path: Path) -> sqlite3.Connection:
             FOREIGN KEY (article_id) REFERENCES articles(id)
         )
     ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_search_keyword ON search_index(keyword)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
     conn.commit()
     return conn
 
 
+def write_metadata(conn: sqlite3.Connection, **values: object) -> None:
+    """Store build facts (article count, language, ...) for readers."""
+    conn.executemany(
+        'INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+        [(key, str(value)) for key, value in values.items()])
+    conn.commit()
+
+
 def insert_article(conn: sqlite3.Connection, title: str, content: str) -> None:
     cursor = conn.cursor()
     summary = content[:500]
@@ -62,7 +133,29 @@ def insert_article(conn: sqlite3.Connection, title: str, content: str) -> None:
     conn.commit()
 
 
-def build_from_articles(articles_dir: Path, db_path: Path, max_articles: Optional[int] = None) -> int:
+def write_article_store(conn: sqlite3.Connection, directory: Path) -> int:
+    """Export article bodies to a memory-mappable store next to the DB."""
+    writer = ArticleStoreWriter(directory)
+    for aid, content in conn.execute('SELECT id, content FROM articles ORDER BY id'):
+        writer.add(aid, content)
+    return writer.commit()
+
+
+def write_bloom_filter(conn: sqlite3.Connection, path: Path, fp_rate: float) -> 'BloomFilter':
+    """Build the negative-lookup filter over normalized titles and index terms."""
+    articles = conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+    terms = conn.execute('SELECT COUNT(DISTINCT keyword) FROM search_index').fetchone()[0]
+    bloom = BloomFilter.for_capacity(articles + terms, fp_rate)
+    for (title,) in conn.execute('SELECT title FROM articles'):
+        bloom.add(normalize_query(title))
+    for (keyword,) in conn.execute('SELECT DISTINCT keyword FROM search_index'):
+        bloom.add(keyword)
+    bloom.save(path)
+    return bloom
+
+
+def build_from_articles(articles_dir: Path, db_path: Path, max_articles: Optional[int] = None,
+                        lang: Optional[str] = None, generation: Optional[str] = None) -> int:
     conn = create_db(db_path)
     count = 0
     for p in sorted(articles_dir.glob('*.txt')):
@@ -75,45 +168,267 @@ def build_from_articles(articles_dir: Path, db_path: Path, max_articles: Optiona
                 break
         except Exception:
             continue
+    # Readers take the count from here instead of scanning the table; a new
+    # generation tells them to drop results cached from the previous build
+    total = conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+    write_metadata(conn, article_count=total, lang=lang or '',
+                   built_at=datetime.now(timezone.utc).isoformat(),
+                   generation=generation or uuid.uuid4().hex)
     conn.close()
     return count
 
 
-def main(argv: Optional[list[str]] = None) -> int:
-    parser = argparse.ArgumentParser(
-        description='Convert wiki per-article txt files into sqlite DB')
-    parser.add_argument('--outdir', default='data/wiki_dumps',
-                        help='Base output dir where language folders are located')
-    parser.add_argument('--lang', default='en', help='Language code')
-    parser.add_argument('--max', type=int, default=0,
-                        help='Limit number of articles (0 = all)')
-    args = parser.parse_args(argv)
+def write_sidecars(db_path: Path, bloom_fp_rate: float, article_store: bool,
+                   similarity_index: bool = False) -> int:
+    """Write the read-side files: title index, Bloom filter, article store
+    and similarity index."""
+    directory = db_path.parent
+    if write_title_index is not None:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            titles = write_title_index(
+                directory / TITLE_INDEX_FILE, conn.execute('SELECT id, title FROM articles'))
+        finally:
+            conn.close()
+        print(f'Wrote title index with {titles} titles to {directory / TITLE_INDEX_FILE}')
+    if BloomFilter is not None and bloom_fp_rate > 0:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            bloom = write_bloom_filter(conn, directory / FILTER_FILE, bloom_fp_rate)
+        finally:
+            conn.close()
+        print(f'Wrote Bloom filter to {directory / FILTER_FILE}: {bloom.count} items, '
+              f'{bloom.nbytes / 1024:.1f} KiB, {bloom.num_hashes} hashes, '
+              f'expected false positives {bloom.expected_fp_rate:.2%}')
+    if article_store:
+        if ArticleStoreWriter is None:
+            print('Article store support (ai_bot package) not available')
+            return 1
+        conn = sqlite3.connect(str(db_path))
+        try:
+            stored = write_article_store(conn, directory)
+        finally:
+            conn.close()
+        print(f'Wrote article store with {stored} articles to {directory}')
+    if similarity_index:
+        if write_similarity_index is None:
+            print('Similarity index support (ai_bot package and numpy) not available')
+            return 1
+        conn = sqlite3.connect(str(db_path))
+        try:
+            # The lead section is at the start; never pull whole bodies
+            indexed = write_similarity_index(directory, conn.execute(
+                'SELECT id, title, substr(content, 1, ?) FROM articles ORDER BY id',
+                (LEAD_CHARS,)))
+        finally:
+            conn.close()
+        print(f'Wrote similarity index over {indexed} articles to '
+              f'{directory / SIMILARITY_DIR}')
+    return 0
 
-    lang = args.lang
+
+def finalize_db(db_path: Path, page_size: int = FINAL_PAGE_SIZE) -> dict[str, int]:
+    """Rewrite a finished build as a compact, read-optimized artifact.
+
+    Drops tables readers never query and orphaned index rows, records
+    counts and the schema version, runs ANALYZE for the query planner,
+    then copies the database with ``VACUUM INTO`` at ``page_size``. The
+    copy has no free pages or fragmentation left over from ``INSERT OR
+    REPLACE`` and uses a rollback journal, so it opens from read-only
+    media without -wal/-shm files.
+
+    Returns:
+        The counts written to the metadata table plus the file sizes
+        before and after.
+    """
+    size_before = db_path.stat().st_size
+    tmp = db_path.with_name(db_path.name + '.final')
+    if tmp.exists():
+        tmp.unlink()
+    conn = sqlite3.connect(str(db_path))
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            if table not in READ_TABLES:
+                conn.execute(f'DROP TABLE "{table}"')
+        # INSERT OR REPLACE gives a rebuilt article a new id and strands the
+        # keywords of the old one
+        conn.execute('DELETE FROM search_index WHERE article_id NOT IN '
+                     '(SELECT id FROM articles)')
+        counts = {
+            'article_count': conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0],
+            'keyword_count': conn.execute('SELECT COUNT(*) FROM search_index').fetchone()[0],
+        }
+        write_metadata(conn, schema_version=SCHEMA_VERSION, page_size=page_size,
+                       finalized_at=datetime.now(timezone.utc).isoformat(), **counts)
+        conn.execute('ANALYZE')
+        conn.commit()
+        conn.execute(f'PRAGMA page_size={int(page_size)}')
+        conn.execute('VACUUM INTO ?', (str(tmp),))
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+    for suffix in ('-wal', '-shm'):
+        # A stale WAL would be replayed into the new file on next open
+        stale = db_path.with_name(db_path.name + suffix)
+        if stale.exists():
+            stale.unlink()
+    counts.update(bytes_before=size_before, bytes_after=db_path.stat().st_size)
+    return counts
+
+
+def write_transport(db_path: Path) -> Path:
+    """Write ``wikipedia.tar.xz`` and a ``sha256sum``-style checksum file.
+
+    The archive holds the database and whichever sidecar files exist next
+    to it, at the top level, so it must be written after
+    :func:`write_sidecars`; extracting it gives a complete build folder.
+    """
+    target = db_path.with_suffix(TRANSPORT_SUFFIX)
+    tmp = target.with_name(target.name + '.tmp')
+    with tarfile.open(tmp, 'w:xz') as archive:
+        for name in (db_path.name,) + SIDECAR_NAMES:
+            path = db_path.with_name(name)
+            if path.exists():
+                archive.add(str(path), arcname=name)
+    digest = hashlib.sha256()
+    with open(tmp, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    os.replace(tmp, target)
+    target.with_name(target.name + '.sha256').write_text(
+        f'{digest.hexdigest()}  {target.name}\n', encoding='utf-8')
+    return target
+
+
+def publish_build(base: Path, build_dir: Path, keep: int = 2) -> None:
+    """Atomically point readers at ``build_dir`` and prune older builds.
+
+    ``<base>/CURRENT`` names the live build directory relative to ``base``.
+    It is replaced in one rename, so a reader sees either the old or the
+    new build, never a mix, and reopens on its next query.
+    """
+    pointer = base / POINTER_FILE
+    tmp = base / (POINTER_FILE + '.tmp')
+    tmp.write_text(build_dir.relative_to(base).as_posix() + '\n', encoding='utf-8')
+    os.replace(tmp, pointer)
+    builds = sorted(p for p in (base / BUILDS_DIR).iterdir() if p.is_dir())
+    for old in builds[:-keep] if keep > 0 else []:
+        if old != build_dir:
+            # Open readers keep their files on POSIX; on Windows a build
+            # still in use is left for the next run to remove
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def parse_langs(value: str) -> list[str]:
+    """Split a comma-separated ``--lang`` value, keeping order."""
+    return list(dict.fromkeys(code.strip() for code in value.split(',') if code.strip()))
+
+
+def build_language(args: argparse.Namespace, lang: str) -> int:
+    """Build, optionally finalize, and publish the database for one language."""
     base = Path(args.outdir) / lang
     articles_dir = base / 'articles'
     if not articles_dir.exists():
         print(f'Articles directory not found: {articles_dir}')
         return 2
 
-    db_path = base / 'wikipedia.db'
+    generation = uuid.uuid4().hex
+    if args.in_place:
+        db_path = base / 'wikipedia.db'
+    else:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        db_path = base / BUILDS_DIR / f'{stamp}-{generation[:8]}' / 'wikipedia.db'
     max_articles = args.max or None
     print(
         f'Building sqlite DB at {db_path} from articles in {articles_dir}...')
-    count = build_from_articles(articles_dir, db_path, max_articles)
+    count = build_from_articles(articles_dir, db_path, max_articles, lang, generation)
     print(f'Inserted {count} articles into {db_path}')
-    # also write a small metadata file
-    meta = base / 'index.json'
-    if meta.exists():
-        try:
-            data = json.loads(meta.read_text(encoding='utf-8'))
-            # store total count
-            meta.write_text(json.dumps(
-                {'count': count, 'lang': lang}, ensure_ascii=False, indent=2), encoding='utf-8')
-        except Exception:
-            pass
+    if args.finalize:
+        final = finalize_db(db_path, args.page_size)
+        print(f'Finalized {db_path}: {final["article_count"]} articles, '
+              f'{final["keyword_count"]} keywords, '
+              f'{final["bytes_before"] / 2**20:.1f} MiB -> '
+              f'{final["bytes_after"] / 2**20:.1f} MiB')
+    status = write_sidecars(db_path, args.bloom_fp_rate, args.article_store,
+                            args.similarity_index)
+    if status:
+        return status
+    if args.transport:
+        transport = write_transport(db_path)
+        print(f'Wrote {transport} ({transport.stat().st_size / 2**20:.1f} MiB) '
+              f'and {transport.name}.sha256')
+    if not args.in_place:
+        publish_build(base, db_path.parent, args.keep_builds)
+        print(f'Published {db_path.parent.name} as the current build of {base}')
     return 0
 
 
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Convert wiki per-article txt files into sqlite DB')
+    parser.add_argument('--outdir', default='data/wiki_dumps',
+                        help='Base output dir where language folders are located')
+    parser.add_argument('--lang', default='en',
+                        help='Language code, or several separated by commas')
+    parser.add_argument('--jobs', type=int, default=0,
+                        help='Languages built at once (0 = one per language, '
+                             'up to the CPU count)')
+    parser.add_argument('--max', type=int, default=0,
+                        help='Limit number of articles (0 = all)')
+    parser.add_argument('--bloom-fp-rate', type=float, default=0.01,
+                        help='False-positive rate of the negative-lookup '
+                             'filter (0 = do not build it)')
+    parser.add_argument('--article-store', action='store_true',
+                        help='Also write articles.idx/articles.dat for '
+                             'zero-copy memory-mapped body reads')
+    parser.add_argument('--similarity-index', action='store_true',
+                        help='Also write a TF-IDF index over lead sections for '
+                             'similarity search (requires numpy)')
+    parser.add_argument('--in-place', action='store_true',
+                        help='Update <outdir>/<lang>/wikipedia.db directly instead '
+                             'of building side by side and swapping atomically')
+    parser.add_argument('--keep-builds', type=int, default=2,
+                        help='Side-by-side builds to keep, including the live one')
+    parser.add_argument('--finalize', action='store_true',
+                        help='Compact the finished build into a read-only release '
+                             'artifact (drop build-only tables, ANALYZE, VACUUM INTO)')
+    parser.add_argument('--page-size', type=int, default=FINAL_PAGE_SIZE,
+                        help='SQLite page size of the finalized database')
+    parser.add_argument('--transport', action='store_true',
+                        help='With --finalize, also write wikipedia.tar.xz '
+                             '(database and sidecar files) and its .sha256 checksum')
+    args = parser.parse_args(argv)
+    if args.transport and not args.finalize:
+        print('--transport requires --finalize')
+        return 2
+
+    langs = parse_langs(args.lang)
+    if not langs:
+        print('No language given')
+        return 2
+    if len(langs) == 1:
+        return build_language(args, langs[0])
+
+    # SQLite inserts are CPU-bound and hold the GIL between statements, so
+    # languages are built in separate processes
+    jobs = args.jobs or min(len(langs), os.cpu_count() or 1)
+    status = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(build_language, args, lang): lang for lang in langs}
+        for future in concurrent.futures.as_completed(futures):
+            lang = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                print(f'Build for {lang} failed: {exc}')
+                result = 1
+            print(f'Finished {lang} with status {result}')
+            status = max(status, result)
+    return status
+
+
 if __name__ == '__main__':
     raise SystemExit(main())